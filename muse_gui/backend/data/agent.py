@@ -6,10 +6,9 @@ from pydantic import BaseModel
 from pydantic import NonNegativeFloat
 from .abstract import Data
 from enum import Enum
-import numpy as np
 
 def validate_nan_to_none(cls, v):
-    if v == np.NaN:
+    if isinstance(v, float) and math.isnan(v):
          return None
     else:
         return v
@@ -29,7 +28,7 @@ class AgentObjective(Data):
     objective_type: ObjectiveType = ObjectiveType.LCOE
     objective_data: float
     objective_sort: Optional[bool] = None
-    validator('objective_sort', pre=True, always = True, allow_reuse=True)(validate_nan_to_none)
+    _objective_sort_nan = validator('objective_sort', pre=True, always = True, allow_reuse=True)(validate_nan_to_none)
 
 
 
@@ -0,0 +1,234 @@
+"""
+Ways of solving an exported MUSE model.
+
+    executor = make_executor('subprocess')
+    executor.run(Path('Output/settings.toml'))
+
+``make_executor`` takes a spec:
+
+- ``inprocess``: imports MUSE and solves in this process
+- ``subprocess``: solves each run in a fresh Python process
+- ``worker``: solves in a long-lived SolverWorker that imports MUSE once
+- ``http://host:port``: sends the model to a job server (see ``job_server``)
+  and copies the results back
+
+Every executor raises SolverError if the run fails. ``cancel`` stops a run
+in progress from another thread; the run then raises as well.
+"""
+import base64
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import toml
+
+from .instrumentation import span
+from .solver import SolverError, SolverWorker
+
+# Last lines of a failed subprocess's stderr kept in the error
+STDERR_LINES = 40
+# Seconds between status requests to a job server
+POLL_INTERVAL = 1.0
+# Seconds an HTTP request may take
+HTTP_TIMEOUT = 60.0
+
+
+class Executor:
+    def start(self) -> None:
+        """Gets ready for a run ahead of time, if the executor can"""
+
+    def run(self, settings_path: Path) -> None:
+        raise NotImplementedError
+
+    def cancel(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class InProcessExecutor(Executor):
+    def run(self, settings_path: Path) -> None:
+        # MUSE is only needed once a run is requested
+        from muse.mca import MCA
+        with warnings.catch_warnings():
+            warnings.simplefilter(action='ignore', category=FutureWarning)
+            with span('mca_factory'):
+                mca = MCA.factory(settings_path)
+            with span('mca_run'):
+                mca.run()
+
+
+def _limit(cpus: Optional[Iterable[int]], memory_limit: Optional[int]) -> None:
+    # Runs in the child, before it imports MUSE
+    if cpus is not None and hasattr(os, 'sched_setaffinity'):
+        available = set(cpus) & os.sched_getaffinity(0)
+        if available:
+            os.sched_setaffinity(0, available)
+    if memory_limit is not None:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+class SubprocessExecutor(Executor):
+    """Isolates every run in a new interpreter, at the cost of importing MUSE each time"""
+    def __init__(self, cpus: Optional[Iterable[int]] = None, memory_limit: Optional[int] = None) -> None:
+        self.cpus = None if cpus is None else set(cpus)
+        self.memory_limit = memory_limit
+        self._process: Optional[subprocess.Popen] = None
+
+    def _command(self, settings_path: Path) -> List[str]:
+        # The child limits itself: a preexec_fn is unsafe while a run queue's
+        # threads are running
+        command = [sys.executable, '-m', 'muse_gui.backend.executors', str(settings_path)]
+        if os.name == 'posix':
+            if self.cpus is not None:
+                command += ['--cpus', ','.join(str(cpu) for cpu in sorted(self.cpus))]
+            if self.memory_limit is not None:
+                command += ['--memory-limit', str(self.memory_limit)]
+        return command
+
+    def run(self, settings_path: Path) -> None:
+        self._process = subprocess.Popen(
+            self._command(settings_path),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        _, stderr = self._process.communicate()
+        if self._process.returncode != 0:
+            tail = '\n'.join(stderr.splitlines()[-STDERR_LINES:])
+            raise SolverError(f'MUSE exited with code {self._process.returncode}\n{tail}')
+
+    def cancel(self) -> None:
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+
+class WorkerExecutor(Executor):
+    def __init__(self, worker: SolverWorker) -> None:
+        self.worker = worker
+
+    def start(self) -> None:
+        self.worker.start()
+
+    def run(self, settings_path: Path) -> None:
+        self.worker.run(str(settings_path))
+
+    def cancel(self) -> None:
+        self.worker.kill()
+
+    def close(self) -> None:
+        self.worker.stop()
+
+
+def output_paths(settings_path: Path) -> Dict[str, Path]:
+    """Files a settings file's outputs are written to, by file name"""
+    settings = toml.load(settings_path)
+    return {Path(output['filename']).name: Path(output['filename']) for output in settings.get('outputs', [])}
+
+
+def _encode(path: Path) -> str:
+    return base64.b64encode(path.read_bytes()).decode('ascii')
+
+
+class RemoteExecutor(Executor):
+    def __init__(self, url: str, poll_interval: float = POLL_INTERVAL) -> None:
+        self.url = url.rstrip('/')
+        self.poll_interval = poll_interval
+        self._job_id: Optional[int] = None
+
+    def _request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        data = None if body is None else json.dumps(body).encode('utf-8')
+        request = urllib.request.Request(
+            self.url + path, data=data, method=method, headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            raise SolverError(f'{self.url} answered {e.code}: {e.read().decode("utf-8", "replace")}') from e
+        except urllib.error.URLError as e:
+            raise SolverError(f'Could not reach {self.url}: {e.reason}') from e
+
+    def run(self, settings_path: Path) -> None:
+        settings_path = Path(settings_path)
+        folder = settings_path.parent
+        outputs = output_paths(settings_path)
+        # Results of an earlier run are not sent
+        skip = {path.parent.absolute() for path in outputs.values()}
+        files = {
+            path.relative_to(folder).as_posix(): _encode(path)
+            for path in sorted(folder.rglob('*'))
+            if path.is_file() and not any(parent in skip for parent in path.absolute().parents)
+        }
+        with span('remote_submit', url=self.url, files=len(files)):
+            job = self._request('POST', '/jobs', {'settings': settings_path.name, 'files': files})
+        self._job_id = job_id = job['id']
+        try:
+            with span('remote_wait'):
+                while job['status'] in ('queued', 'running'):
+                    time.sleep(self.poll_interval)
+                    job = self._request('GET', f'/jobs/{job_id}')
+            if job['status'] != 'done':
+                raise SolverError(job.get('error') or f'Remote run {job_id} was {job["status"]}')
+            with span('remote_results'):
+                results = self._request('GET', f'/jobs/{job_id}/results')['files']
+                for name, content in results.items():
+                    if name in outputs:
+                        outputs[name].parent.mkdir(parents=True, exist_ok=True)
+                        outputs[name].write_bytes(base64.b64decode(content))
+        finally:
+            self._job_id = None
+            # Frees the job on the server, or cancels it if it is still going
+            try:
+                self._request('DELETE', f'/jobs/{job_id}')
+            except SolverError:
+                pass
+
+    def cancel(self) -> None:
+        job_id = self._job_id
+        if job_id is not None:
+            self._request('DELETE', f'/jobs/{job_id}')
+
+
+def make_executor(spec: str = 'inprocess', cpus: Optional[Iterable[int]] = None, memory_limit: Optional[int] = None) -> Executor:
+    """Builds an executor from a spec; cpus and memory_limit apply to local processes"""
+    if spec == 'inprocess':
+        return InProcessExecutor()
+    if spec == 'subprocess':
+        return SubprocessExecutor(cpus, memory_limit)
+    if spec == 'worker':
+        return WorkerExecutor(SolverWorker(cpus, memory_limit))
+    if spec.startswith(('http://', 'https://')):
+        return RemoteExecutor(spec)
+    raise ValueError(f'Unknown executor {spec!r}, expected inprocess, subprocess, worker or an http:// URL')
+
+
+def default_executor_spec(default: str = 'inprocess') -> str:
+    return os.environ.get('MUSE_GUI_EXECUTOR', default)
+
+
+if __name__ == '__main__':
+    # Entry point of SubprocessExecutor's runs
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('settings')
+    parser.add_argument('--cpus', type=lambda text: [int(cpu) for cpu in text.split(',')])
+    parser.add_argument('--memory-limit', type=int)
+    args = parser.parse_args()
+    try:
+        _limit(args.cpus, args.memory_limit)
+        InProcessExecutor().run(Path(args.settings))
+    except Exception:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
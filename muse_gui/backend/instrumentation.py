@@ -0,0 +1,170 @@
+"""
+Lightweight timing spans for the load / export / run / plot pipeline.
+
+    with span('export_sector', sector='power'):
+        ...
+
+Spans are only measured while at least one sink is registered with
+``add_sink``; otherwise ``span`` returns a shared no-op context manager, so
+instrumented code pays for little more than a function call.
+"""
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SpanRecord:
+    name: str
+    path: str
+    depth: int
+    start: float
+    duration: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class Sink:
+    def emit(self, record: SpanRecord) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class LogSink(Sink):
+    def __init__(self, level: int = logging.INFO, max_depth: Optional[int] = None) -> None:
+        self.level = level
+        self.max_depth = max_depth
+
+    def emit(self, record: SpanRecord) -> None:
+        if self.max_depth is not None and record.depth > self.max_depth:
+            return
+        attributes = ' '.join(f'{k}={v}' for k, v in record.attributes.items())
+        logger.log(self.level, '%s%s %.3fs %s', '  ' * record.depth, record.name, record.duration, attributes)
+
+
+class JsonFileSink(Sink):
+    """Appends one JSON object per finished span to a file"""
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a')
+
+    def emit(self, record: SpanRecord) -> None:
+        line = json.dumps(record.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class MemorySink(Sink):
+    def __init__(self) -> None:
+        self.records: List[SpanRecord] = []
+
+    def emit(self, record: SpanRecord) -> None:
+        self.records.append(record)
+
+
+class CallbackSink(Sink):
+    def __init__(self, callback: Callable[[SpanRecord], None], max_depth: Optional[int] = None) -> None:
+        self.callback = callback
+        self.max_depth = max_depth
+
+    def emit(self, record: SpanRecord) -> None:
+        if self.max_depth is not None and record.depth > self.max_depth:
+            return
+        self.callback(record)
+
+
+_sinks: List[Sink] = []
+_local = threading.local()
+
+
+def add_sink(sink: Sink) -> Sink:
+    if sink not in _sinks:
+        _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink: Sink) -> None:
+    if sink in _sinks:
+        _sinks.remove(sink)
+        sink.close()
+
+
+def enabled() -> bool:
+    return len(_sinks) > 0
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'attributes', '_start', '_wall_start', '_stack')
+
+    def __init__(self, name: str, attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.attributes = attributes
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> '_Span':
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self._stack = stack
+        stack.append(self.name)
+        self._wall_start = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        duration = time.perf_counter() - self._start
+        record = SpanRecord(
+            name=self.name,
+            path='/'.join(self._stack),
+            depth=len(self._stack) - 1,
+            start=self._wall_start,
+            duration=duration,
+            attributes=self.attributes,
+            error=repr(exc) if exc is not None else None,
+        )
+        self._stack.pop()
+        for sink in list(_sinks):
+            try:
+                sink.emit(record)
+            except Exception:
+                logger.exception('Instrumentation sink %r failed', sink)
+
+
+def span(name: str, **attributes: Any) -> Union[_Span, _NullSpan]:
+    if not _sinks:
+        return _NULL_SPAN
+    return _Span(name, attributes)
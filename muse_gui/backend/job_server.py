@@ -0,0 +1,159 @@
+"""
+HTTP/JSON job server for RemoteExecutor.
+
+    POST   /jobs               {"settings": "settings.toml", "files": {path: base64}}
+    GET    /jobs/<id>          the job, with its "status" and "error"
+    GET    /jobs/<id>/results  {"files": {name: base64}}, once the job is done
+    DELETE /jobs/<id>          cancels the job, or forgets it if it finished
+
+Uploaded models are written to an export folder of a RunQueue, with their
+outputs redirected into that folder, and solved by the queue's pool. This
+is a stand-in for a compute node's job server: it has no authentication,
+so it only listens on localhost unless told otherwise.
+"""
+import base64
+import json
+import re
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import toml
+
+from .executors import output_paths
+from .object_store import write_text
+from .run_queue import DONE, FINISHED, RunQueue
+
+_JOB_RE = re.compile(r'^/jobs/(\d+)(/results)?/?$')
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _write_files(queue: RunQueue, folder: Path, files: Dict[str, str]) -> None:
+    root = folder.resolve()
+    for name, content in files.items():
+        path = (folder / name).resolve()
+        if root not in path.parents:
+            raise BadRequest(f'{name} is outside the job folder')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        queue.objects.link(base64.b64decode(content), path)
+
+
+def submit(queue: RunQueue, settings_name: str, files: Dict[str, str]) -> Dict[str, Any]:
+    folder = queue.export_folder()
+    folder.mkdir(parents=True)
+    settings_path = folder / settings_name
+    try:
+        _write_files(queue, folder, files)
+        if not settings_path.is_file() or folder.resolve() != settings_path.resolve().parent:
+            raise BadRequest(f'{settings_name} was not uploaded')
+    except ValueError:
+        shutil.rmtree(folder, ignore_errors=True)
+        raise
+    # Outputs go to the job's folder rather than the client's paths
+    settings = toml.load(settings_path)
+    for output in settings.get('outputs', []):
+        output['filename'] = str((folder / 'Results' / Path(output['filename']).name).absolute())
+    write_text(settings_path, toml.dumps(settings))
+    results = output_paths(settings_path)
+    prices = results.get('MCAPrices.csv', folder / 'Results' / 'MCAPrices.csv')
+    capacity = results.get('MCACapacity.csv', folder / 'Results' / 'MCACapacity.csv')
+    return queue.add(settings_path, prices, capacity, label='remote').to_dict()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "JobServer"
+
+    def _send(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _job(self) -> Tuple[Optional[int], bool]:
+        match = _JOB_RE.match(self.path)
+        if match is None:
+            return None, False
+        return int(match.group(1)), match.group(2) is not None
+
+    def _handle(self, method: str) -> None:
+        queue = self.server.queue
+        try:
+            if method == 'POST' and self.path.rstrip('/') == '/jobs':
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                if not isinstance(body, dict) or 'settings' not in body or 'files' not in body:
+                    raise BadRequest('Expected settings and files')
+                self._send(201, submit(queue, body['settings'], body['files']))
+                return
+            job_id, results = self._job()
+            if job_id is None:
+                self._send(404, {'error': f'No such path {self.path}'})
+                return
+            job = queue.get(job_id)
+            if method == 'GET' and not results:
+                self._send(200, job.to_dict())
+            elif method == 'GET':
+                if job.status != DONE:
+                    raise BadRequest(f'Run {job_id} is {job.status}')
+                files = {
+                    path.name: base64.b64encode(path.read_bytes()).decode('ascii')
+                    for path in output_paths(Path(job.settings_path)).values() if path.is_file()
+                }
+                self._send(200, {'files': files})
+            elif method == 'DELETE' and not results:
+                if job.status in FINISHED:
+                    queue.remove(job_id)
+                else:
+                    queue.cancel(job_id)
+                    job = queue.get(job_id)
+                self._send(200, job.to_dict())
+            else:
+                self._send(405, {'error': f'{method} is not supported on {self.path}'})
+        except KeyError as e:
+            self._send(404, {'error': f'No run {e.args[0]}'})
+        except (ValueError, TypeError) as e:
+            # Including BadRequest, malformed JSON and base64
+            self._send(400, {'error': str(e)})
+
+    def do_GET(self) -> None:
+        self._handle('GET')
+
+    def do_POST(self) -> None:
+        self._handle('POST')
+
+    def do_DELETE(self) -> None:
+        self._handle('DELETE')
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class JobServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, queue: RunQueue, host: str = '127.0.0.1', port: int = 0) -> None:
+        super().__init__((host, port), _Handler)
+        self.queue = queue
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> threading.Thread:
+        """Serves and solves jobs in background threads"""
+        self.queue.start()
+        thread = threading.Thread(target=self.serve_forever, name='job-server', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        self.queue.stop()
@@ -0,0 +1,152 @@
+"""
+Content-addressed store for exported files.
+
+    store = ObjectStore('runs/objects')
+    datastore.export_to_folder('runs/a', object_store=store)
+    datastore.export_to_folder('runs/b', object_store=store)
+
+While an export uses a store, every file it writes is kept once in the
+store, under the SHA-256 of its contents, and hardlinked into the export
+folder (or copied where hardlinks are not possible, e.g. across devices).
+Exports of similar scenarios then share their identical CSVs, and files
+already in the store are not written again. Stored files are read-only,
+since a change through any of their links would change every export; a
+later export replaces links rather than writing through them. Pruning
+excludes linking, across processes, so an object is never deleted between
+being found in the store and being linked to.
+"""
+import contextvars
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Union
+
+try:
+    import fcntl
+except ImportError:
+    # Linking and pruning are not kept apart
+    fcntl = None
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_current: contextvars.ContextVar[Optional["ObjectStore"]] = contextvars.ContextVar('object_store', default=None)
+
+
+class ObjectStore:
+    def __init__(self, folder: Union[str, Path]) -> None:
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.folder / 'objects.lock'
+        # Files written to the store rather than found in it, for statistics
+        self.written = 0
+        self.linked = 0
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """Shared by linking, so exports run together, and exclusive to pruning"""
+        with open(self._lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            # Closing the file releases the lock
+            yield
+
+    def _object_path(self, digest: str) -> Path:
+        return self.folder / digest[:2] / digest[2:]
+
+    def put(self, data: bytes) -> Path:
+        """Path of the object holding data, writing it if it is new"""
+        path = self._object_path(hashlib.sha256(data).hexdigest())
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            # A file of its own for every writer, including threads of one process
+            fd, temporary = tempfile.mkstemp(prefix=f'{path.name}.', suffix='.tmp', dir=path.parent)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.chmod(temporary, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                # Atomic, so concurrent exports of the same file are safe
+                os.replace(temporary, path)
+            except BaseException:
+                _unlink(Path(temporary))
+                raise
+            self.written += 1
+        return path
+
+    def link(self, data: bytes, path: Union[str, Path]) -> None:
+        """Makes path a file holding data, shared with every other file holding it"""
+        path = Path(path)
+        with self._locked(exclusive=False):
+            source = self.put(data)
+            _unlink(path)
+            try:
+                os.link(source, path)
+            except OSError:
+                shutil.copyfile(source, path)
+        self.linked += 1
+
+    def prune(self) -> int:
+        """Deletes objects no export links to any more. Returns how many were deleted"""
+        deleted = 0
+        with self._locked(exclusive=True):
+            for path in self.folder.glob('??/*'):
+                if path.suffix == '.tmp':
+                    continue
+                try:
+                    if path.stat().st_nlink == 1:
+                        path.unlink()
+                        deleted += 1
+                except FileNotFoundError:
+                    # Deleted meanwhile by something other than a prune
+                    pass
+        return deleted
+
+    @contextmanager
+    def use(self) -> Iterator["ObjectStore"]:
+        """Sends the files exported in this context (and thread) to the store"""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _is_linked(path: Path) -> bool:
+    try:
+        return path.stat().st_nlink > 1
+    except FileNotFoundError:
+        return False
+
+
+def write_text(path: Union[str, Path], text: str) -> None:
+    path = Path(path)
+    store = _current.get()
+    if store is not None:
+        store.link(text.encode('utf-8'), path)
+        return
+    if _is_linked(path):
+        # Writing through the link would change the stored file
+        path.unlink()
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+
+
+def write_csv(df: "pd.DataFrame", path: Union[str, Path], **kwargs: Any) -> None:
+    path = Path(path)
+    if _current.get() is not None or _is_linked(path):
+        write_text(path, df.to_csv(**kwargs))
+    else:
+        df.to_csv(path, **kwargs)
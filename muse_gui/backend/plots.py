@@ -2,6 +2,7 @@ from typing import Dict, List
 import pandas as pd
 from dataclasses import dataclass
 from itertools import product
+from muse_gui.backend.instrumentation import span
 
 @dataclass
 class CapacityPlot:
@@ -13,6 +14,10 @@ class CapacityPlot:
 
 
 def capacity_data_frame_to_plots(dataframe: pd.DataFrame) -> List[CapacityPlot]:
+    with span('capacity_plots', rows=len(dataframe)):
+        return _capacity_data_frame_to_plots(dataframe)
+
+def _capacity_data_frame_to_plots(dataframe: pd.DataFrame) -> List[CapacityPlot]:
     def get_data(all_data: pd.DataFrame, region: str, agent: str, sector: str) -> pd.DataFrame:
         relevant_data = all_data.loc[(all_data['region'] == region) & (all_data['agent'] == agent) &  (all_data['sector'] == sector)]
         new_data =  relevant_data[['technology', 'year', 'capacity']]
@@ -45,6 +50,10 @@ class PricePlot:
     data: Dict[str, pd.DataFrame]
 
 def price_data_frame_to_plots(dataframe: pd.DataFrame) -> List[PricePlot]:
+    with span('price_plots', rows=len(dataframe)):
+        return _price_data_frame_to_plots(dataframe)
+
+def _price_data_frame_to_plots(dataframe: pd.DataFrame) -> List[PricePlot]:
     def get_data(all_data: pd.DataFrame, region: str) -> pd.DataFrame:
         relevant_data = all_data.loc[(all_data['region'] == region)]
         relevant_data = relevant_data.groupby(['commodity', 'year'], as_index=False)['prices'].sum()
@@ -1,4 +1,5 @@
-from typing import List, Optional, Tuple
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterator, List, Optional, Tuple
 
 
 from muse_gui.backend.data.agent import Agent
@@ -17,6 +18,9 @@ from .available_year import AvailableYearDatastore
 from .sector import SectorDatastore
 from .region import RegionDatastore
 from .agent import AgentDatastore
+from .base import BaseDatastore, ChangeCallback, ChangeEvent
+from .locking import ReadWriteLock
+from .journal import Journal
 
 from muse_gui.backend.data.region import Region
 from muse_gui.backend.data.commodity import Commodity
@@ -25,15 +29,29 @@ from pathlib import Path
 
 from muse_gui.backend.settings import SettingsModel
 from muse_gui.backend.settings.output import Output, Quantity, Sink
+from muse_gui.backend.instrumentation import span
+from muse_gui.backend.object_store import ObjectStore, write_csv, write_text
 import os
 
-from .importers import path_string_to_dataframe, get_commodities_data, get_sectors, get_agents, get_processes
-from .exporters import export_commodities, export_projections, agents_to_dataframe, replace_path_prefix, generate_sectors, convert_timeslices
-from muse.mca import MCA
+import copy
 
-import warnings
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .validation import SettingsProblem
+    from muse_gui.backend.executors import Executor
+    from muse_gui.backend.run_queue import RunJob, RunQueue
 
 class Datastore:
+    _STORE_ATTRIBUTES = (
+        '_region_datastore',
+        '_sector_datastore',
+        '_level_name_datastore',
+        '_available_years_datastore',
+        '_timeslice_datastore',
+        '_commodity_datastore',
+        '_agent_datastore',
+        '_process_datastore',
+    )
     _region_datastore: RegionDatastore
     _sector_datastore: SectorDatastore
     _level_name_datastore: LevelNameDatastore
@@ -44,6 +62,9 @@ class Datastore:
     _agent_datastore : AgentDatastore
     _export_path: Optional[Path]
     run_settings: Optional[RunModel]
+    _subscribers: List[ChangeCallback]
+    _lock: ReadWriteLock
+    _journal: Optional[Journal]
     def __init__(
         self, 
         regions: List[Region] = [],
@@ -56,6 +77,10 @@ class Datastore:
         agents: List[Agent] = [],
         run_model: Optional[RunModel] = None
     ) -> None:
+        self._subscribers = []
+        self._lock = ReadWriteLock()
+        # Loading the initial data is not undoable
+        self._journal = None
         self._region_datastore = RegionDatastore(self, regions)
         self._sector_datastore = SectorDatastore(self, sectors)
         self._level_name_datastore = LevelNameDatastore(self, level_names)
@@ -66,6 +91,7 @@ class Datastore:
         self._process_datastore = ProcessDatastore(self, processes)
         self.run_settings = run_model
         self._export_path = None
+        self._journal = Journal()
 
 
     @property
@@ -99,8 +125,88 @@ class Datastore:
     @property
     def agent(self):
         return self._agent_datastore
+
+    @property
+    def stores(self) -> List[BaseDatastore]:
+        return [getattr(self, name) for name in self._STORE_ATTRIBUTES]
+
+    @property
+    def version(self) -> int:
+        """Increases whenever any store changes, so views can skip refreshing unchanged data"""
+        return sum(store.version for store in self.stores)
+
+    def subscribe(self, callback: ChangeCallback) -> ChangeCallback:
+        """Calls callback with a ChangeEvent after every create, update and delete in any store"""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: ChangeCallback) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    @property
+    def lock(self) -> ReadWriteLock:
+        """
+        Lock shared by every store. Single store calls take it themselves;
+        hold lock.read() or lock.write() to make several calls atomic.
+        """
+        return self._lock
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Holds the write lock and makes every change inside one undo step"""
+        with self._lock.write():
+            if self._journal is None:
+                yield
+                return
+            self._journal.begin()
+            try:
+                yield
+            finally:
+                self._journal.end()
+
+    @property
+    def can_undo(self) -> bool:
+        return self._journal is not None and self._journal.can_undo
+
+    @property
+    def can_redo(self) -> bool:
+        return self._journal is not None and self._journal.can_redo
+
+    def undo(self) -> bool:
+        """Reverts the last edit, including everything it cascaded to. Returns False if there is nothing to undo"""
+        with self._lock.write():
+            return self._journal is not None and self._journal.undo()
+
+    def redo(self) -> bool:
+        """Reapplies the last undone edit. Returns False if there is nothing to redo"""
+        with self._lock.write():
+            return self._journal is not None and self._journal.redo()
+
+    def snapshot(self) -> "Datastore":
+        """
+        Read-only view of the datastore as it is now. Taking one is O(1): the
+        stores' data is shared and each store copies its own on its next
+        write, so later edits do not show up in the snapshot.
+        """
+        with self._lock.read():
+            snapshot = copy.copy(self)
+            snapshot._subscribers = []
+            # Nothing writes to a snapshot, so it never waits on the live lock
+            snapshot._lock = ReadWriteLock()
+            snapshot._journal = None
+            for name in self._STORE_ATTRIBUTES:
+                setattr(snapshot, name, getattr(self, name)._snapshot(snapshot))
+        return snapshot
     
-    def run_muse(self, export_path: Optional[str] = None, results_path: Optional[str] = None) -> Tuple[Path, Path]:
+    def run_muse(
+        self,
+        export_path: Optional[str] = None,
+        results_path: Optional[str] = None,
+        executor: Optional["Executor"] = None
+    ) -> Tuple[Path, Path]:
+        """Exports the model and solves it with executor, by default in this process"""
         if export_path is None and self._export_path is None:
             export_path_obj = Path('./Output')
         elif export_path is None:
@@ -108,55 +214,132 @@ class Datastore:
         else:
             export_path_obj = Path(export_path)
         export_settings_file, prices_path, capacity_path = self.export_to_folder(str(export_path_obj), results_path)
-        
-        with warnings.catch_warnings():
-            warnings.simplefilter(action='ignore', category=FutureWarning)
-            my_mca = MCA.factory(export_settings_file)
-            my_mca.run()
+
+        if executor is None:
+            from muse_gui.backend.executors import InProcessExecutor
+            executor = InProcessExecutor()
+        with span('mca_solve', settings=str(export_settings_file)):
+            executor.run(export_settings_file)
         return prices_path, capacity_path
+
+    def queue_run(self, queue: "RunQueue", label: str = '') -> "RunJob":
+        """Exports the model to a folder of its own and adds it to a run queue"""
+        with span('queue_run'):
+            # Unlike export_to_folder, this leaves the default export path alone
+            with queue.objects.use():
+                paths = self.snapshot()._export_to_folder(str(queue.export_folder()))
+        return queue.add(*paths, label=label)
         
 
+    @staticmethod
+    def validate_settings(settings_path: str) -> List["SettingsProblem"]:
+        """
+        Checks a settings file and the CSVs it references without importing them.
+        Returns every problem found, or an empty list if the model can be loaded.
+        """
+        from .validation import validate_settings
+        return validate_settings(settings_path)
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings_path: str,
+        cache_dir: Optional[str] = None,
+        progress: Optional[Callable[[str, float], None]] = None,
+    ):
+        """
+        Imports a settings file and the CSVs it references. Each CSV is parsed
+        once per import; with a cache_dir parsed CSVs are also kept on disk for
+        later imports.
+
+        progress is called with a description of each import stage and the
+        fraction of the import done so far. It may raise LoadCancelled to stop
+        the import, e.g. when it runs in a background thread.
+        """
+        from .csv_cache import csv_cache
+        with span('from_settings', settings=str(settings_path)) as s, csv_cache(cache_dir) as cache:
+            datastore = cls._from_settings(settings_path, progress)
+            s.set(csv_reads=cache.misses, csv_cache_hits=cache.hits)
+            return datastore
+
     @classmethod
-    def from_settings(cls, settings_path: str):        
-        toml_out = toml.load(settings_path)
-        path = Path(settings_path)
-        folder = path.parents[0].absolute()
-        settings_model =  SettingsModel.parse_obj(toml_out)
-        global_commodities_data = path_string_to_dataframe(folder, Path(settings_model.global_input_files.global_commodities))
-        projections_data = path_string_to_dataframe(folder, Path(settings_model.global_input_files.projections))
-        projections_data_without_unit = projections_data.drop(0)
-        unit_row = projections_data.iloc[0]
+    def _from_settings(cls, settings_path: str, progress: Optional[Callable[[str, float], None]] = None):
+        from .importers import path_string_to_table, get_commodities_data, get_sectors, get_agents, get_processes
+        from .schemas import GLOBAL_COMMODITIES, PROJECTIONS
+
+        def report(stage: str, fraction: float) -> None:
+            if progress is not None:
+                progress(stage, fraction)
+
+        report('Reading settings', 0.0)
+        with span('parse'):
+            toml_out = toml.load(settings_path)
+            path = Path(settings_path)
+            folder = path.parents[0].absolute()
+            settings_model =  SettingsModel.parse_obj(toml_out)
+        report('Reading commodities', 0.05)
+        with span('read_global_inputs'):
+            global_commodities_data = path_string_to_table(folder, Path(settings_model.global_input_files.global_commodities), GLOBAL_COMMODITIES).data
+            projections = path_string_to_table(folder, Path(settings_model.global_input_files.projections), PROJECTIONS)
+            projections_data_without_unit = projections.data
+            unit_row = projections.units
 
         regions = projections_data_without_unit['RegionName'].unique()
 
         region_models = [Region(name=name) for name in regions]
 
-        commodity_models = get_commodities_data(global_commodities_data, projections_data_without_unit, unit_row)
+        with span('get_commodities_data'):
+            commodity_models = get_commodities_data(global_commodities_data, projections_data_without_unit, unit_row)
         
-        year_models = [AvailableYear(year=i) for i in projections_data_without_unit['Time']]
+        year_models = [AvailableYear(year=i) for i in projections_data_without_unit['Time'].unique()]
 
-        sector_models = get_sectors(settings_model)
+        report('Reading sectors', 0.15)
+        with span('get_sectors'):
+            sector_models = get_sectors(settings_model)
         
         timeslice_info = unpack_timeslice(settings_model.timeslices)
         level_name_models = [LevelName(level=i) for i in timeslice_info.level_names]
         timeslice_models = [Timeslice(name = k, value = v) for k, v in timeslice_info.timeslices.items()]
 
-        agent_models = get_agents(settings_model, folder)
-        process_models = get_processes(settings_model, folder, commodity_models, agent_models)
-
-        return cls(
-            regions = region_models, 
-            available_years=year_models, 
-            commodities=commodity_models,
-            sectors = sector_models,
-            level_names=level_name_models,
-            timeslices = timeslice_models,
-            agents = agent_models,
-            processes = process_models,
-            run_model = RunModel.parse_obj(toml_out)
-        )
+        report('Reading agents', 0.2)
+        with span('get_agents'):
+            agent_models = get_agents(settings_model, folder)
+        with span('get_processes'):
+            process_models = get_processes(
+                settings_model, folder, commodity_models, agent_models,
+                progress=lambda stage, fraction: report(stage, 0.3 + 0.6 * fraction),
+            )
+
+        report('Building datastore', 0.9)
+        with span('build_datastore'):
+            return cls(
+                regions = region_models, 
+                available_years=year_models, 
+                commodities=commodity_models,
+                sectors = sector_models,
+                level_names=level_name_models,
+                timeslices = timeslice_models,
+                agents = agent_models,
+                processes = process_models,
+                run_model = RunModel.parse_obj(toml_out)
+            )
     
-    def export_to_folder(self, folder_path: str, results_path: Optional[str] = None) -> Tuple[Path, Path, Path]:
+    def export_to_folder(
+        self,
+        folder_path: str,
+        results_path: Optional[str] = None,
+        object_store: Optional[ObjectStore] = None
+    ) -> Tuple[Path, Path, Path]:
+        """Writes the model's settings.toml and CSVs, sharing identical files through object_store if given"""
+        with span('export_to_folder', folder=str(folder_path)):
+            # A snapshot keeps the export consistent if the model is edited meanwhile
+            with object_store.use() if object_store is not None else nullcontext():
+                paths = self.snapshot()._export_to_folder(folder_path, results_path)
+        self._export_path = Path(folder_path)
+        return paths
+
+    def _export_to_folder(self, folder_path: str, results_path: Optional[str] = None) -> Tuple[Path, Path, Path]:
+        from .exporters import export_commodities, export_projections, agents_to_dataframe, replace_path_prefix, generate_sectors, convert_timeslices
         if results_path is None:
             results_path = f"{folder_path}{os.sep}Results"
         folder_path_obj = Path(folder_path)
@@ -174,22 +357,26 @@ class Datastore:
         new_settings_path = Path(f'{folder_path}{os.sep}settings.toml')
         commodity_data = self._commodity_datastore._data
         
-        export_commodities(commodity_data, commodities_path)
+        with span('export_commodities'):
+            export_commodities(commodity_data, commodities_path)
         
-        export_projections(self, commodity_data, projections_path)
+        with span('export_projections'):
+            export_projections(self, commodity_data, projections_path)
 
         # generate agents file
-        agents_df = agents_to_dataframe(list(self._agent_datastore._data.values()))
-        agents_path = Path(f"{technodata_folder}{os.sep}Agents.csv")
-        agents_df.to_csv(agents_path, index=False)
+        with span('export_agents'):
+            agents_df = agents_to_dataframe(list(self._agent_datastore._data.values()))
+            agents_path = Path(f"{technodata_folder}{os.sep}Agents.csv")
+            write_csv(agents_df, agents_path, index=False)
         
         # Create sector folders:
-        new_sectors = generate_sectors(
-            self, 
-            technodata_folder, 
-            folder_path_obj, 
-            agents_path
-        )
+        with span('generate_sectors'):
+            new_sectors = generate_sectors(
+                self, 
+                technodata_folder, 
+                folder_path_obj, 
+                agents_path
+            )
 
 
         new_timeslices = convert_timeslices(self)
@@ -236,6 +423,6 @@ class Datastore:
             outputs=outputs
         )
 
-        with open(new_settings_path, 'w+' )as f:
-            toml.dump(new_settings_model.dict(),f)
+        with span('export_settings'):
+            write_text(new_settings_path, toml.dumps(new_settings_model.dict()))
         return new_settings_path, prices_path, capacity_path
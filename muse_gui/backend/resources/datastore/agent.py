@@ -25,10 +25,10 @@ class AgentDatastore(BaseDatastore[Agent]):
         sectors = []
         for sector in model.sectors:
             try:
-                sector = self._parent.sector.read(sector)
+                sector_model = self._parent.sector.read(sector)
             except KeyNotFound:
                 raise DependentNotFound(model, sector, self._parent.sector)
-            sectors.append(sector)
+            sectors.append(sector_model.name)
         return {
             'region': regions,
             'sector': sectors
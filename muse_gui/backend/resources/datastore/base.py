@@ -1,11 +1,47 @@
-from typing import Dict, Generic, List, TypeVar
-from muse_gui.backend.resources.datastore.exceptions import KeyAlreadyExists, KeyNotFound
+import copy
+import functools
+from dataclasses import dataclass
+from typing import Callable, Dict, Generic, List, Literal, Optional, TypeVar
+from muse_gui.backend.resources.datastore.exceptions import KeyAlreadyExists, KeyNotFound, ReadOnlyDatastore
 
 from muse_gui.backend.data.abstract import Data
+from .journal import JournalEntry
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from . import Datastore
 
+def _reads(method):
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        lock = self._parent._lock
+        lock.acquire_read()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_read()
+    return locked
+
+def _writes(method):
+    # Stores share their parent's lock, so cascades into other stores are
+    # part of the same write
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        lock = self._parent._lock
+        journal = self._parent._journal
+        lock.acquire_write()
+        try:
+            if journal is None:
+                return method(self, *args, **kwargs)
+            # Everything the outermost call changes is undone together
+            journal.begin()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                journal.end()
+        finally:
+            lock.release_write()
+    return locked
+
 def combine_dicts(model_store: List[Dict[str,List[str]]]) -> Dict[str,List[str]]:
     new_dict = {}
     for item in model_store:
@@ -18,33 +54,109 @@ def combine_dicts(model_store: List[Dict[str,List[str]]]) -> Dict[str,List[str]]
                 new_dict[attr_name] = values
     return new_dict
 
+@dataclass(frozen=True)
+class ChangeEvent:
+    store: "BaseDatastore"
+    action: Literal['create', 'update', 'delete']
+    key: str
+    # Version of the store after the change
+    version: int
+    # Key before the change if an update renamed the model
+    previous_key: Optional[str] = None
+
+ChangeCallback = Callable[[ChangeEvent], None]
+
 ModelType = TypeVar("ModelType", bound =Data)
 class BaseDatastore(Generic[ModelType]):
     _parent: "Datastore"
     _data: Dict[str, ModelType]
     _key_attr_name: str
+    _subscribers: List[ChangeCallback]
+    # Increases by one with every create, update and delete
+    version: int
+    # _data is shared with a snapshot and must be copied before writing
+    _shared: bool
+    _read_only: bool
     def __init__(self, parent: "Datastore", key_attr_name: str, data: List[ModelType] = []) -> None:
         self._parent = parent
         self._key_attr_name =key_attr_name
         self._data = {}
+        self._subscribers = []
+        self.version = 0
+        self._shared = False
+        self._read_only = False
         for item in data:
             self.create(item)
-    
-    def create(self, model: ModelType) -> ModelType:
+
+    def subscribe(self, callback: ChangeCallback) -> ChangeCallback:
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: ChangeCallback) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _snapshot(self, parent: "Datastore") -> "BaseDatastore[ModelType]":
+        # Models are replaced rather than modified, so sharing _data is
+        # enough; this store copies it on its next write.
+        snapshot = copy.copy(self)
+        snapshot._parent = parent
+        snapshot._subscribers = []
+        snapshot._read_only = True
+        self._shared = True
+        return snapshot
+
+    def _writable(self) -> None:
+        if self._read_only:
+            raise ReadOnlyDatastore(self)
+        if self._shared:
+            self._data = dict(self._data)
+            self._shared = False
+
+    def _changed(
+        self,
+        action: Literal['create', 'update', 'delete'],
+        key: str,
+        old: Optional[ModelType],
+        new: Optional[ModelType],
+        previous_key: Optional[str] = None
+    ) -> None:
+        self.version += 1
+        journal = self._parent._journal
+        if journal is not None:
+            journal.record(JournalEntry(self, action, key, old, new, previous_key))
+        parent_subscribers = self._parent._subscribers
+        if not self._subscribers and not parent_subscribers:
+            return
+        event = ChangeEvent(self, action, key, self.version, previous_key)
+        for callback in self._subscribers + parent_subscribers:
+            callback(event)
+
+    def _create(self, model: ModelType) -> str:
         key = str(getattr(model, self._key_attr_name))
         if key in self._data:
             raise KeyAlreadyExists(key, self)
         else:
             self.back_dependents(model)
+            self._writable()
             self._data[key] = model
-            return model
+            return key
+
+    @_writes
+    def create(self, model: ModelType) -> ModelType:
+        key = self._create(model)
+        self._changed('create', key, None, model)
+        return model
 
+    @_reads
     def read(self, key: str) -> ModelType:
         if key not in self._data:
             raise KeyNotFound(key, self)
         else:
             return self._data[key]
 
+    @_writes
     def update(self, existing_key: str, model: ModelType) -> ModelType:
         new_key = str(getattr(model, self._key_attr_name))
         if existing_key not in self._data:
@@ -54,13 +166,24 @@ class BaseDatastore(Generic[ModelType]):
             self.back_dependents(existing)
             self.back_dependents(model)
             if existing_key == new_key:
+                self._writable()
                 self._data[existing_key] = model
+                self._changed('update', new_key, existing, model)
             else:
-                self.create(model)
-                self.delete(existing_key)
+                self._create(model)
+                self._delete(existing_key)
+                self._changed('update', new_key, existing, model, existing_key)
             return model
 
+    @_writes
     def delete(self, key: str) -> None:
+        existing = self._delete(key)
+        self._changed('delete', key, existing, None)
+        return None
+
+    def _delete(self, key: str) -> ModelType:
+        if self._read_only:
+            raise ReadOnlyDatastore(self)
         existing = self.read(key)
         forward_deps = self.forward_dependents(existing)
         for attribute, keys in forward_deps.items():
@@ -70,9 +193,22 @@ class BaseDatastore(Generic[ModelType]):
                     relevant_method.delete(k)
                 except KeyNotFound:
                     pass
-        self._data.pop(key)
-        return None
+        self._writable()
+        return self._data.pop(key)
+
+    def _apply(self, action: str, key: str, model: Optional[ModelType] = None, previous_key: Optional[str] = None) -> None:
+        # Replays a journalled change as is: it was checked, and its cascades
+        # recorded, when it was first made
+        self._writable()
+        old = self._data.get(previous_key or key) if action != 'create' else None
+        # Like update, an edit keeps its place and a rename moves to the end
+        if action == 'delete' or previous_key is not None:
+            del self._data[previous_key or key]
+        if action != 'delete':
+            self._data[key] = model
+        self._changed(action, key, old, model, previous_key)
 
+    @_reads
     def list(self) -> List[str]:
         return list(self._data.keys())
 
@@ -81,6 +217,7 @@ class BaseDatastore(Generic[ModelType]):
     def forward_dependents(self, model: ModelType) -> Dict[str,List[str]]:
         return {}
     
+    @_reads
     def back_dependents_recursive(self, model: ModelType) -> Dict[str,List[str]]:
         model_store = []
         def get_model_back_deps(rel_object, item) -> None:
@@ -99,6 +236,7 @@ class BaseDatastore(Generic[ModelType]):
         combined = combine_dicts(model_store)
         return combined
 
+    @_reads
     def forward_dependents_recursive(self, model: ModelType) -> Dict[str,List[str]]:
         model_store = []
         def get_model_forward_deps(rel_object, item) -> None:
@@ -0,0 +1,113 @@
+"""
+Parsed CSV cache for imports.
+
+Models usually point several sectors at the same files (every exported
+sector shares technodata/Agents.csv), so while a ``csv_cache()`` block is
+active ``read_csv`` parses each file once and hands back the same frame.
+Entries are keyed by resolved path, modification time, size and the
+``pd.read_csv`` options, so an edited file is always re-read.
+
+With a ``persist_dir`` parsed frames are also pickled to disk and reused by
+later imports, e.g. when a model is reopened in a new session.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, int, int, str]
+
+
+class CsvCache:
+    def __init__(self, persist_dir: Optional[Union[str, Path]] = None) -> None:
+        self.persist_dir = Path(persist_dir) if persist_dir is not None else None
+        self._frames: Dict[CacheKey, pd.DataFrame] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(path: Union[str, Path], **kwargs: Any) -> CacheKey:
+        resolved = Path(path).resolve()
+        stat = resolved.stat()
+        return (str(resolved), stat.st_mtime_ns, stat.st_size, repr(sorted(kwargs.items())))
+
+    def read_csv(self, path: Union[str, Path], **kwargs: Any) -> pd.DataFrame:
+        """Parsed frame for ``path``, shared between callers so it must not be modified in place"""
+        key = self.key(path, **kwargs)
+        if key in self._frames:
+            self.hits += 1
+            return self._frames[key]
+        frame = self._load(key)
+        if frame is None:
+            self.misses += 1
+            frame = pd.read_csv(key[0], **kwargs)
+            self._store(key, frame)
+        else:
+            self.hits += 1
+        self._frames[key] = frame
+        return frame
+
+    def _persist_path(self, key: CacheKey) -> Optional[Path]:
+        if self.persist_dir is None:
+            return None
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return self.persist_dir / f'{digest}.pkl'
+
+    def _load(self, key: CacheKey) -> Optional[pd.DataFrame]:
+        persist_path = self._persist_path(key)
+        if persist_path is None or not persist_path.is_file():
+            return None
+        try:
+            return pd.read_pickle(persist_path)
+        except Exception:
+            logger.warning('Ignoring unreadable CSV cache entry %s', persist_path, exc_info=True)
+            return None
+
+    def _store(self, key: CacheKey, frame: pd.DataFrame) -> None:
+        persist_path = self._persist_path(key)
+        if persist_path is None:
+            return
+        try:
+            persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = persist_path.with_suffix(f'.{os.getpid()}.tmp')
+            frame.to_pickle(tmp_path, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, persist_path)
+        except OSError:
+            logger.warning('Could not write CSV cache entry %s', persist_path, exc_info=True)
+
+
+_local = threading.local()
+
+
+@contextmanager
+def csv_cache(persist_dir: Optional[Union[str, Path]] = None) -> Iterator[CsvCache]:
+    """
+    Caches ``read_csv`` for the duration of the block, reusing an enclosing cache if there is one.
+    Raises ValueError if the enclosing cache persists to a different folder than ``persist_dir``.
+    """
+    current: Optional[CsvCache] = getattr(_local, 'cache', None)
+    if current is not None:
+        if persist_dir is not None and (current.persist_dir is None or current.persist_dir.resolve() != Path(persist_dir).resolve()):
+            raise ValueError(f'csv_cache({persist_dir!r}) is nested in a cache persisting to {current.persist_dir}')
+        yield current
+        return
+    _local.cache = CsvCache(persist_dir)
+    try:
+        yield _local.cache
+    finally:
+        _local.cache = None
+
+
+def read_csv(path: Union[str, Path], **kwargs: Any) -> pd.DataFrame:
+    cache: Optional[CsvCache] = getattr(_local, 'cache', None)
+    if cache is None:
+        return pd.read_csv(path, **kwargs)
+    return cache.read_csv(path, **kwargs)
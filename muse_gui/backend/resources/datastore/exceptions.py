@@ -20,3 +20,11 @@ class DependentNotFound(ValueError):
 class LevelNameMismatch(ValueError):
     def __init__(self, level_names: List[str], provided_levels:List[str]) -> None:
         super().__init__(f"No of provided levels: {provided_levels} did not match level names {level_names}")
+
+class LoadCancelled(Exception):
+    def __init__(self, settings_path: str) -> None:
+        super().__init__(f"Loading {settings_path} was cancelled")
+
+class ReadOnlyDatastore(ValueError):
+    def __init__(self, datastore: "BaseDatastore") -> None:
+        super().__init__(f"{datastore.__class__.__name__} is a read-only snapshot")
@@ -3,6 +3,8 @@ from muse_gui.backend.data.agent import Agent, AgentData, AgentType
 from muse_gui.backend.data.process import CommodityFlow, Process
 from muse_gui.backend.data.sector import Sector
 from muse_gui.backend.utils import pack_timeslice, TimesliceInfo
+from muse_gui.backend.instrumentation import span
+from muse_gui.backend.object_store import write_csv, write_text
 from pathlib import Path
 import pandas as pd
 import os
@@ -75,27 +77,6 @@ def agents_to_dataframe(agents: List[Agent]) -> pd.DataFrame:
     agent_df = pd.DataFrame(agents_list, columns=headers)
     return agent_df
 
-def generate_empty_data_and_index(
-    processes: List[Process], 
-    region_time_level_combos: List[Tuple[str, int, str]], 
-    all_commodity_names: List[str]
-) -> Tuple[List[List[Union[str,float]]], List[List[str]]]:
-
-    empty_data = []
-    empty_data_index = []
-    for process in processes:
-        for region, time, level in region_time_level_combos:
-            initial_data: List[Union[str,float]] = [
-                process.name,
-                region,
-                time,
-                level
-            ]
-            commod_data: List[Union[str,float]] = [0.0]*len(all_commodity_names)
-            empty_data.append(initial_data+ commod_data)
-            empty_data_index.append(initial_data)
-    return empty_data, empty_data_index
-
 def export_commodities(commodity_data, commodities_path):
     commodities = [commodity.dict() for _, commodity in commodity_data.items()]
     # Export GlobalCommodities
@@ -120,53 +101,68 @@ def export_commodities(commodity_data, commodities_path):
             'unit': 'Unit'
         }
     )
-    new_commodity_dataframe.to_csv(commodities_path, index=False)
+    write_csv(new_commodity_dataframe, commodities_path, index=False)
 
 def export_projections(datastore: "Datastore", commodity_data, projections_path):
     #Export Projections
-    
-    # Make initial dataframe excluding commodity data
-
-    if len(datastore.commodity._data) ==0:
+    if len(commodity_data) ==0:
         raise NotImplementedError
-    else:
-        _, first_element = next(iter(commodity_data.items()))
-    prices = [price.dict() for price in first_element.commodity_prices]
-    projections_df = pd.DataFrame.from_records(data = prices, columns = ['region_name', 'time'])
-    projections_df['Attribute'] = ['CommodityPrice']*len(projections_df)
-    projections_df = projections_df[['region_name', 'Attribute', 'time']]
-
-    for _, commodity in datastore._commodity_datastore._data.items():
-        projections_df[commodity.commodity_name] = [price.value for price in commodity.commodity_prices]
+    commodities = list(commodity_data.values())
+
+    # Long format (region, time, commodity, value) pivoted on (region, time),
+    # so price lists don't need to share an order. Rows are in the order of
+    # the first commodity's prices
+    keys = ['RegionName', 'Time', 'commodity']
+    long_df = pd.DataFrame.from_records(
+        [
+            (price.region_name, price.time, commodity.commodity_name, price.value)
+            for commodity in commodities
+            for price in commodity.commodity_prices
+        ],
+        columns=keys + ['value']
+    ).drop_duplicates()
+    # A price listed twice is kept once, two different prices are an error
+    conflicts = long_df[long_df.duplicated(keys, keep=False)]
+    if not conflicts.empty:
+        region, time, commodity_name = conflicts.iloc[0][keys]
+        raise ValueError(f'{commodity_name} has more than one price for {region} in {time}')
+    row_order = pd.MultiIndex.from_frame(long_df[['RegionName', 'Time']].drop_duplicates())
+    projections_df = long_df.pivot(index=['RegionName', 'Time'], columns='commodity', values='value')
+    projections_df = projections_df.reindex(
+        index=row_order,
+        columns=[commodity.commodity_name for commodity in commodities]
+    ).reset_index()
+    projections_df.columns.name = None
+    projections_df.insert(1, 'Attribute', 'CommodityPrice')
 
     # Construct first row
-    first_row = ['Unit', '-',' Year'] + [commodity.price_unit for _, commodity in commodity_data.items()]
-    headers = list(projections_df)
-    new_dict = {header: [first_row[i]] for i, header in enumerate(headers)}
-    first_df = pd.DataFrame(new_dict)
-
-    projections_df = pd.concat([first_df, projections_df])
-    projections_df = projections_df.rename(
-        columns = {
-            'region_name': 'RegionName',
-            'time': 'Time'
-        }
-    )
-    projections_df.to_csv(projections_path, index=False)
+    first_row = ['Unit', '-',' Year'] + [commodity.price_unit for commodity in commodities]
+    first_df = pd.DataFrame([first_row], columns=projections_df.columns)
+
+    # Written separately so the price columns stay numeric
+    write_text(projections_path, first_df.to_csv(index=False) + projections_df.to_csv(index=False, header=False))
 
 comm_initial_headings = ['ProcessName','RegionName','Time','Level']
 
-def data_and_location(
-    datastore: "Datastore", 
-    index: List[List[str]], 
-    process: Process, 
-    commodity_flow: CommodityFlow,
-    all_commodity_names: List[str]
-) -> Tuple[float, int, int]:
-    row_index = index.index([process.name, commodity_flow.region, commodity_flow.timeslice, commodity_flow.level])
-    commod_model = datastore.commodity.read(commodity_flow.commodity)
-    col_index = len(comm_initial_headings)+ all_commodity_names.index(commod_model.commodity_name)
-    return commodity_flow.value, row_index, col_index
+def comm_flow_rows(
+    process: Process,
+    flows: List[CommodityFlow],
+    combo_order: Dict[Tuple[str, str, str], int],
+    commodity_columns: Dict[str, int],
+    n_commodities: int
+) -> List[List[Union[str,float]]]:
+    # One row per region/time/level the process is defined for, in the
+    # order of the sector-wide region x time x level product
+    combos = {(tech.region, tech.time, tech.level) for tech in process.technodatas}
+    combos.update((flow.region, flow.timeslice, flow.level) for flow in process.comm_in)
+    combos.update((flow.region, flow.timeslice, flow.level) for flow in process.comm_out)
+    rows: Dict[Tuple[str, str, str], List[Union[str,float]]] = {}
+    for combo in sorted(combos, key=combo_order.__getitem__):
+        region, time, level = combo
+        rows[combo] = [process.name, region, time, level] + [0.0]*n_commodities
+    for flow in flows:
+        rows[(flow.region, flow.timeslice, flow.level)][commodity_columns[flow.commodity]] = flow.value
+    return list(rows.values())
 
 def export_comm_in_and_out(
     datastore: "Datastore",
@@ -178,51 +174,42 @@ def export_comm_in_and_out(
 ) -> Tuple[Path, Path, List[str]]:
     comm_in_path = Path(f"{str(sector_path)}{os.sep}CommIn.csv")
     comm_out_path = Path(f"{str(sector_path)}{os.sep}CommOut.csv")
-    rel_regions = []
-    rel_times = []
-    rel_levels = []
+    rel_regions: Dict[str, None] = {}
+    rel_times: Dict[str, None] = {}
+    rel_levels: Dict[str, None] = {}
     for process in rel_processes:
-        for comm in process.comm_in:
-            if comm.region not in rel_regions:
-                rel_regions.append(comm.region)
-            if comm.timeslice not in rel_times:
-                rel_times.append(comm.timeslice)
-            if comm.level not in rel_levels:
-                rel_levels.append(comm.level)
-        for comm in process.comm_out:
-            if comm.region not in rel_regions:
-                rel_regions.append(comm.region)
-            if comm.timeslice not in rel_times:
-                rel_times.append(comm.timeslice)
-            if comm.level not in rel_levels:
-                rel_levels.append(comm.level)
+        for comm in process.comm_in + process.comm_out:
+            rel_regions.setdefault(comm.region)
+            rel_times.setdefault(comm.timeslice)
+            rel_levels.setdefault(comm.level)
         for tech in process.technodatas:
-            if tech.region not in rel_regions:
-                rel_regions.append(tech.region)
-            if tech.time not in rel_times:
-                rel_times.append(tech.time)
-            if tech.level not in rel_levels:
-                rel_levels.append(tech.level)
-    region_time_level_combos = list(product(rel_regions, rel_times, rel_levels))
-    comm_in_data,comm_in_data_index = generate_empty_data_and_index(rel_processes, region_time_level_combos, comm_names)
-    comm_out_data,comm_out_data_index = generate_empty_data_and_index(rel_processes, region_time_level_combos, comm_names)
-    
-    # Populate empty data
+            rel_regions.setdefault(tech.region)
+            rel_times.setdefault(tech.time)
+            rel_levels.setdefault(tech.level)
+    combo_order = {combo: i for i, combo in enumerate(product(rel_regions, rel_times, rel_levels))}
+
+    # Column of each commodity key, so flows are written without datastore lookups
+    name_columns = {name: len(comm_initial_headings) + i for i, name in enumerate(comm_names)}
+    commodity_columns = {
+        key: name_columns[commodity.commodity_name]
+        for key, commodity in datastore.commodity._data.items()
+        if commodity.commodity_name in name_columns
+    }
+
+    comm_in_data: List[List[Union[str,float]]] = []
+    comm_out_data: List[List[Union[str,float]]] = []
     for process in rel_processes:
-        for comm in process.comm_in:
-            v, i, j = data_and_location(datastore, comm_in_data_index, process, comm, comm_names)
-            comm_in_data[i][j] = v
-        for comm in process.comm_out:
-            v, i, j = data_and_location(datastore, comm_out_data_index, process, comm, comm_names)
-            comm_out_data[i][j] = v
+        comm_in_data += comm_flow_rows(process, process.comm_in, combo_order, commodity_columns, len(comm_names))
+        comm_out_data += comm_flow_rows(process, process.comm_out, combo_order, commodity_columns, len(comm_names))
+
     units: List[Union[str,float]] = ['Unit','-','Year', '-']+ comm_units #type:ignore
     comm_in_data.insert(0, units)
     comm_in_df = pd.DataFrame(comm_in_data, columns = comm_new_headers)
     comm_out_data.insert(0, units)
     comm_out_df = pd.DataFrame(comm_out_data, columns = comm_new_headers)
-    comm_in_df.to_csv(comm_in_path, index=False)
-    comm_out_df.to_csv(comm_out_path, index=False)
-    return comm_in_path, comm_out_path, rel_regions
+    write_csv(comm_in_df, comm_in_path, index=False)
+    write_csv(comm_out_df, comm_out_path, index=False)
+    return comm_in_path, comm_out_path, list(rel_regions)
 
 def export_technodata(
     rel_processes: List[Process], 
@@ -308,7 +295,7 @@ def export_technodata(
             data.append(row)
         
     df = pd.DataFrame(data, columns = technodata_headers)
-    df.to_csv(technodata_path, index= False)
+    write_csv(df, technodata_path, index= False)
 
 def export_existing_capacities(
     datastore: "Datastore",
@@ -336,7 +323,7 @@ def export_existing_capacities(
                 final_row: List[Union[str, float]] = [process.name,existing_capacity.region,process.capacity_unit] + row # type:ignore
         data.append(final_row)
     df = pd.DataFrame(data, columns = headers)
-    df.to_csv(existing_capacity_path, index = False)
+    write_csv(df, existing_capacity_path, index = False)
 
 def export_preset_consumption(
     datastore: "Datastore",
@@ -378,7 +365,7 @@ def export_preset_consumption(
     for year, data in data_dict.items():
         consumption_path = Path(f"{str(sector_path)}{os.sep}A{year}Consumption.csv")
         df = pd.DataFrame(data, columns = headers)
-        df.to_csv(consumption_path)
+        write_csv(df, consumption_path)
 
 def get_sector_details(
     datastore: "Datastore",
@@ -404,30 +391,34 @@ def get_sector_details(
 
         subsector_details['agents'] = replace_path_prefix(agents_path,folder_path_obj)
 
-        comm_in_path, comm_out_path, rel_regions = export_comm_in_and_out(
-            datastore,
-            rel_processes,
-            comm_names,
-            comm_units,
-            comm_new_headers,
-            sector_path
-        )
+        with span('export_comm_in_and_out'):
+            comm_in_path, comm_out_path, rel_regions = export_comm_in_and_out(
+                datastore,
+                rel_processes,
+                comm_names,
+                comm_units,
+                comm_new_headers,
+                sector_path
+            )
         sector_details['commodities_in'] = replace_path_prefix(comm_in_path, folder_path_obj)
         sector_details['commodities_out'] = replace_path_prefix(comm_out_path,folder_path_obj)
 
         technodata_path = Path(f"{str(sector_path)}{os.sep}Technodata.csv")
         sector_details['technodata'] = replace_path_prefix(technodata_path,folder_path_obj)
-        export_technodata(rel_processes, datastore, technodata_path)
+        with span('export_technodata'):
+            export_technodata(rel_processes, datastore, technodata_path)
 
         existing_capacity_path = Path(f"{str(sector_path)}{os.sep}ExistingCapacity.csv")
         subsector_details['existing_capacity'] = replace_path_prefix(existing_capacity_path,folder_path_obj)
-        export_existing_capacities(datastore, rel_regions, rel_processes, existing_capacity_path)
+        with span('export_existing_capacities'):
+            export_existing_capacities(datastore, rel_regions, rel_processes, existing_capacity_path)
 
         sector_details['subsectors'] = {'retro_and_new': subsector_details}
     elif sector.type == 'preset':
         sector_details['type'] = 'presets'
 
-        export_preset_consumption(datastore, rel_processes, comm_names, sector_path)
+        with span('export_preset_consumption'):
+            export_preset_consumption(datastore, rel_processes, comm_names, sector_path)
 
         sector_details['consumption_path'] = replace_path_prefix(sector_path, folder_path_obj)+f"{os.sep}*Consumption.csv"
     else:
@@ -446,16 +437,17 @@ def generate_sectors(
     comm_new_headers = comm_initial_headings + comm_names
     new_sectors = {}
     for sector_name, sector in datastore.sector._data.items():
-        new_sectors[sector_name] = get_sector_details(
-            datastore, 
-            sector, 
-            technodata_folder, 
-            folder_path_obj, 
-            agents_path, 
-            comm_names,
-            comm_units,
-            comm_new_headers
-        )
+        with span('export_sector', sector=sector_name):
+            new_sectors[sector_name] = get_sector_details(
+                datastore, 
+                sector, 
+                technodata_folder, 
+                folder_path_obj, 
+                agents_path, 
+                comm_names,
+                comm_units,
+                comm_new_headers
+            )
     return new_sectors
 
 def convert_timeslices(datastore):
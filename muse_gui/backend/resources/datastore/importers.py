@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 from muse_gui.backend.data.agent import Agent, AgentData, AgentObjective, AgentType
 from muse_gui.backend.data.process import Capacity, CommodityFlow, Cost, DemandFlow, Demand, ExistingCapacity, Process, Technodata, Utilisation, CapacityShare
@@ -14,6 +14,8 @@ import re
 
 import pandas as pd
 from muse_gui.backend.settings import SettingsModel
+from muse_gui.backend.instrumentation import span
+from .schemas import AGENTS, COMM_FLOW, CONSUMPTION, EXISTING_CAPACITY, TECHNODATA, CsvSchema, CsvTable, read_table
 import os
 import glob
 import math
@@ -24,8 +26,8 @@ def replace_path(folder_path:Path, current_path_string: Path) -> str:
     new_current = current_path_string.as_posix()
     return str(Path(re.sub(r"{path}", new_folder, new_current)))
 
-def path_string_to_dataframe(folder_path:Path, current_path_string: Path) -> pd.DataFrame:
-    return pd.read_csv(replace_path(folder_path, current_path_string))
+def path_string_to_table(folder_path:Path, current_path_string: Path, schema: CsvSchema) -> CsvTable:
+    return read_table(replace_path(folder_path, current_path_string), schema)
 
 def get_commodities_data(global_commodities_data, projections_data, unit_row) -> List[Commodity]:
     commodity_models = []
@@ -103,6 +105,21 @@ def get_objective(
     )
 
 
+def _get_commodity_flows(process_flows, commodity_models: List[Commodity]) -> List[CommodityFlow]:
+    # A row per region, time and level, as exported; zeros are not flows
+    return [
+        CommodityFlow(
+            commodity=commodity.commodity,
+            region = row['RegionName'],
+            timeslice = row['Time'],
+            level = row['Level'],
+            value = row[commodity.commodity_name]
+        )
+        for _, row in process_flows.iterrows()
+        for commodity in commodity_models if float(row[commodity.commodity_name]) !=0
+    ]
+
+
 def _get_technodatas(process_technodata, agent_models: List[Agent]) -> List[Technodata]:
     technodatas = []
     for i, technodata in process_technodata.iterrows():
@@ -187,7 +204,7 @@ def _get_demand_mapper(settings_model: SettingsModel, folder: Path, commodity_mo
                 year = int(reyear.group(1))
                 years.append(year)
 
-            consumption_dataframes = {years[i]: pd.read_csv(consumption_p) for i, consumption_p in enumerate(path_set)}
+            consumption_dataframes = {years[i]: read_table(consumption_p, CONSUMPTION).data for i, consumption_p in enumerate(path_set)}
 
             for year, consumption_df in consumption_dataframes.items():
                 process_names = consumption_df['ProcessName'].unique()
@@ -244,50 +261,65 @@ def _get_demand_mapper(settings_model: SettingsModel, folder: Path, commodity_mo
 
     return demand_mapper
 
-def get_agent_datas(agent_raw_data, agent_name) -> Tuple[Dict[str, AgentData], Dict[str, AgentData]]:
-    rel_data = agent_raw_data.query(f'Name == "{agent_name}"')
-    agent_new_datas: Dict[str, AgentData] = {}
-    agent_retrofit_datas: Dict[str, AgentData] = {}
-    for i, agent in rel_data.iterrows():
-        objective_1 = get_objective(
-            objective_type = agent['Objective1'],
-            objective_data = agent['ObjData1'],
-            objective_sort= agent['Objsort1']
-        )
-        assert objective_1 is not None
-        objective_2 = get_objective(
-            objective_type = agent['Objective2'],
-            objective_data = agent['ObjData2'],
-            objective_sort= agent['Objsort2']
-        )
-        objective_3 = get_objective(
-            objective_type = agent['Objective3'],
-            objective_data = agent['ObjData3'],
-            objective_sort= agent['Objsort3']
-        )
-        agent_data = AgentData(
-            num = agent.get('AgentNumber') if not is_nan_new(agent.get('AgentNumber')) else None,
-            objective_1 = objective_1,
-            objective_2 = objective_2,
-            objective_3 = objective_3,
-            budget = agent['Budget'],
-            share = agent['AgentShare'],
-            search_rule= agent['SearchRule'],
-            decision_method=agent['DecisionMethod'],
-            quantity = agent['Quantity'],
-            maturity_threshold = agent['MaturityThreshold']
-        )
+def agent_data_from_row(agent) -> AgentData:
+    objective_1 = get_objective(
+        objective_type = agent['Objective1'],
+        objective_data = agent['ObjData1'],
+        objective_sort= agent['Objsort1']
+    )
+    assert objective_1 is not None
+    objective_2 = get_objective(
+        objective_type = agent['Objective2'],
+        objective_data = agent['ObjData2'],
+        objective_sort= agent['Objsort2']
+    )
+    objective_3 = get_objective(
+        objective_type = agent['Objective3'],
+        objective_data = agent['ObjData3'],
+        objective_sort= agent['Objsort3']
+    )
+    return AgentData(
+        num = agent.get('AgentNumber') if not is_nan_new(agent.get('AgentNumber')) else None,
+        objective_1 = objective_1,
+        objective_2 = objective_2,
+        objective_3 = objective_3,
+        budget = agent['Budget'],
+        share = agent['AgentShare'],
+        search_rule= agent['SearchRule'],
+        decision_method=agent['DecisionMethod'],
+        quantity = agent['Quantity'],
+        maturity_threshold = agent['MaturityThreshold']
+    )
+
+AgentDatas = Tuple[Dict[str, AgentData], Dict[str, AgentData]]
+
+def get_agent_datas(agent_raw_data: pd.DataFrame) -> Dict[str, AgentDatas]:
+    """New and retrofit data by region for every agent name, in one pass over the table"""
+    agent_datas: Dict[str, AgentDatas] = {}
+    for agent in agent_raw_data.to_dict('records'):
+        agent_new_datas, agent_retrofit_datas = agent_datas.setdefault(agent['Name'], ({}, {}))
+        agent_data = agent_data_from_row(agent)
         if agent['Type'] == 'Retrofit':
             agent_retrofit_datas[agent['RegionName']] = agent_data
         elif agent['Type'] == 'New':
             agent_new_datas[agent['RegionName']] = agent_data
         else:
             raise ValueError
-    return agent_new_datas, agent_retrofit_datas
+    return agent_datas
+
+def _agent_fingerprint(agent_datas: AgentDatas) -> Tuple[Tuple[Tuple[str, str], ...], ...]:
+    # Hashable stand-in for comparing AgentData dicts between sectors
+    return tuple(
+        tuple(sorted((region, agent_data.json()) for region, agent_data in datas.items()))
+        for datas in agent_datas
+    )
 
 def get_agents(settings_model: SettingsModel, folder: Path) -> List[Agent]:
-    agent_models: List[Agent] = []
-    agent_name_index: List[str] = []
+    agents: Dict[str, AgentDatas] = {}
+    fingerprints: Dict[str, Tuple] = {}
+    agent_sectors: Dict[str, List[str]] = {}
+    # Agent files shared between sectors are only parsed once
+    parsed_files: Dict[str, Dict[str, Tuple[AgentDatas, Tuple]]] = {}
     for sector_name, sector in settings_model.sectors.items():
         if sector.type == 'default':
             if len(sector.subsectors) != 1:
@@ -295,138 +327,128 @@ def get_agents(settings_model: SettingsModel, folder: Path) -> List[Agent]:
             else:
                 subsector_name, subsector = next(iter(sector.subsectors.items()))
 
-            agent_raw_data = path_string_to_dataframe(folder, Path(subsector.agents))
-            agent_names = agent_raw_data['Name'].unique()
-            for agent_name in agent_names:
-                agent_new_datas, agent_retrofit_datas = get_agent_datas(agent_raw_data, agent_name)
-
-                if agent_name in agent_name_index:
-                    existing_agent_no = agent_name_index.index(agent_name)
-                    existing_agent = agent_models[existing_agent_no]
-                    if (
-                        agent_new_datas == existing_agent.new
-                    ) and (
-                        agent_retrofit_datas == existing_agent.retrofit
-                    ):
-                        new_agent = Agent(
-                            name= agent_name,
-                            sectors= [sector_name] + existing_agent.sectors,
-                            new = agent_new_datas,
-                            retrofit = agent_retrofit_datas
-                        )
-                        agent_models[existing_agent_no] = new_agent
-                    else:
+            agents_path = replace_path(folder, Path(subsector.agents))
+            if agents_path not in parsed_files:
+                with span('read_agents', sector=sector_name):
+                    agent_raw_data = path_string_to_table(folder, Path(subsector.agents), AGENTS).data
+                    parsed_files[agents_path] = {
+                        agent_name: (agent_datas, _agent_fingerprint(agent_datas))
+                        for agent_name, agent_datas in get_agent_datas(agent_raw_data).items()
+                    }
+
+            for agent_name, (agent_datas, fingerprint) in parsed_files[agents_path].items():
+                if agent_name in agents:
+                    if fingerprints[agent_name] != fingerprint:
                         raise RuntimeError(f'Multiple definitions found for AgentName {agent_name} ')
+                    agent_sectors[agent_name].append(sector_name)
                 else:
-                    new_agent = Agent(
-                        name= agent_name,
-                        sectors= [sector_name],
-                        new = agent_new_datas,
-                        retrofit = agent_retrofit_datas
-                    )
-                    agent_name_index.append(agent_name)
-                    agent_models.append(new_agent)
-    return agent_models
-
-def get_processes(settings_model: SettingsModel, folder: Path, commodity_models: List[Commodity], agent_models: List[Agent]) -> List[Process]:
-    demand_mapper = _get_demand_mapper(settings_model, folder, commodity_models)
+                    agents[agent_name] = agent_datas
+                    fingerprints[agent_name] = fingerprint
+                    agent_sectors[agent_name] = [sector_name]
+
+    return [
+        Agent(
+            name = agent_name,
+            # Most recently imported sector first
+            sectors = agent_sectors[agent_name][::-1],
+            new = agent_new_datas,
+            retrofit = agent_retrofit_datas
+        )
+        for agent_name, (agent_new_datas, agent_retrofit_datas) in agents.items()
+    ]
+
+# Called with a stage description and the fraction of the import done so far
+ProgressCallback = Callable[[str, float], None]
+
+def get_processes(
+    settings_model: SettingsModel,
+    folder: Path,
+    commodity_models: List[Commodity],
+    agent_models: List[Agent],
+    progress: Optional[ProgressCallback] = None,
+) -> List[Process]:
+    if progress is None:
+        progress = lambda stage, fraction: None
+    progress('Reading preset demands', 0.0)
+    with span('get_demand_mapper'):
+        demand_mapper = _get_demand_mapper(settings_model, folder, commodity_models)
     process_models: List[Process] = []
-    for sector_name, sector in settings_model.sectors.items():
-        if sector.type == 'default':
-            technodata_data = path_string_to_dataframe(folder, Path(sector.technodata))
-            technodata_data_without_unit = technodata_data.drop(0)
-            technodata_data_unit = technodata_data.loc[0]
-
-            comm_in_data = path_string_to_dataframe(folder, Path(sector.commodities_in))
-            comm_in_data_without_unit = comm_in_data.drop(0)
-            comm_in_data_unit = comm_in_data.loc[0]
-
-            comm_out_data = path_string_to_dataframe(folder, Path(sector.commodities_out))
-            comm_out_data_without_unit = comm_out_data.drop(0)
-            comm_out_data_unit = comm_out_data.loc[0]
+    n_sectors = len(settings_model.sectors)
+    for sector_index, (sector_name, sector) in enumerate(settings_model.sectors.items()):
+        progress(f'Importing {sector_name} processes', sector_index / n_sectors)
+        with span('import_sector', sector=sector_name):
+            if sector.type == 'default':
+                technodata_data_without_unit = path_string_to_table(folder, Path(sector.technodata), TECHNODATA).data
+                comm_in_data_without_unit = path_string_to_table(folder, Path(sector.commodities_in), COMM_FLOW).data
+                comm_out_data_without_unit = path_string_to_table(folder, Path(sector.commodities_out), COMM_FLOW).data
+
+                if len(sector.subsectors) != 1:
+                    raise ValueError('Only single subsector case supported')
+                else:
+                    subsector_name, subsector = next(iter(sector.subsectors.items()))
+
+
+                existing_cap_data = path_string_to_table(folder, Path(subsector.existing_capacity), EXISTING_CAPACITY).data
+                process_names = technodata_data_without_unit['ProcessName'].unique()
+                for process_index, process_name in enumerate(process_names):
+                    progress(f'Importing {sector_name} processes', (sector_index + process_index / len(process_names)) / n_sectors)
+
+                    process_technodata = technodata_data_without_unit.query(f'ProcessName == "{process_name}"')
+
+                    process_comm_in = comm_in_data_without_unit.query(f'ProcessName == "{process_name}"')
+                    assert len(process_comm_in) > 0
+                    process_comm_out = comm_out_data_without_unit.query(f'ProcessName == "{process_name}"')
+                    assert len(process_comm_out) > 0
+
+                    process_cap_data = existing_cap_data.query(f'ProcessName == "{process_name}"')
+
+                    technodatas = _get_technodatas(process_technodata, agent_models)
+                    example_process_technodata = process_technodata.iloc[0]
+
+                    cap_datas = []
+                    units = []
+                    for i, region_cap_data in process_cap_data.iterrows():
+                        region_name = region_cap_data['RegionName']
+                        unit = region_cap_data['Unit']
+                        units.append(unit)
+                        years = list(region_cap_data.keys()[3:])
+                        for year in years:
+                            cap_data = ExistingCapacity(
+                                region=region_name,
+                                year = year,
+                                value = region_cap_data[str(year)]
+                            )
+                            cap_datas.append(cap_data)
+                    cap_units = list(set(units))
+                    assert len(cap_units) ==1
+                    cap_unit = cap_units[0]
+                    if process_name in demand_mapper:
+                        demand_map = demand_mapper[process_name]
+                        assert len(demand_map) == 1
+                        preset_sector_name = list(demand_map.keys())[0]
+                        demands = demand_map[preset_sector_name]
+                    else:
+                        preset_sector_name = None
+                        demands = []
+
+                    process_model = Process(
+                        name = example_process_technodata['ProcessName'],
+                        sector = sector_name,
+                        preset_sector = preset_sector_name,
+                        fuel = example_process_technodata['Fuel'],
+                        end_use = example_process_technodata['EndUse'],
+                        type = example_process_technodata['Type'],
+                        technodatas = technodatas,
+                        comm_in=_get_commodity_flows(process_comm_in, commodity_models),
+                        comm_out=_get_commodity_flows(process_comm_out, commodity_models),
+                        demands=demands,
+                        existing_capacities=cap_datas,
+                        capacity_unit=cap_unit
+                    )
+                    process_models.append(process_model)
 
-            if len(sector.subsectors) != 1:
-                raise ValueError('Only single subsector case supported')
+            elif sector.type == 'presets':
+                pass
             else:
-                subsector_name, subsector = next(iter(sector.subsectors.items()))
-
-
-            existing_cap_data = path_string_to_dataframe(folder, Path(subsector.existing_capacity))
-            process_names = technodata_data_without_unit['ProcessName'].unique()
-            for process_name in process_names:
-
-                process_technodata = technodata_data_without_unit.query(f'ProcessName == "{process_name}"')
-
-                process_comm_in = comm_in_data_without_unit.query(f'ProcessName == "{process_name}"')
-                assert len(process_comm_in) == 1
-                process_comm_in = process_comm_in.iloc[0]
-                process_comm_out = comm_out_data_without_unit.query(f'ProcessName == "{process_name}"')
-                assert len(process_comm_out) == 1
-                process_comm_out = process_comm_out.iloc[0]
-
-                process_cap_data = existing_cap_data.query(f'ProcessName == "{process_name}"')
-
-                technodatas = _get_technodatas(process_technodata, agent_models)
-                example_process_technodata = process_technodata.iloc[0]
-
-                cap_datas = []
-                units = []
-                for i, region_cap_data in process_cap_data.iterrows():
-                    region_name = region_cap_data['RegionName']
-                    unit = region_cap_data['Unit']
-                    units.append(unit)
-                    years = list(region_cap_data.keys()[3:])
-                    for year in years:
-                        cap_data = ExistingCapacity(
-                            region=region_name,
-                            year = year,
-                            value = region_cap_data[str(year)]
-                        )
-                        cap_datas.append(cap_data)
-                cap_units = list(set(units))
-                assert len(cap_units) ==1
-                cap_unit = cap_units[0]
-                if process_name in demand_mapper:
-                    demand_map = demand_mapper[process_name]
-                    assert len(demand_map) == 1
-                    preset_sector_name = list(demand_map.keys())[0]
-                    demands = demand_map[preset_sector_name]
-                else:
-                    preset_sector_name = None
-                    demands = []
-
-                process_model = Process(
-                    name = example_process_technodata['ProcessName'],
-                    sector = sector_name,
-                    preset_sector = preset_sector_name,
-                    fuel = example_process_technodata['Fuel'],
-                    end_use = example_process_technodata['EndUse'],
-                    type = example_process_technodata['Type'],
-                    technodatas = technodatas,
-                    comm_in=[
-                        CommodityFlow(
-                            commodity=commodity.commodity,
-                            region = process_comm_in['RegionName'],
-                            timeslice = process_comm_in['Time'],
-                            level = process_comm_in['Level'],
-                            value = process_comm_in[commodity.commodity_name]
-                        ) for commodity in commodity_models if float(process_comm_in[commodity.commodity_name]) !=0],
-                    comm_out=[
-                        CommodityFlow(
-                            commodity=commodity.commodity,
-                            region = process_comm_out['RegionName'],
-                            timeslice = process_comm_out['Time'],
-                            level = process_comm_out['Level'],
-                            value = process_comm_out[commodity.commodity_name]
-                        ) for commodity in commodity_models if float(process_comm_out[commodity.commodity_name]) !=0],
-                    demands=demands,
-                    existing_capacities=cap_datas,
-                    capacity_unit=cap_unit
-                )
-                process_models.append(process_model)
-
-        elif sector.type == 'presets':
-            pass
-        else:
-            raise TypeError(f"Sector type {sector.type} not supported")
+                raise TypeError(f"Sector type {sector.type} not supported")
     return process_models
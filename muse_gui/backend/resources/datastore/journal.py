@@ -0,0 +1,102 @@
+"""
+Undo/redo history of datastore edits.
+
+Every create, update and delete is recorded as the models it replaced and
+the models that replaced them, which the stores share rather than copy.
+Everything written during one outermost store call, e.g. a delete and all
+the deletes it cascades to, or during a ``Datastore.transaction()``, is one
+step. Undoing a step replays the inverse of its changes in reverse order
+without validation or cascades, so it costs as much as the original change.
+Models brought back by an undo or redo, and renamed ones, go to the end of
+their store; edited ones keep their place.
+"""
+from collections import deque
+from typing import Deque, Iterable, List, NamedTuple, Optional
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from muse_gui.backend.data.abstract import Data
+    from .base import BaseDatastore
+
+# Number of steps that can be undone
+UNDO_HISTORY = 100
+
+
+class JournalEntry(NamedTuple):
+    store: "BaseDatastore"
+    action: str
+    key: str
+    old: Optional["Data"]
+    new: Optional["Data"]
+    # Key before a rename
+    previous_key: Optional[str] = None
+
+
+class Journal:
+    def __init__(self, max_size: int = UNDO_HISTORY) -> None:
+        self._undo: Deque[List[JournalEntry]] = deque(maxlen=max_size)
+        self._redo: Deque[List[JournalEntry]] = deque(maxlen=max_size)
+        self._pending: List[JournalEntry] = []
+        self._depth = 0
+        self._replaying = False
+
+    @property
+    def can_undo(self) -> bool:
+        return len(self._undo) > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return len(self._redo) > 0
+
+    def begin(self) -> None:
+        self._depth += 1
+
+    def end(self) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._pending:
+            self._undo.append(self._pending)
+            self._pending = []
+            self._redo.clear()
+
+    def record(self, entry: JournalEntry) -> None:
+        if not self._replaying:
+            self._pending.append(entry)
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+
+    def undo(self) -> bool:
+        if not self._undo:
+            return False
+        step = self._undo.pop()
+        self._replay(_inverse(entry) for entry in reversed(step))
+        self._redo.append(step)
+        return True
+
+    def redo(self) -> bool:
+        if not self._redo:
+            return False
+        step = self._redo.pop()
+        self._replay(step)
+        self._undo.append(step)
+        return True
+
+    def _replay(self, entries: Iterable[JournalEntry]) -> None:
+        self._replaying = True
+        try:
+            for entry in entries:
+                entry.store._apply(entry.action, entry.key, entry.new, entry.previous_key)
+        finally:
+            self._replaying = False
+
+
+def _inverse(entry: JournalEntry) -> JournalEntry:
+    if entry.action == 'create':
+        return JournalEntry(entry.store, 'delete', entry.key, entry.new, None)
+    if entry.action == 'delete':
+        return JournalEntry(entry.store, 'create', entry.key, None, entry.old)
+    if entry.previous_key is not None:
+        # Rename back
+        return JournalEntry(entry.store, 'update', entry.previous_key, entry.new, entry.old, entry.key)
+    return JournalEntry(entry.store, 'update', entry.key, entry.new, entry.old)
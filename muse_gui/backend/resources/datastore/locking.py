@@ -0,0 +1,89 @@
+"""
+Reader/writer lock shared by all the stores of a Datastore.
+
+Any number of threads may read at once; a write (including every store a
+delete cascades into) excludes readers and other writers. Both sides are
+reentrant, and the writing thread may also read, so store methods can call
+each other freely. A thread holding only a read lock cannot upgrade it.
+Waiting writers block new readers, so edits are not starved by a steady
+stream of reads.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class ReadWriteLock:
+    def __init__(self) -> None:
+        self._mutex = threading.Lock()
+        self._cond = threading.Condition(self._mutex)
+        # Read lock depth of each thread holding one
+        self._readers: Dict[int, int] = {}
+        self._writer: Optional[int] = None
+        self._write_depth = 0
+        self._writers_waiting = 0
+
+    # Reads are frequent, so they enter through the bare mutex and only
+    # notify when a writer is waiting for the last reader
+    def acquire_read(self) -> None:
+        me = threading.get_ident()
+        with self._mutex:
+            if self._writer != me and me not in self._readers:
+                while self._writer is not None or self._writers_waiting:
+                    self._cond.wait()
+            self._readers[me] = self._readers.get(me, 0) + 1
+
+    def release_read(self) -> None:
+        me = threading.get_ident()
+        with self._mutex:
+            depth = self._readers[me] - 1
+            if depth:
+                self._readers[me] = depth
+            else:
+                del self._readers[me]
+                if self._writers_waiting and not self._readers:
+                    self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError('A read lock cannot be upgraded to a write lock')
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            except BaseException:
+                # Let readers held back by this writer through
+                self._writers_waiting -= 1
+                self._cond.notify_all()
+                raise
+            self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._write_depth -= 1
+            if self._write_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -0,0 +1,134 @@
+"""
+Column types for each MUSE input CSV.
+
+Files with a unit row (Technodata, CommIn/CommOut, Projections) have it read
+separately, so the body is parsed straight to numbers instead of ``object``
+columns that have to be converted value by value. Columns that vary between
+models (commodities, agent shares, years) take the schema's ``extra_dtype``.
+"""
+import csv
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+from .csv_cache import read_csv
+
+STRING = 'str'
+FLOAT = 'float64'
+INFERRED = None
+
+# Header of the unnamed index column written by DataFrame.to_csv()
+INDEX_COLUMN = ''
+
+
+@dataclass(frozen=True)
+class CsvSchema:
+    name: str
+    # Required columns and their dtypes (INFERRED leaves it to pandas)
+    columns: Dict[str, Optional[str]]
+    # dtype of every other column, e.g. commodities or agent shares
+    extra_dtype: Optional[str] = FLOAT
+    unit_row: bool = False
+
+    @property
+    def required_columns(self) -> List[str]:
+        return list(self.columns)
+
+    def dtypes(self, header: List[str]) -> Dict[str, str]:
+        dtypes = {}
+        for column in header:
+            dtype = self.columns.get(column, self.extra_dtype)
+            if dtype is not None:
+                dtypes[column] = dtype
+        return dtypes
+
+
+@dataclass
+class CsvTable:
+    data: pd.DataFrame
+    # Unit of each column, empty if the file has no unit row
+    units: Dict[str, str] = field(default_factory=dict)
+
+
+TECHNODATA = CsvSchema(
+    'Technodata',
+    {
+        'ProcessName': STRING, 'RegionName': STRING, 'Time': STRING, 'Level': STRING,
+        'cap_par': FLOAT, 'cap_exp': FLOAT, 'fix_par': FLOAT, 'fix_exp': FLOAT, 'var_par': FLOAT, 'var_exp': FLOAT,
+        'MaxCapacityAddition': FLOAT, 'MaxCapacityGrowth': FLOAT, 'TotalCapacityLimit': FLOAT, 'TechnicalLife': FLOAT,
+        'UtilizationFactor': FLOAT, 'ScalingSize': FLOAT, 'efficiency': FLOAT, 'InterestRate': FLOAT,
+        'Type': STRING, 'Fuel': STRING, 'EndUse': STRING,
+    },
+    unit_row=True,
+)
+
+COMM_FLOW = CsvSchema(
+    'CommIn/CommOut',
+    {'ProcessName': STRING, 'RegionName': STRING, 'Time': STRING, 'Level': STRING},
+    unit_row=True,
+)
+
+EXISTING_CAPACITY = CsvSchema(
+    'ExistingCapacity',
+    {'ProcessName': STRING, 'RegionName': STRING, 'Unit': STRING},
+)
+
+AGENTS = CsvSchema(
+    'Agents',
+    {
+        'AgentShare': STRING, 'Name': STRING, 'RegionName': STRING,
+        'Objective1': STRING, 'Objective2': STRING, 'Objective3': STRING,
+        'ObjData1': FLOAT, 'ObjData2': FLOAT, 'ObjData3': FLOAT,
+        'Objsort1': INFERRED, 'Objsort2': INFERRED, 'Objsort3': INFERRED,
+        'SearchRule': STRING, 'DecisionMethod': STRING,
+        'Quantity': FLOAT, 'MaturityThreshold': FLOAT, 'Budget': FLOAT, 'Type': STRING,
+    },
+    # AgentNumber and anything unexpected
+    extra_dtype=INFERRED,
+)
+
+PROJECTIONS = CsvSchema(
+    'Projections',
+    {'RegionName': STRING, 'Attribute': STRING, 'Time': 'int64'},
+    unit_row=True,
+)
+
+GLOBAL_COMMODITIES = CsvSchema(
+    'GlobalCommodities',
+    {
+        'Commodity': STRING, 'CommodityType': STRING, 'CommodityName': STRING,
+        'CommodityEmissionFactor_CO2': FLOAT, 'HeatRate': FLOAT, 'Unit': STRING,
+    },
+)
+
+CONSUMPTION = CsvSchema(
+    'Consumption',
+    {'RegionName': STRING, 'ProcessName': STRING, 'Timeslice': STRING},
+)
+
+
+def read_header(path: Union[str, Path], unit_row: bool = False) -> List[List[str]]:
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        rows = [next(reader, [])]
+        if unit_row:
+            rows.append(next(reader, []))
+    return rows
+
+
+def read_table(path: Union[str, Path], schema: CsvSchema) -> CsvTable:
+    header_rows = read_header(path, schema.unit_row)
+    header = header_rows[0]
+    units = dict(zip(header, header_rows[1])) if schema.unit_row else {}
+    usecols = [column for column in header if column != INDEX_COLUMN]
+    data = read_csv(
+        path,
+        header=None,
+        names=header,
+        skiprows=len(header_rows),
+        usecols=usecols,
+        dtype=schema.dtypes(usecols),
+    )
+    return CsvTable(data, units)
@@ -0,0 +1,185 @@
+"""
+Name search over a datastore's keys.
+
+    index = SearchIndex(datastore.process, PROCESS_FACETS)
+    index.search('gas', sector='power')
+    index.query('gas sector:power')
+
+Keys are indexed by their lower-case trigrams, so a search only checks the
+keys that contain every trigram of the text. Facets map a model to the values
+it can be looked up by, e.g. a process's sector or regions. The index follows
+the store's change feed, so it stays up to date as models are created,
+renamed and deleted.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .base import BaseDatastore, ChangeEvent
+
+FacetFunc = Callable[..., Iterable[str]]
+
+PROCESS_FACETS: Dict[str, FacetFunc] = {
+    'sector': lambda process: [process.sector],
+    'region': lambda process: [t.region for t in process.technodatas],
+    'type': lambda process: [process.type],
+}
+
+AGENT_FACETS: Dict[str, FacetFunc] = {
+    'sector': lambda agent: agent.sectors,
+    'region': lambda agent: list(agent.new) + list(agent.retrofit),
+}
+
+COMMODITY_FACETS: Dict[str, FacetFunc] = {
+    'region': lambda commodity: [p.region_name for p in commodity.commodity_prices],
+    'type': lambda commodity: [commodity.commodity_type],
+}
+
+NGRAM = 3
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class SearchIndex:
+    def __init__(self, store: BaseDatastore, facets: Dict[str, FacetFunc] = {}) -> None:
+        self._store = store
+        self._facet_funcs = facets
+        # Lower-case key for every key, in store order
+        self._keys: Dict[str, str] = {}
+        # Position of each key in store order, for sorting small results
+        self._positions: Dict[str, int] = {}
+        self._next_position = 0
+        self._postings: Dict[str, Set[str]] = {}
+        self._facets: Dict[str, Dict[str, Set[str]]] = {name: {} for name in facets}
+        self._key_facets: Dict[str, Dict[str, Set[str]]] = {}
+        # Last search, refined when the next text extends it
+        self._last: Optional[Tuple[str, Tuple, int, List[str]]] = None
+        for key in store.list():
+            self._add(key)
+        store.subscribe(self._on_change)
+
+    def close(self) -> None:
+        self._store.unsubscribe(self._on_change)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _on_change(self, event: ChangeEvent) -> None:
+        if event.action == 'create':
+            self._add(event.key)
+        elif event.action == 'delete':
+            self._remove(event.key)
+        elif event.previous_key is not None:
+            # A renamed model moves to the end of its store
+            self._remove(event.previous_key)
+            self._add(event.key)
+        elif event.key in self._keys:
+            # An edited model keeps its key and place, only its facets change
+            self._remove_facets(event.key)
+            self._add_facets(event.key)
+        else:
+            self._add(event.key)
+
+    def _add(self, key: str) -> None:
+        lower = key.lower()
+        self._keys[key] = lower
+        self._positions[key] = self._next_position
+        self._next_position += 1
+        for gram in _ngrams(lower):
+            self._postings.setdefault(gram, set()).add(key)
+        self._add_facets(key)
+
+    def _add_facets(self, key: str) -> None:
+        if self._facet_funcs:
+            model = self._store.read(key)
+            key_facets = {
+                # Enums are indexed by their value
+                name: {str(getattr(value, 'value', value)).lower() for value in func(model)}
+                for name, func in self._facet_funcs.items()
+            }
+            for name, values in key_facets.items():
+                for value in values:
+                    self._facets[name].setdefault(value, set()).add(key)
+            self._key_facets[key] = key_facets
+
+    def _remove(self, key: str) -> None:
+        lower = self._keys.pop(key, None)
+        if lower is None:
+            return
+        del self._positions[key]
+        for gram in _ngrams(lower):
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+        self._remove_facets(key)
+
+    def _remove_facets(self, key: str) -> None:
+        for name, values in self._key_facets.pop(key, {}).items():
+            for value in values:
+                keys = self._facets[name].get(value)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._facets[name][value]
+
+    def facet_values(self, name: str) -> List[str]:
+        return sorted(self._facets[name])
+
+    def search(self, text: str = '', **facets: str) -> List[str]:
+        """Keys containing text (case-insensitive) with the given facet values, in store order"""
+        text = text.lower()
+        facet_key = tuple(sorted((name, str(value).lower()) for name, value in facets.items()))
+
+        if self._last is not None:
+            last_text, last_facet_key, last_version, last_results = self._last
+            if last_version == self._store.version and last_facet_key == facet_key:
+                if last_text == text:
+                    return list(last_results)
+                if last_text in text:
+                    # Matches for a longer text are a subset of the last matches
+                    results = [k for k in last_results if text in self._keys[k]]
+                    self._last = (text, facet_key, last_version, results)
+                    return list(results)
+
+        candidates: Optional[Set[str]] = None
+        for name, value in facet_key:
+            if name not in self._facets:
+                raise KeyError(f'{name} is not a facet of this index')
+            keys = self._facets[name].get(value, set())
+            candidates = keys if candidates is None else candidates & keys
+
+        if len(text) >= NGRAM:
+            postings = sorted(
+                (self._postings.get(gram, set()) for gram in _ngrams(text)),
+                key=len
+            )
+            for keys in postings:
+                candidates = keys if candidates is None else candidates & keys
+                if not candidates:
+                    break
+
+        if candidates is None:
+            results = [k for k, lower in self._keys.items() if text in lower]
+        elif len(candidates) * 8 > len(self._keys):
+            results = [k for k, lower in self._keys.items() if k in candidates and text in lower]
+        else:
+            results = sorted(
+                (k for k in candidates if text in self._keys[k]),
+                key=self._positions.__getitem__
+            )
+        self._last = (text, facet_key, self._store.version, results)
+        return list(results)
+
+    def query(self, query: str) -> List[str]:
+        """Searches a query string where name:value words select facets, e.g. 'gas sector:power'"""
+        words = []
+        facets = {}
+        for word in query.split():
+            name, sep, value = word.partition(':')
+            if sep and name.lower() in self._facets:
+                facets[name.lower()] = value
+            else:
+                words.append(word)
+        return self.search(' '.join(words), **facets)
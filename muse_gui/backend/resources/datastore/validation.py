@@ -0,0 +1,238 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+import glob
+import os
+
+import pandas as pd
+import toml
+from pydantic import ValidationError
+
+from muse_gui.backend.settings import SettingsModel
+from .importers import replace_path
+from .schemas import AGENTS, COMM_FLOW, CONSUMPTION, EXISTING_CAPACITY, GLOBAL_COMMODITIES, PROJECTIONS, TECHNODATA
+
+GLOBAL_COMMODITIES_COLUMNS = GLOBAL_COMMODITIES.required_columns
+PROJECTIONS_COLUMNS = PROJECTIONS.required_columns
+TECHNODATA_COLUMNS = TECHNODATA.required_columns
+COMM_FLOW_COLUMNS = COMM_FLOW.required_columns
+EXISTING_CAPACITY_COLUMNS = EXISTING_CAPACITY.required_columns
+AGENTS_COLUMNS = AGENTS.required_columns
+CONSUMPTION_COLUMNS = CONSUMPTION.required_columns
+
+# What pandas raises for a file that exists but is not a readable CSV
+_CSV_ERRORS = (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError, OSError)
+
+
+@dataclass
+class SettingsProblem:
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f'{self.path}: {self.message}'
+
+
+class _SettingsValidator:
+    """
+    Checks a settings.toml tree without building any models.
+
+    Only CSV headers and the handful of key columns needed for the
+    cross-file checks are read, and every problem found is collected
+    rather than stopping at the first one.
+    """
+    def __init__(self, settings_path: str) -> None:
+        self.settings_path = Path(settings_path)
+        self.folder = self.settings_path.parents[0].absolute()
+        self.problems: List[SettingsProblem] = []
+        self._headers: Dict[Path, Optional[List[str]]] = {}
+
+    def problem(self, path, message: str) -> None:
+        # Files shared between sectors (e.g. Agents.csv) are checked once per sector
+        problem = SettingsProblem(str(path), message)
+        if problem not in self.problems:
+            self.problems.append(problem)
+
+    def resolve(self, path_string: str) -> Path:
+        return Path(replace_path(self.folder, Path(path_string)))
+
+    def headers(self, path: Path) -> Optional[List[str]]:
+        if path not in self._headers:
+            if not path.is_file():
+                self.problem(path, 'file not found')
+                self._headers[path] = None
+            else:
+                try:
+                    self._headers[path] = list(pd.read_csv(path, nrows=0).columns)
+                except _CSV_ERRORS as e:
+                    self.problem(path, f'could not be read as CSV ({e})')
+                    self._headers[path] = None
+        return self._headers[path]
+
+    def require_columns(self, path: Path, columns: Iterable[str], what: str = 'column') -> Optional[List[str]]:
+        headers = self.headers(path)
+        if headers is None:
+            return None
+        missing = [c for c in columns if c not in headers]
+        if missing:
+            self.problem(path, f'missing {what}(s): {", ".join(missing)}')
+        return headers
+
+    def key_columns(self, path: Path, columns: List[str], unit_row: bool) -> Optional[pd.DataFrame]:
+        headers = self.headers(path)
+        if headers is None:
+            return None
+        present = [c for c in columns if c in headers]
+        if not present:
+            return None
+        try:
+            return pd.read_csv(
+                path,
+                usecols=present,
+                skiprows=[1] if unit_row else None,
+                dtype=str,
+                keep_default_na=False,
+            )
+        except _CSV_ERRORS as e:
+            # The header can parse even when a later row does not
+            self.problem(path, f'could not be read as CSV ({e})')
+            return None
+
+    def check_regions(self, path: Path, values: Iterable[str], known_regions: Optional[Set[str]]) -> None:
+        if known_regions is None:
+            return
+        unknown = sorted(set(values) - known_regions)
+        if unknown:
+            self.problem(path, f'regions not in projections: {", ".join(unknown)}')
+
+    def load_settings(self) -> Optional[SettingsModel]:
+        if not self.settings_path.is_file():
+            self.problem(self.settings_path, 'file not found')
+            return None
+        try:
+            toml_out = toml.load(self.settings_path)
+        except Exception as e:
+            self.problem(self.settings_path, f'invalid TOML ({e})')
+            return None
+        try:
+            return SettingsModel.parse_obj(toml_out)
+        except ValidationError as e:
+            for error in e.errors():
+                location = '.'.join(str(x) for x in error['loc'])
+                self.problem(self.settings_path, f'{location}: {error["msg"]}')
+            return None
+
+    def validate(self) -> List[SettingsProblem]:
+        settings_model = self.load_settings()
+        if settings_model is None:
+            return self.problems
+
+        # Global commodities
+        commodities_path = self.resolve(settings_model.global_input_files.global_commodities)
+        self.require_columns(commodities_path, GLOBAL_COMMODITIES_COLUMNS)
+        commodities = self.key_columns(commodities_path, ['CommodityName'], unit_row=False)
+        commodity_names: List[str] = []
+        if commodities is not None and 'CommodityName' in commodities:
+            commodity_names = list(commodities['CommodityName'])
+            duplicates = sorted(set(commodities['CommodityName'][commodities['CommodityName'].duplicated()]))
+            if duplicates:
+                self.problem(commodities_path, f'duplicate commodities: {", ".join(duplicates)}')
+
+        # Projections
+        projections_path = self.resolve(settings_model.global_input_files.projections)
+        self.require_columns(projections_path, PROJECTIONS_COLUMNS)
+        self.require_columns(projections_path, commodity_names, 'commodity column')
+        projections = self.key_columns(projections_path, ['RegionName'], unit_row=True)
+        known_regions: Optional[Set[str]] = None
+        if projections is not None:
+            known_regions = set(projections['RegionName'])
+            self.check_regions(self.settings_path, settings_model.regions, known_regions)
+
+        for sector_name, sector in settings_model.sectors.items():
+            if sector.type == 'default':
+                self.validate_standard_sector(sector_name, sector, commodity_names, known_regions)
+            elif sector.type == 'presets':
+                self.validate_preset_sector(sector_name, sector, commodity_names, known_regions)
+            else:
+                self.problem(self.settings_path, f'sectors.{sector_name}: sector type {sector.type} not supported')
+        return self.problems
+
+    def validate_standard_sector(self, sector_name, sector, commodity_names: List[str], known_regions: Optional[Set[str]]) -> None:
+        if len(sector.subsectors) != 1:
+            self.problem(self.settings_path, f'sectors.{sector_name}: only single subsector case supported')
+            return
+        _, subsector = next(iter(sector.subsectors.items()))
+
+        # Agents
+        agents_path = self.resolve(subsector.agents)
+        self.require_columns(agents_path, AGENTS_COLUMNS)
+        agents = self.key_columns(agents_path, ['AgentShare', 'RegionName', 'Type'], unit_row=False)
+        agent_shares: List[str] = []
+        if agents is not None:
+            if 'RegionName' in agents:
+                self.check_regions(agents_path, agents['RegionName'], known_regions)
+            if 'Type' in agents:
+                bad_types = sorted(set(agents['Type']) - {'New', 'Retrofit'})
+                if bad_types:
+                    self.problem(agents_path, f'unknown agent types: {", ".join(bad_types)}')
+            if 'AgentShare' in agents:
+                agent_shares = list(dict.fromkeys(agents['AgentShare']))
+
+        # Technodata
+        technodata_path = self.resolve(sector.technodata)
+        self.require_columns(technodata_path, TECHNODATA_COLUMNS)
+        self.require_columns(technodata_path, agent_shares, 'agent share column')
+        technodata = self.key_columns(technodata_path, ['ProcessName', 'RegionName'], unit_row=True)
+        processes: List[str] = []
+        if technodata is not None:
+            if 'RegionName' in technodata:
+                self.check_regions(technodata_path, technodata['RegionName'], known_regions)
+            if 'ProcessName' in technodata:
+                processes = list(dict.fromkeys(technodata['ProcessName']))
+
+        # CommIn / CommOut
+        for flow_path_string in [sector.commodities_in, sector.commodities_out]:
+            flow_path = self.resolve(flow_path_string)
+            self.require_columns(flow_path, COMM_FLOW_COLUMNS)
+            self.require_columns(flow_path, commodity_names, 'commodity column')
+            flows = self.key_columns(flow_path, ['ProcessName', 'RegionName'], unit_row=True)
+            if flows is None or 'ProcessName' not in flows:
+                continue
+            if 'RegionName' in flows:
+                self.check_regions(flow_path, flows['RegionName'], known_regions)
+            counts = flows['ProcessName'].value_counts()
+            missing = [p for p in processes if p not in counts.index]
+            if missing:
+                self.problem(flow_path, f'no rows for processes: {", ".join(missing)}')
+            repeated = [p for p in processes if counts.get(p, 0) > 1]
+            if repeated:
+                self.problem(flow_path, f'more than one row for processes: {", ".join(repeated)}')
+
+        # Existing capacity
+        existing_capacity_path = self.resolve(subsector.existing_capacity)
+        self.require_columns(existing_capacity_path, EXISTING_CAPACITY_COLUMNS)
+        existing_capacity = self.key_columns(existing_capacity_path, ['ProcessName', 'RegionName'], unit_row=False)
+        if existing_capacity is not None and 'ProcessName' in existing_capacity:
+            if 'RegionName' in existing_capacity:
+                self.check_regions(existing_capacity_path, existing_capacity['RegionName'], known_regions)
+            capacity_processes = set(existing_capacity['ProcessName'])
+            missing = [p for p in processes if p not in capacity_processes]
+            if missing:
+                self.problem(existing_capacity_path, f'no rows for processes: {", ".join(missing)}')
+
+    def validate_preset_sector(self, sector_name, sector, commodity_names: List[str], known_regions: Optional[Set[str]]) -> None:
+        split_path = sector.consumption_path.split(os.sep)
+        preset_folder = self.resolve(os.sep.join(split_path[:-1]))
+        paths = [Path(p) for p in glob.glob(os.path.join(str(preset_folder), split_path[-1]))]
+        if len(paths) == 0:
+            self.problem(self.settings_path, f'sectors.{sector_name}: no files match {sector.consumption_path}')
+        for path in paths:
+            self.require_columns(path, CONSUMPTION_COLUMNS)
+            self.require_columns(path, commodity_names, 'commodity column')
+            consumption = self.key_columns(path, ['RegionName'], unit_row=False)
+            if consumption is not None:
+                self.check_regions(path, consumption['RegionName'], known_regions)
+
+
+def validate_settings(settings_path: str) -> List[SettingsProblem]:
+    return _SettingsValidator(settings_path).validate()
@@ -0,0 +1,137 @@
+"""
+Lazy reader of MUSE's per-sector result files.
+
+    dataset = ResultsDataset('Output/Results')
+    dataset.quantities()                     # ['capacity', 'supply']
+    frame = dataset.read('capacity', sector='power', step=[2020, 2025], columns=['technology', 'capacity'])
+
+MUSE writes ``<Sector>/<Quantity>/<step>.csv`` for every sector, quantity and
+time step of a run. The folder layout is listed once and nothing is parsed
+until a quantity is read. Only the files of the selected sectors and steps
+are opened, and only the selected columns are parsed. ``sector`` and
+``step``, the year in a file's name, come from the layout rather than the
+files. Sector and quantity names are lower case, as in MCACapacity.csv.
+"""
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Collection, Iterator, List, Optional, Sequence, Union
+
+from .instrumentation import span
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+Filter = Union[None, str, int, Collection[Union[str, int]]]
+
+PARTITION_COLUMNS = ['sector', 'step']
+
+
+@dataclass(frozen=True)
+class ResultPartition:
+    sector: str
+    quantity: str
+    step: int
+    path: Path
+
+
+def _matches(value: Union[str, int], selected: Filter) -> bool:
+    if selected is None:
+        return True
+    if isinstance(selected, (str, int)):
+        selected = [selected]
+    if isinstance(value, str):
+        return value in {str(s).lower() for s in selected}
+    return value in selected
+
+
+def _subfolders(folder: Union[str, Path]) -> List[os.DirEntry]:
+    with os.scandir(folder) as entries:
+        return sorted((entry for entry in entries if entry.is_dir()), key=lambda entry: entry.name)
+
+
+class ResultsDataset:
+    def __init__(self, folder: Union[str, Path]) -> None:
+        self.folder = Path(folder)
+        self._partitions: Optional[List[ResultPartition]] = None
+
+    @property
+    def partitions(self) -> List[ResultPartition]:
+        if self._partitions is None:
+            partitions = []
+            for sector in _subfolders(self.folder):
+                for quantity in _subfolders(sector.path):
+                    with os.scandir(quantity.path) as entries:
+                        for entry in entries:
+                            stem, suffix = os.path.splitext(entry.name)
+                            if suffix == '.csv' and stem.isdigit() and entry.is_file():
+                                partitions.append(ResultPartition(
+                                    sector.name.lower(), quantity.name.lower(), int(stem), Path(entry.path)
+                                ))
+            self._partitions = sorted(partitions, key=lambda p: (p.sector, p.quantity, p.step))
+        return self._partitions
+
+    def sectors(self) -> List[str]:
+        return sorted({partition.sector for partition in self.partitions})
+
+    def quantities(self) -> List[str]:
+        return sorted({partition.quantity for partition in self.partitions})
+
+    def steps(self, quantity: Optional[str] = None) -> List[int]:
+        return sorted({
+            partition.step for partition in self.partitions
+            if quantity is None or partition.quantity == quantity.lower()
+        })
+
+    def select(self, quantity: str, sector: Filter = None, step: Filter = None) -> List[ResultPartition]:
+        """Files of a quantity in the selected sectors and steps"""
+        return [
+            partition for partition in self.partitions
+            if partition.quantity == quantity.lower() and _matches(partition.sector, sector) and _matches(partition.step, step)
+        ]
+
+    def columns(self, quantity: str) -> List[str]:
+        """Columns of a quantity's files, read from the header of the first one"""
+        import pandas as pd
+
+        partitions = self.select(quantity)
+        if not partitions:
+            return []
+        return PARTITION_COLUMNS + [c for c in pd.read_csv(partitions[0].path, nrows=0).columns if c not in PARTITION_COLUMNS]
+
+    def scan(
+        self,
+        quantity: str,
+        sector: Filter = None,
+        step: Filter = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Iterator["pd.DataFrame"]:
+        """Frames of the selected files, one at a time, with the selected columns in that order"""
+        import pandas as pd
+
+        for partition in self.select(quantity, sector, step):
+            with span('scan_results', sector=partition.sector, quantity=partition.quantity, step=partition.step):
+                frame = pd.read_csv(
+                    partition.path,
+                    usecols=lambda column: column not in PARTITION_COLUMNS and (columns is None or column in columns),
+                )
+                frame.insert(0, 'step', partition.step)
+                frame.insert(0, 'sector', partition.sector)
+                if columns is not None:
+                    # Columns a file lacks are left empty rather than failing
+                    frame = frame.reindex(columns=list(columns))
+            yield frame
+
+    def read(
+        self,
+        quantity: str,
+        sector: Filter = None,
+        step: Filter = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> "pd.DataFrame":
+        import pandas as pd
+
+        frames = list(self.scan(quantity, sector, step, columns))
+        if not frames:
+            return pd.DataFrame(columns=list(columns) if columns is not None else self.columns(quantity))
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,302 @@
+"""
+SQLite database of MUSE results, for querying many runs at once.
+
+    results = ResultsDB('runs/results.sqlite')
+    run = results.ingest('Output/Results/MCAPrices.csv', 'Output/Results/MCACapacity.csv', label='baseline')
+    capacity = results.capacity(region='R1', sector=['power', 'gas'], year=range(2020, 2031))
+
+Ingesting a run copies its ``MCACapacity.csv`` and ``MCAPrices.csv`` and the
+per-sector ``<Sector>/<Quantity>/<year>.csv`` files next to them into indexed
+tables, so filtered queries across runs do not parse any CSV. A run is known
+by its capacity file: ingesting it again replaces its rows if the files have
+changed and does nothing otherwise.
+
+Filters take a value or a collection of values. Every query returns a
+DataFrame with the columns of the CSVs it came from and a ``run`` column.
+"""
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .instrumentation import span
+from .results_dataset import Filter, ResultsDataset
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Seconds a writer waits for another to finish
+BUSY_TIMEOUT = 30.0
+
+CAPACITY_COLUMNS = ['technology', 'region', 'agent', 'type', 'sector', 'capacity', 'year']
+PRICES_COLUMNS = ['timeslice', 'commodity', 'region', 'prices', 'year']
+# Columns kept from per-sector files; their value is in the column named after the quantity
+SECTOR_COLUMNS = ['commodity', 'year', 'asset', 'region', 'technology', 'installed']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL DEFAULT '',
+    results_path TEXT NOT NULL UNIQUE,
+    prices_path TEXT NOT NULL,
+    capacity_path TEXT NOT NULL,
+    settings_path TEXT,
+    ingested REAL NOT NULL,
+    signature TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS capacity (
+    run INTEGER NOT NULL,
+    technology TEXT, region TEXT, agent TEXT, type TEXT, sector TEXT, capacity REAL, year INTEGER
+);
+CREATE TABLE IF NOT EXISTS prices (
+    run INTEGER NOT NULL,
+    timeslice TEXT, commodity TEXT, region TEXT, prices REAL, year INTEGER
+);
+CREATE TABLE IF NOT EXISTS sector_results (
+    run INTEGER NOT NULL, sector TEXT NOT NULL, quantity TEXT NOT NULL, step INTEGER NOT NULL,
+    commodity TEXT, year INTEGER, asset INTEGER, region TEXT, technology TEXT, installed INTEGER, value REAL
+);
+CREATE INDEX IF NOT EXISTS capacity_run ON capacity (run, sector, region, agent);
+CREATE INDEX IF NOT EXISTS capacity_region ON capacity (region, year);
+CREATE INDEX IF NOT EXISTS capacity_agent ON capacity (agent, year);
+CREATE INDEX IF NOT EXISTS capacity_sector ON capacity (sector, year);
+CREATE INDEX IF NOT EXISTS capacity_technology ON capacity (technology, year);
+CREATE INDEX IF NOT EXISTS capacity_year ON capacity (year);
+CREATE INDEX IF NOT EXISTS prices_run ON prices (run, region, commodity);
+CREATE INDEX IF NOT EXISTS prices_region ON prices (region, year);
+CREATE INDEX IF NOT EXISTS prices_commodity ON prices (commodity, year);
+CREATE INDEX IF NOT EXISTS prices_year ON prices (year);
+CREATE INDEX IF NOT EXISTS sector_results_run ON sector_results (run, quantity, sector, step);
+CREATE INDEX IF NOT EXISTS sector_results_quantity ON sector_results (quantity, sector, region, year);
+CREATE INDEX IF NOT EXISTS sector_results_technology ON sector_results (technology, year);
+CREATE INDEX IF NOT EXISTS sector_results_commodity ON sector_results (commodity, year);
+"""
+
+
+@dataclass(frozen=True)
+class ResultsRun:
+    id: int
+    label: str
+    results_path: str
+    prices_path: str
+    capacity_path: str
+    settings_path: Optional[str]
+    ingested: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _signature(paths: List[Path]) -> str:
+    stats = [path.stat() for path in paths]
+    return ';'.join(f'{path.name}:{stat.st_size}:{stat.st_mtime_ns}' for path, stat in zip(paths, stats))
+
+
+def _where(filters: Dict[str, Filter]) -> Tuple[str, List[Any]]:
+    clauses = []
+    params: List[Any] = []
+    for column, value in filters.items():
+        if value is None:
+            continue
+        if isinstance(value, (str, int)):
+            clauses.append(f'{column} = ?')
+            params.append(value)
+        else:
+            values = list(value)
+            clauses.append(f'{column} IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+class ResultsDB:
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            # Readers are not blocked while a run is ingested
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per call, so threads of a RunQueue can share the database
+        connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT)
+        # Safe with WAL: a crash may lose the last ingest, never corrupt the file
+        connection.execute('PRAGMA synchronous=NORMAL')
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def runs(self) -> List[ResultsRun]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                'SELECT id, label, results_path, prices_path, capacity_path, settings_path, ingested FROM runs ORDER BY id'
+            ).fetchall()
+        return [ResultsRun(*row) for row in rows]
+
+    def get(self, run_id: int) -> ResultsRun:
+        for run in self.runs():
+            if run.id == run_id:
+                return run
+        raise KeyError(run_id)
+
+    def find(self, capacity_path: Union[str, Path]) -> Optional[ResultsRun]:
+        """The run ingested from capacity_path's folder, if any"""
+        results_path = str(Path(capacity_path).absolute().parent)
+        for run in self.runs():
+            if run.results_path == results_path:
+                return run
+        return None
+
+    def ingest(
+        self,
+        prices_path: Union[str, Path],
+        capacity_path: Union[str, Path],
+        label: Optional[str] = None,
+        settings_path: Optional[Union[str, Path]] = None,
+    ) -> int:
+        """Adds or refreshes the run whose results are in capacity_path's folder. Returns its id
+
+        Without a label, a run ingested before keeps its label.
+        """
+        import pandas as pd
+
+        prices_path = Path(prices_path).absolute()
+        capacity_path = Path(capacity_path).absolute()
+        results_path = capacity_path.parent
+        dataset = ResultsDataset(results_path)
+        signature = _signature([prices_path, capacity_path] + [partition.path for partition in dataset.partitions])
+        with self._connect() as connection:
+            existing = connection.execute(
+                'SELECT id, signature, label FROM runs WHERE results_path = ?', (str(results_path),)
+            ).fetchone()
+        if existing is not None and existing[1] == signature:
+            if label is not None and label != existing[2]:
+                with self._connect() as connection:
+                    connection.execute('UPDATE runs SET label = ? WHERE id = ?', (label, existing[0]))
+            return existing[0]
+
+        with span('results_ingest', results=str(results_path), sector_files=len(dataset.partitions)):
+            # Parsed before the write transaction, so readers wait as little as possible
+            capacity = pd.read_csv(capacity_path, usecols=CAPACITY_COLUMNS)[CAPACITY_COLUMNS]
+            prices = pd.read_csv(prices_path, usecols=PRICES_COLUMNS)[PRICES_COLUMNS]
+            sectors = []
+            for quantity in dataset.quantities():
+                for frame in dataset.scan(quantity, columns=['sector', 'step'] + SECTOR_COLUMNS + [quantity]):
+                    frame.insert(1, 'quantity', quantity)
+                    sectors.append(frame)
+
+            with self._connect() as connection:
+                # Looked up again under the write lock, as another thread or
+                # process may have ingested the folder meanwhile
+                connection.execute('BEGIN IMMEDIATE')
+                existing = connection.execute(
+                    'SELECT id, signature, label FROM runs WHERE results_path = ?', (str(results_path),)
+                ).fetchone()
+                if existing is not None and existing[1] == signature:
+                    if label is not None and label != existing[2]:
+                        connection.execute('UPDATE runs SET label = ? WHERE id = ?', (label, existing[0]))
+                    return existing[0]
+                if label is None:
+                    label = '' if existing is None else existing[2]
+                values = (
+                    label, str(prices_path), str(capacity_path),
+                    None if settings_path is None else str(Path(settings_path).absolute()),
+                    time.time(), signature,
+                )
+                if existing is None:
+                    run_id = connection.execute(
+                        'INSERT INTO runs (label, prices_path, capacity_path, settings_path, ingested, signature, results_path)'
+                        ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        values + (str(results_path),),
+                    ).lastrowid
+                else:
+                    run_id = existing[0]
+                    self._delete_rows(connection, run_id)
+                    connection.execute(
+                        'UPDATE runs SET label = ?, prices_path = ?, capacity_path = ?, settings_path = ?,'
+                        ' ingested = ?, signature = ? WHERE id = ?',
+                        values + (run_id,),
+                    )
+                self._insert(connection, 'capacity', run_id, capacity)
+                self._insert(connection, 'prices', run_id, prices)
+                for frame in sectors:
+                    self._insert(connection, 'sector_results', run_id, frame)
+        return run_id
+
+    def _insert(self, connection: sqlite3.Connection, table: str, run_id: int, frame: "pd.DataFrame") -> None:
+        # None rather than NaN, so missing values are NULL
+        frame = frame.astype(object).where(frame.notna(), None)
+        placeholders = ', '.join('?' * (len(frame.columns) + 1))
+        connection.executemany(
+            f'INSERT INTO {table} VALUES ({placeholders})',
+            ((run_id,) + row for row in frame.itertuples(index=False, name=None)),
+        )
+
+    @staticmethod
+    def _delete_rows(connection: sqlite3.Connection, run_id: int) -> None:
+        for table in ['capacity', 'prices', 'sector_results']:
+            connection.execute(f'DELETE FROM {table} WHERE run = ?', (run_id,))
+
+    def remove(self, run_id: int) -> None:
+        with self._connect() as connection:
+            self._delete_rows(connection, run_id)
+            if connection.execute('DELETE FROM runs WHERE id = ?', (run_id,)).rowcount == 0:
+                raise KeyError(run_id)
+
+    def _query(self, table: str, columns: List[str], filters: Dict[str, Filter]) -> "pd.DataFrame":
+        import pandas as pd
+
+        where, params = _where(filters)
+        with span('results_query', table=table), self._connect() as connection:
+            return pd.read_sql_query(f'SELECT run, {", ".join(columns)} FROM {table}{where}', connection, params=params)
+
+    def capacity(
+        self,
+        run: Filter = None,
+        region: Filter = None,
+        agent: Filter = None,
+        sector: Filter = None,
+        technology: Filter = None,
+        year: Filter = None,
+    ) -> "pd.DataFrame":
+        """Rows of MCACapacity.csv"""
+        return self._query('capacity', CAPACITY_COLUMNS, dict(
+            run=run, region=region, agent=agent, sector=sector, technology=technology, year=year
+        ))
+
+    def prices(
+        self,
+        run: Filter = None,
+        region: Filter = None,
+        commodity: Filter = None,
+        year: Filter = None,
+    ) -> "pd.DataFrame":
+        """Rows of MCAPrices.csv"""
+        return self._query('prices', PRICES_COLUMNS, dict(run=run, region=region, commodity=commodity, year=year))
+
+    def sector_results(
+        self,
+        quantity: str,
+        run: Filter = None,
+        sector: Filter = None,
+        step: Filter = None,
+        region: Filter = None,
+        technology: Filter = None,
+        commodity: Filter = None,
+        year: Filter = None,
+    ) -> "pd.DataFrame":
+        """Rows of <Sector>/<Quantity>/<step>.csv files, with the quantity in a column named after it"""
+        frame = self._query(
+            'sector_results',
+            ['sector', 'step'] + SECTOR_COLUMNS + ['value'],
+            dict(
+                quantity=quantity.lower(), run=run, sector=sector, step=step,
+                region=region, technology=technology, commodity=commodity, year=year,
+            ),
+        )
+        return frame.rename(columns={'value': quantity.lower()})
@@ -0,0 +1,352 @@
+"""
+Persistent queue of MUSE runs, solved by a local pool of workers.
+
+    queue = RunQueue(default_run_dir(), PoolConfig(workers=2, cpus=(0, 1, 2, 3)))
+    job = datastore.queue_run(queue, label='high demand')
+    queue.start()
+    queue.wait()
+
+The queue is kept in ``queue.json`` in its folder and nowhere else: every
+change re-reads the file under a lock, so the GUI and ``muse-gui queue``
+commands can share one queue, and queued and finished jobs survive restarts.
+Each pool slot solves its jobs with its own executor (by default a
+SolverWorker), pinned to its share of ``cpus`` and limited to
+``memory_limit`` bytes. Running jobs get a
+heartbeat; one whose heartbeat stops, e.g. because the app was closed
+mid-run, is queued again. Exports made for the queue share identical files
+through an ObjectStore in its folder, and the results of finished runs are
+ingested into a ResultsDB there.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from .executors import Executor, default_executor_spec, make_executor
+from .object_store import ObjectStore
+from .results_db import ResultsDB
+
+try:
+    import fcntl
+except ImportError:
+    # Only the threads of one process are kept apart
+    fcntl = None
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+# Seconds between heartbeats of running jobs
+HEARTBEAT_INTERVAL = 10.0
+# Seconds without a heartbeat after which a running job is queued again
+STALE_AFTER = 60.0
+# Seconds idle slots wait before looking for jobs added by other processes
+CLAIM_INTERVAL = 2.0
+
+
+def default_run_dir() -> Path:
+    return Path(os.environ.get('MUSE_GUI_RUN_DIR', Path.home() / '.muse_gui' / 'runs'))
+
+
+def parse_cpus(text: str) -> Tuple[int, ...]:
+    """Parses a CPU list such as '0-3,6'"""
+    cpus: List[int] = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition('-')
+        cpus.extend(range(int(first), int(last) + 1) if sep else [int(first)])
+    return tuple(cpus)
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    # Runs solved at once
+    workers: int = 1
+    # CPUs the pool may use, shared out between the workers
+    cpus: Optional[Tuple[int, ...]] = None
+    # Bytes of address space each worker may use
+    memory_limit: Optional[int] = None
+    # Executor spec of each slot, see make_executor
+    executor: str = 'worker'
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        """Reads MUSE_GUI_RUN_WORKERS, MUSE_GUI_RUN_CPUS, MUSE_GUI_RUN_MEMORY_MB and MUSE_GUI_EXECUTOR"""
+        workers = os.environ.get('MUSE_GUI_RUN_WORKERS')
+        cpus = os.environ.get('MUSE_GUI_RUN_CPUS')
+        memory_mb = os.environ.get('MUSE_GUI_RUN_MEMORY_MB')
+        return cls(
+            workers=int(workers) if workers else 1,
+            cpus=parse_cpus(cpus) if cpus else None,
+            memory_limit=int(memory_mb) * 2**20 if memory_mb else None,
+            executor=default_executor_spec('worker'),
+        )
+
+    def cpus_for(self, slot: int) -> Optional[Tuple[int, ...]]:
+        if not self.cpus:
+            return None
+        if len(self.cpus) < self.workers:
+            # Too few to give each worker its own
+            return self.cpus
+        return self.cpus[slot::self.workers]
+
+
+@dataclass(frozen=True)
+class RunJob:
+    id: int
+    settings_path: str
+    prices_path: str
+    capacity_path: str
+    label: str = ''
+    status: str = QUEUED
+    submitted: float = 0.0
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    heartbeat: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started is None:
+            return None
+        return (self.finished or time.time()) - self.started
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class RunQueue:
+    def __init__(self, folder: Union[str, Path], config: PoolConfig = PoolConfig()) -> None:
+        self.folder = Path(folder)
+        self.config = config
+        self._state_path = self.folder / 'queue.json'
+        self._lock_path = self.folder / 'queue.lock'
+        self._thread_lock = threading.Lock()
+        # Held while a job's executor is cancelled, so its slot cannot move on to another job meanwhile
+        self._cancel_lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        # Jobs this process is solving and their executors
+        self._running: Dict[int, Executor] = {}
+        self._cancelling: Set[int] = set()
+        self.folder.mkdir(parents=True, exist_ok=True)
+        # Queued exports share their identical files
+        self.objects = ObjectStore(self.folder / 'objects')
+        self.results = ResultsDB(self.folder / 'results.sqlite')
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self._state_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'next_id': 1, 'jobs': []}
+
+    def _write(self, state: Dict[str, Any]) -> None:
+        temporary = self._state_path.with_suffix('.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(state, f, indent=1)
+        os.replace(temporary, self._state_path)
+
+    @contextmanager
+    def _state(self) -> Iterator[Dict[str, Any]]:
+        """Reads the state for a change and writes it back afterwards"""
+        with self._thread_lock, open(self._lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                state = self._read()
+                yield state
+                self._write(state)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _update(self, job_id: int, **changes: Any) -> RunJob:
+        with self._state() as state:
+            for i, job in enumerate(state['jobs']):
+                if job['id'] == job_id:
+                    job.update(changes)
+                    state['jobs'][i] = job
+                    return RunJob(**job)
+        raise KeyError(job_id)
+
+    def jobs(self) -> List[RunJob]:
+        # The state file is replaced atomically, so reading needs no lock
+        return [RunJob(**job) for job in self._read()['jobs']]
+
+    def get(self, job_id: int) -> RunJob:
+        for job in self.jobs():
+            if job.id == job_id:
+                return job
+        raise KeyError(job_id)
+
+    def export_folder(self) -> Path:
+        """New folder for a model to be exported to before it is queued"""
+        return self.folder / 'exports' / uuid.uuid4().hex[:12]
+
+    def add(self, settings_path: Union[str, Path], prices_path: Union[str, Path], capacity_path: Union[str, Path], label: str = '') -> RunJob:
+        with self._state() as state:
+            job = RunJob(
+                id=state['next_id'],
+                settings_path=str(Path(settings_path).absolute()),
+                prices_path=str(Path(prices_path).absolute()),
+                capacity_path=str(Path(capacity_path).absolute()),
+                label=label,
+                submitted=time.time(),
+            )
+            state['next_id'] += 1
+            state['jobs'].append(job.to_dict())
+        with self._wakeup:
+            self._wakeup.notify()
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancels a queued job, or one running in this process. Returns False if
+        it could not be cancelled, including when its executor fails to stop it
+        """
+        with self._state() as state:
+            for job in state['jobs']:
+                if job['id'] != job_id:
+                    continue
+                if job['status'] == QUEUED:
+                    job.update(status=CANCELLED, finished=time.time())
+                    return True
+                executor = self._running.get(job_id)
+                if job['status'] != RUNNING or executor is None:
+                    return False
+                self._cancelling.add(job_id)
+                break
+            else:
+                raise KeyError(job_id)
+        # Outside the queue's lock: a remote executor's cancel is a request that can be slow or fail
+        with self._cancel_lock:
+            # Unless the job finished meanwhile
+            if self._running.get(job_id) is executor:
+                try:
+                    executor.cancel()
+                    return True
+                except Exception:
+                    pass
+            self._cancelling.discard(job_id)
+            return False
+
+    def remove(self, job_id: int) -> None:
+        """Forgets a finished job and its results, and deletes its export if the queue made it"""
+        with self._state() as state:
+            jobs = [job for job in state['jobs'] if job['id'] == job_id]
+            if not jobs:
+                raise KeyError(job_id)
+            if jobs[0]['status'] not in FINISHED:
+                raise ValueError(f'Run {job_id} has not finished')
+            state['jobs'] = [job for job in state['jobs'] if job['id'] != job_id]
+        run = self.results.find(jobs[0]['capacity_path'])
+        if run is not None:
+            self.results.remove(run.id)
+        export = Path(jobs[0]['settings_path']).parent
+        if export.parent == self.folder / 'exports':
+            shutil.rmtree(export, ignore_errors=True)
+            self.objects.prune()
+
+    def _claim(self) -> Optional[RunJob]:
+        now = time.time()
+        with self._state() as state:
+            claimed = None
+            for job in state['jobs']:
+                if job['status'] == RUNNING and job['id'] not in self._running and (job['heartbeat'] or 0) < now - STALE_AFTER:
+                    job.update(status=QUEUED, started=None, heartbeat=None)
+                if claimed is None and job['status'] == QUEUED:
+                    job.update(status=RUNNING, started=now, heartbeat=now)
+                    claimed = RunJob(**job)
+            return claimed
+
+    def start(self) -> None:
+        """Starts the pool; it solves queued jobs, including ones queued before a restart, until stopped"""
+        if self._threads:
+            return
+        self._stopping.clear()
+        self._threads = [
+            threading.Thread(target=self._work, args=(slot,), name=f'run-queue-{slot}', daemon=True)
+            for slot in range(self.config.workers)
+        ]
+        self._threads.append(threading.Thread(target=self._beat, name='run-queue-heartbeat', daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stops the pool. Runs in progress are killed and queued again"""
+        self._stopping.set()
+        for executor in list(self._running.values()):
+            executor.cancel()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits until no job is queued or running. Returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while any(job.status not in FINISHED for job in self.jobs()):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.1)
+        return True
+
+    def _beat(self) -> None:
+        while not self._stopping.wait(HEARTBEAT_INTERVAL):
+            running = list(self._running)
+            if running:
+                now = time.time()
+                with self._state() as state:
+                    for job in state['jobs']:
+                        if job['id'] in running:
+                            job['heartbeat'] = now
+
+    def _work(self, slot: int) -> None:
+        executor = make_executor(self.config.executor, self.config.cpus_for(slot), self.config.memory_limit)
+        try:
+            while not self._stopping.is_set():
+                job = self._claim()
+                if job is None:
+                    with self._wakeup:
+                        self._wakeup.wait(CLAIM_INTERVAL)
+                    continue
+                self._running[job.id] = executor
+                try:
+                    self._solve(executor, job)
+                finally:
+                    with self._cancel_lock:
+                        del self._running[job.id]
+        finally:
+            executor.close()
+
+    def _solve(self, executor: Executor, job: RunJob) -> None:
+        try:
+            executor.run(Path(job.settings_path))
+            # Results that cannot be read fail the job too
+            self.results.ingest(job.prices_path, job.capacity_path, job.label, job.settings_path)
+        except Exception as e:
+            # Cancelling or stopping makes the run fail too
+            if job.id in self._cancelling:
+                self._cancelling.discard(job.id)
+                self._update(job.id, status=CANCELLED, finished=time.time())
+            elif self._stopping.is_set():
+                self._update(job.id, status=QUEUED, started=None, heartbeat=None)
+            else:
+                self._update(job.id, status=FAILED, finished=time.time(), error=str(e))
+        else:
+            self._update(job.id, status=DONE, finished=time.time())
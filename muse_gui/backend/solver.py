@@ -0,0 +1,218 @@
+"""
+Long-lived MUSE worker process.
+
+    worker = SolverWorker()
+    worker.start()
+    worker.run('Output/settings.toml')
+
+Importing MUSE and its dependencies takes several seconds, so the worker
+imports it once, as soon as it starts, and then solves one settings file
+after another. ``ping`` checks that the worker answers. If the worker dies,
+the run it was solving raises ``SolverCrashed`` and a new worker is started
+for the next one. A worker can be pinned to a set of CPUs (Linux only) and
+limited to an amount of address space (POSIX only).
+"""
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+import warnings
+from multiprocessing.connection import Connection
+from typing import Any, Iterable, Optional, Set, Tuple
+
+# Seconds to wait for a ping to be answered, including MUSE's import
+PING_TIMEOUT = 30.0
+# Seconds between checks that the worker is still alive while waiting
+POLL_INTERVAL = 0.2
+# Seconds a worker gets to stop before it is killed
+STOP_TIMEOUT = 5.0
+
+
+class SolverError(RuntimeError):
+    """MUSE failed; the message is the worker's traceback"""
+
+
+class SolverCrashed(SolverError):
+    def __init__(self, settings_path: str, exitcode: Optional[int]):
+        self.settings_path = settings_path
+        self.exitcode = exitcode
+        super().__init__(f'The MUSE worker exited with code {exitcode} while solving {settings_path}')
+
+
+class _WorkerDied(Exception):
+    pass
+
+
+def _serve(conn: Connection, memory_limit: Optional[int] = None) -> None:
+    # Messages are (request id, kind, payload); answers echo the request id
+    if memory_limit is not None:
+        try:
+            import resource
+        except ImportError:
+            pass
+        else:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    try:
+        from muse.mca import MCA
+        import_error = None
+    except Exception:
+        import_error = traceback.format_exc()
+    while True:
+        try:
+            request_id, kind, payload = conn.recv()
+        except EOFError:
+            return
+        if kind == 'stop':
+            return
+        elif kind == 'ping':
+            conn.send((request_id, 'pong', import_error))
+        elif kind == 'run':
+            if import_error is not None:
+                conn.send((request_id, 'error', import_error))
+                continue
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter(action='ignore', category=FutureWarning)
+                    MCA.factory(payload).run()
+            except Exception:
+                conn.send((request_id, 'error', traceback.format_exc()))
+            else:
+                conn.send((request_id, 'done', None))
+
+
+class SolverWorker:
+    def __init__(self, cpus: Optional[Iterable[int]] = None, memory_limit: Optional[int] = None) -> None:
+        # CPUs the worker may run on
+        self.cpus: Optional[Set[int]] = None if cpus is None else set(cpus)
+        # Bytes of address space the worker may use
+        self.memory_limit = memory_limit
+        self._lock = threading.Lock()
+        self._killed = False
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._conn: Optional[Connection] = None
+        self._ids = itertools.count()
+        # Workers started after the first one died
+        self.restarts = 0
+        # Traceback of MUSE's import in the worker, known after the first ping
+        self.import_error: Optional[str] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return None if self._process is None else self._process.pid
+
+    def start(self) -> None:
+        """Starts the worker if it is not running; returns without waiting for MUSE to import"""
+        with self._lock:
+            self._killed = False
+            self._start()
+
+    def _start(self) -> None:
+        if self.alive:
+            return
+        if self._process is not None:
+            self._discard()
+            self.restarts += 1
+        # Forking a process that runs Tk is unsafe
+        context = multiprocessing.get_context('spawn')
+        conn, child_conn = context.Pipe()
+        process = context.Process(
+            target=_serve, args=(child_conn, self.memory_limit), name='muse-solver', daemon=True
+        )
+        process.start()
+        child_conn.close()
+        if self.cpus and hasattr(os, 'sched_setaffinity'):
+            # CPUs this machine does not have are ignored
+            cpus = self.cpus & os.sched_getaffinity(0)
+            if cpus:
+                os.sched_setaffinity(process.pid, cpus)
+        self._conn, self._process = conn, process
+
+    def _discard(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        if self._process is not None:
+            if self._process.is_alive():
+                self._process.kill()
+            self._process.join()
+        self._conn = self._process = None
+
+    def _request(self, kind: str, payload: Any = None, timeout: Optional[float] = None) -> Tuple[str, Any]:
+        assert self._conn is not None and self._process is not None
+        request_id = next(self._ids)
+        try:
+            self._conn.send((request_id, kind, payload))
+        except (BrokenPipeError, EOFError, OSError) as e:
+            raise _WorkerDied() from e
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = POLL_INTERVAL if deadline is None else max(0.0, min(POLL_INTERVAL, deadline - time.monotonic()))
+            if self._conn.poll(wait):
+                try:
+                    answer_id, answer, answer_payload = self._conn.recv()
+                except (EOFError, OSError) as e:
+                    raise _WorkerDied() from e
+                # Late answers to pings that timed out are dropped
+                if answer_id == request_id:
+                    return answer, answer_payload
+            elif not self._process.is_alive():
+                raise _WorkerDied()
+            elif deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f'The MUSE worker did not answer {kind} within {timeout}s')
+
+    def ping(self, timeout: float = PING_TIMEOUT) -> bool:
+        """True if the worker answers; a worker busy solving only has to be alive"""
+        if not self._lock.acquire(blocking=False):
+            return self.alive
+        try:
+            if not self.alive:
+                return False
+            _, self.import_error = self._request('ping', timeout=timeout)
+            return True
+        except (_WorkerDied, TimeoutError):
+            return False
+        finally:
+            self._lock.release()
+
+    def run(self, settings_path: str) -> None:
+        """Solves a MUSE settings file, restarting the worker first if it died"""
+        with self._lock:
+            self._killed = False
+            self._start()
+            try:
+                answer, payload = self._request('run', str(settings_path))
+            except _WorkerDied:
+                assert self._process is not None
+                self._process.join()
+                exitcode = self._process.exitcode
+                if not self._killed:
+                    # Warm up a replacement for the next run
+                    self._start()
+                raise SolverCrashed(str(settings_path), exitcode) from None
+        if answer == 'error':
+            raise SolverError(payload)
+
+    def kill(self) -> None:
+        """Kills the worker at once, even mid-run, without starting a replacement"""
+        self._killed = True
+        process = self._process
+        if process is not None and process.is_alive():
+            process.kill()
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._process is None:
+                return
+            if self.alive:
+                try:
+                    assert self._conn is not None
+                    self._conn.send((next(self._ids), 'stop', None))
+                except (BrokenPipeError, OSError):
+                    pass
+                self._process.join(STOP_TIMEOUT)
+            self._discard()
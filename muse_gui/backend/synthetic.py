@@ -0,0 +1,303 @@
+"""
+Synthetic MUSE models for benchmarking.
+
+``generate_model`` writes a settings.toml plus the input, technodata and
+Results CSVs in the same layout as ``examples/example_data``, scaled by a
+``ModelSize``. Values are drawn from a seeded generator so the same size
+always produces the same files.
+"""
+import csv
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence, Union
+
+import toml
+
+PathLike = Union[str, Path]
+
+
+@dataclass(frozen=True)
+class ModelSize:
+    regions: int = 1
+    sectors: int = 3
+    processes: int = 2  # per standard sector
+    agents: int = 1
+    commodities: int = 5
+    years: int = 7
+    timeslices: int = 6
+    presets: bool = True
+
+    def __post_init__(self):
+        for name, value in asdict(self).items():
+            if name != 'presets' and value < 1:
+                raise ValueError(f'{name} must be at least 1')
+        if self.commodities < 2:
+            raise ValueError('commodities must be at least 2')
+
+    @property
+    def label(self) -> str:
+        return (
+            f'r{self.regions}-s{self.sectors}-p{self.processes}-a{self.agents}'
+            f'-c{self.commodities}-y{self.years}-t{self.timeslices}'
+        )
+
+
+SIZES: Dict[str, ModelSize] = {
+    'small': ModelSize(),
+    'medium': ModelSize(regions=3, sectors=4, processes=10, agents=3, commodities=15, years=9, timeslices=12),
+    'large': ModelSize(regions=8, sectors=8, processes=40, agents=6, commodities=40, years=11, timeslices=24),
+}
+
+_AGENT_TYPES = ['New', 'Retrofit']
+_TECHNODATA_HEADERS = [
+    'ProcessName', 'RegionName', 'Time', 'Level',
+    'cap_par', 'cap_exp', 'fix_par', 'fix_exp', 'var_par', 'var_exp',
+    'MaxCapacityAddition', 'MaxCapacityGrowth', 'TotalCapacityLimit', 'TechnicalLife',
+    'UtilizationFactor', 'ScalingSize', 'efficiency', 'InterestRate', 'Type', 'Fuel', 'EndUse'
+]
+_TECHNODATA_UNITS = [
+    'Unit', '-', 'Year', '-', 'MUS$2010/PJ_a', '-', 'MUS$2010/PJ', '-', 'MUS$2010/PJ', '-',
+    'PJ', '%', 'PJ', 'Years', '-', 'PJ', '%', '-', '-', '-', '-'
+]
+
+
+def _write_csv(path: Path, rows: Sequence[Sequence]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', newline='') as f:
+        csv.writer(f).writerows(rows)
+
+
+class _ModelWriter:
+    def __init__(self, folder: Path, size: ModelSize, seed: int) -> None:
+        self.folder = folder
+        self.size = size
+        self.random = random.Random(seed)
+
+        self.regions = [f'R{i + 1}' for i in range(size.regions)]
+        self.years = [2020 + 5 * i for i in range(size.years)]
+        self.timeslices = [f'slice{i + 1}' for i in range(size.timeslices)]
+        # The last commodity is the emission tracked by every process
+        self.commodities = [f'commodity{i + 1}' for i in range(size.commodities - 1)] + ['CO2f']
+        self.sectors = [f'sector{i + 1}' for i in range(size.sectors)]
+        self.processes: Dict[str, List[str]] = {
+            sector: [f'{sector}_process{j + 1}' for j in range(size.processes)]
+            for sector in self.sectors
+        }
+        self.agents = [f'A{i + 1}' for i in range(size.agents)]
+        # One share column per agent, region and type
+        self.agent_shares = {
+            (agent, region, agent_type): f'Agent{k + 1}'
+            for k, (agent, region, agent_type) in enumerate(
+                (a, r, t) for a in self.agents for r in self.regions for t in _AGENT_TYPES
+            )
+        }
+
+    def value(self, low: float = 0.0, high: float = 100.0) -> float:
+        return round(self.random.uniform(low, high), 6)
+
+    def fuel_and_end_use(self, sector_index: int, process_index: int):
+        energy = self.commodities[:-1]
+        fuel = energy[(sector_index + process_index) % len(energy)]
+        end_use = energy[(sector_index + process_index + 1) % len(energy)]
+        return fuel, end_use
+
+    def write(self) -> Path:
+        self.write_global_inputs()
+        self.write_agents()
+        for i, sector in enumerate(self.sectors):
+            self.write_sector(i, sector)
+        if self.size.presets:
+            self.write_presets()
+        self.write_results()
+        return self.write_settings()
+
+    def write_global_inputs(self) -> None:
+        commodities = [['Commodity', 'CommodityType', 'CommodityName', 'CommodityEmissionFactor_CO2', 'HeatRate', 'Unit']]
+        for name in self.commodities:
+            if name == 'CO2f':
+                commodities.append(['CO2fuelcombustion', 'Environmental', name, 0, 1, 'kt'])
+            else:
+                commodities.append([name.title(), 'Energy', name, self.value(0, 60), 1, 'PJ'])
+        _write_csv(self.folder / 'input' / 'GlobalCommodities.csv', commodities)
+
+        header = ['RegionName', 'Attribute', 'Time'] + self.commodities
+        units = ['Unit', '-', 'Year'] + [
+            'MUS$2010/kt' if name == 'CO2f' else 'MUS$2010/PJ' for name in self.commodities
+        ]
+        projections = [header, units]
+        for region in self.regions:
+            for year in self.years:
+                projections.append([region, 'CommodityPrice', year] + [self.value() for _ in self.commodities])
+        _write_csv(self.folder / 'input' / 'Projections.csv', projections)
+
+    def write_agents(self) -> None:
+        rows = [[
+            'AgentShare', 'Name', 'AgentNumber', 'RegionName', 'Objective1', 'Objective2', 'Objective3',
+            'ObjData1', 'ObjData2', 'ObjData3', 'Objsort1', 'Objsort2', 'Objsort3',
+            'SearchRule', 'DecisionMethod', 'Quantity', 'MaturityThreshold', 'Budget', 'Type'
+        ]]
+        for (agent, region, agent_type), share in self.agent_shares.items():
+            number = int(share[len('Agent'):])
+            rows.append([
+                share, agent, number, region, 'LCOE', '', '', 1, '', '', 'FALSE', '', '',
+                'all', 'singleObj', 1, -1, 'inf', agent_type
+            ])
+        _write_csv(self.folder / 'technodata' / 'Agents.csv', rows)
+
+    def write_sector(self, sector_index: int, sector: str) -> None:
+        sector_folder = self.folder / 'technodata' / sector
+        share_columns = list(self.agent_shares.items())
+
+        technodata = [
+            _TECHNODATA_HEADERS + [share for _, share in share_columns],
+            _TECHNODATA_UNITS + [agent_type for (_, _, agent_type), _ in share_columns],
+        ]
+        flow_header = ['ProcessName', 'RegionName', 'Time', 'Level'] + self.commodities
+        flow_units = ['Unit', '-', 'Year', '-'] + [
+            'kt/PJ' if name == 'CO2f' else 'PJ/PJ' for name in self.commodities
+        ]
+        comm_in = [flow_header, flow_units]
+        comm_out = [flow_header, flow_units]
+        existing_capacity = [['ProcessName', 'RegionName', 'Unit'] + self.years]
+
+        for j, process in enumerate(self.processes[sector]):
+            fuel, end_use = self.fuel_and_end_use(sector_index, j)
+            for region in self.regions:
+                # All capacity goes to a single retrofit agent so shares sum to one
+                agent = self.agents[j % len(self.agents)]
+                owner = self.agent_shares[(agent, region, 'Retrofit')]
+                for year in self.years:
+                    technodata.append([
+                        process, region, year, 'fixed',
+                        self.value(10, 50), 1, self.value(0, 5), 1, self.value(0, 5), 1,
+                        self.random.randint(1, 10), 0.02, self.random.randint(50, 100),
+                        self.random.randint(10, 40), self.value(0.1, 1), 0.00000189, self.value(50, 100), 0.1,
+                        'energy', fuel, end_use,
+                    ] + [1 if share == owner else 0 for _, share in share_columns])
+                existing_capacity.append(
+                    [process, region, 'PJ/y'] + [self.value(0, 10) for _ in self.years]
+                )
+            # MUSE-GUI reads exactly one CommIn/CommOut row per process
+            comm_in.append([process, self.regions[0], self.years[0], 'fixed'] + [
+                self.value(1, 2) if name == fuel else 0 for name in self.commodities
+            ])
+            comm_out.append([process, self.regions[0], self.years[0], 'fixed'] + [
+                1 if name == end_use else self.value(0, 100) if name == 'CO2f' else 0
+                for name in self.commodities
+            ])
+
+        _write_csv(sector_folder / 'Technodata.csv', technodata)
+        _write_csv(sector_folder / 'CommIn.csv', comm_in)
+        _write_csv(sector_folder / 'CommOut.csv', comm_out)
+        _write_csv(sector_folder / 'ExistingCapacity.csv', existing_capacity)
+
+    def write_presets(self) -> None:
+        # Demand for the end uses of the first sector's processes
+        processes = self.processes[self.sectors[0]]
+        for year in [self.years[0], self.years[-1]]:
+            rows = [['', 'RegionName', 'ProcessName', 'Timeslice'] + self.commodities]
+            for region in self.regions:
+                for j, process in enumerate(processes):
+                    _, end_use = self.fuel_and_end_use(0, j)
+                    for t in range(len(self.timeslices)):
+                        rows.append([len(rows) - 1, region, process, t + 1] + [
+                            self.value(0, 5) if name == end_use else 0 for name in self.commodities
+                        ])
+            _write_csv(self.folder / 'technodata' / 'preset' / f'Preset{year}Consumption.csv', rows)
+
+    def write_results(self) -> None:
+        results = self.folder / 'Results'
+        capacity = [['technology', 'region', 'agent', 'type', 'sector', 'capacity', 'year']]
+        for sector in self.sectors:
+            sector_rows: Dict[int, List[List]] = {year: [] for year in self.years}
+            for j, process in enumerate(self.processes[sector]):
+                agent = self.agents[j % len(self.agents)]
+                for region in self.regions:
+                    for year in self.years:
+                        value = self.value(0, 20)
+                        capacity.append([process, region, agent, 'retrofit', sector, f'{value:.11f}', year])
+                        sector_rows[year].append([j, year, region, process, self.years[0], f'{value:.11f}'])
+            for year, rows in sector_rows.items():
+                _write_csv(
+                    results / sector.title() / 'Capacity' / f'{year}.csv',
+                    [['asset', 'year', 'region', 'technology', 'installed', 'capacity']] + rows
+                )
+        _write_csv(results / 'MCACapacity.csv', capacity)
+
+        prices = [['timeslice', 'commodity', 'region', 'prices', 'year']]
+        for year in self.years:
+            for region in self.regions:
+                for timeslice in self.timeslices:
+                    label = str(('all-year', 'all-week', timeslice))
+                    for name in self.commodities:
+                        prices.append([label, name, region, f'{self.value():.11f}', year])
+        _write_csv(results / 'MCAPrices.csv', prices)
+
+    def write_settings(self) -> Path:
+        output_template = '{cwd}/{default_output_dir}/{Sector}/{Quantity}/{year}{suffix}'
+        sectors = {}
+        for i, sector in enumerate(self.sectors):
+            sectors[sector] = {
+                'type': 'default',
+                'priority': i + 1,
+                'dispatch_production': 'share',
+                'technodata': f'{{path}}/technodata/{sector}/Technodata.csv',
+                'commodities_in': f'{{path}}/technodata/{sector}/CommIn.csv',
+                'commodities_out': f'{{path}}/technodata/{sector}/CommOut.csv',
+                'subsectors': {
+                    'retro_and_new': {
+                        'agents': '{path}/technodata/Agents.csv',
+                        'existing_capacity': f'{{path}}/technodata/{sector}/ExistingCapacity.csv',
+                        'lpsolver': 'scipy',
+                    }
+                },
+                'outputs': [{'filename': output_template, 'quantity': 'capacity', 'sink': 'csv', 'overwrite': True}],
+                'interactions': [{'net': 'new_to_retro', 'interaction': 'transfer'}],
+            }
+        if self.size.presets:
+            sectors['presets'] = {
+                'type': 'presets',
+                'priority': 0,
+                'consumption_path': '{path}/technodata/preset/*Consumption.csv',
+            }
+        timeslices = {
+            'all-year': {'all-week': {name: 8760 // len(self.timeslices) for name in self.timeslices}},
+            'level_names': ['month', 'day', 'hour'],
+        }
+        settings = {
+            'time_framework': self.years,
+            'foresight': 5,
+            'regions': self.regions,
+            'interest_rate': 0.1,
+            'interpolation_mode': 'Active',
+            'log_level': 'info',
+            'equilibrium_variable': 'demand',
+            'maximum_iterations': 100,
+            'tolerance': 0.1,
+            'tolerance_unmet_demand': -0.1,
+            'outputs': [
+                {'quantity': 'prices', 'sink': 'aggregate', 'filename': '{cwd}/{default_output_dir}/MCA{Quantity}.csv'},
+                {'quantity': 'capacity', 'sink': 'aggregate', 'filename': '{cwd}/{default_output_dir}/MCA{Quantity}.csv'},
+            ],
+            'carbon_budget_control': {'budget': []},
+            'global_input_files': {
+                'projections': '{path}/input/Projections.csv',
+                'global_commodities': '{path}/input/GlobalCommodities.csv',
+            },
+            'sectors': sectors,
+            'timeslices': timeslices,
+        }
+        settings_path = self.folder / 'settings.toml'
+        with open(settings_path, 'w') as f:
+            toml.dump(settings, f)
+        return settings_path
+
+
+def generate_model(folder: PathLike, size: Union[ModelSize, str] = 'small', seed: int = 0) -> Path:
+    """Writes a synthetic model to ``folder`` and returns the path of its settings.toml"""
+    if isinstance(size, str):
+        size = SIZES[size]
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    return _ModelWriter(folder, size, seed).write()
@@ -0,0 +1,493 @@
+"""
+Headless command line interface.
+
+    muse-gui validate SETTINGS
+    muse-gui load SETTINGS
+    muse-gui export SETTINGS OUTPUT_FOLDER
+    muse-gui run SETTINGS [--output OUTPUT_FOLDER]
+    muse-gui run-batch SETTINGS [SETTINGS ...] --output OUTPUT_FOLDER
+    muse-gui queue add SETTINGS [--label LABEL]
+    muse-gui queue list|work|cancel ID|remove ID
+    muse-gui serve [--host HOST] [--port PORT]
+    muse-gui results ingest RESULTS_FOLDER [--label LABEL]
+    muse-gui results list|query capacity|prices|sector [--run ID --region R ...]|remove ID
+    muse-gui results scan RESULTS_FOLDER QUANTITY [--sector S] [--step YEAR] [--column C]
+    muse-gui plot-data CAPACITY_CSV PRICES_CSV | --run ID
+    muse-gui generate OUTPUT_FOLDER [--size small|medium|large] [--regions N ...]
+
+Every command prints a single JSON document with timing and size statistics
+to stdout. Nothing here imports Tk, so it can be used on machines without a
+display. ``--executor`` picks how runs are solved (see
+``muse_gui.backend.executors``).
+"""
+import argparse
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+from muse_gui.backend.instrumentation import JsonFileSink, MemorySink, add_sink, remove_sink
+from muse_gui.backend.resources.datastore import Datastore
+
+if TYPE_CHECKING:
+    from muse_gui.backend.executors import Executor
+    from muse_gui.backend.results_db import ResultsDB
+    from muse_gui.backend.run_queue import PoolConfig
+
+Stats = Dict[str, Any]
+
+QUERY_FILTERS = ['run', 'region', 'agent', 'sector', 'technology', 'commodity', 'year', 'step']
+# The filters each table of `results query` accepts, matching the ResultsDB query methods
+QUERY_TABLE_FILTERS = {
+    'capacity': ['run', 'region', 'agent', 'sector', 'technology', 'year'],
+    'prices': ['run', 'region', 'commodity', 'year'],
+    'sector': ['run', 'sector', 'step', 'region', 'technology', 'commodity', 'year'],
+}
+
+
+@contextmanager
+def _timed(stats: Stats, name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.setdefault('timings', {})[name] = round(time.perf_counter() - start, 6)
+
+
+def _path_size(path: Path) -> Dict[str, int]:
+    if path.is_file():
+        return {'files': 1, 'bytes': path.stat().st_size}
+    files = [p for p in path.rglob('*') if p.is_file()]
+    return {'files': len(files), 'bytes': sum(p.stat().st_size for p in files)}
+
+
+def _datastore_sizes(datastore: Datastore) -> Dict[str, int]:
+    return {
+        'regions': len(datastore.region.list()),
+        'sectors': len(datastore.sector.list()),
+        'level_names': len(datastore.level_name.list()),
+        'available_years': len(datastore.available_year.list()),
+        'timeslices': len(datastore.timeslice.list()),
+        'commodities': len(datastore.commodity.list()),
+        'processes': len(datastore.process.list()),
+        'agents': len(datastore.agent.list()),
+    }
+
+
+def _load(args: argparse.Namespace, stats: Stats, settings: Optional[str] = None) -> Datastore:
+    settings = settings or args.settings
+    stats['settings'] = str(Path(settings).absolute())
+    stats['input'] = _path_size(Path(settings).parent)
+    with _timed(stats, 'load'):
+        datastore = Datastore.from_settings(settings, cache_dir=args.cache_dir)
+    stats['datastore'] = _datastore_sizes(datastore)
+    return datastore
+
+
+def validate_command(args: argparse.Namespace) -> Stats:
+    stats: Stats = {'command': 'validate', 'settings': str(Path(args.settings).absolute())}
+    with _timed(stats, 'validate'):
+        problems = Datastore.validate_settings(args.settings)
+    stats['ok'] = len(problems) == 0
+    stats['problems'] = [{'path': p.path, 'message': p.message} for p in problems]
+    return stats
+
+
+def load_command(args: argparse.Namespace) -> Stats:
+    stats: Stats = {'command': 'load'}
+    _load(args, stats)
+    return stats
+
+
+def export_command(args: argparse.Namespace) -> Stats:
+    stats: Stats = {'command': 'export'}
+    datastore = _load(args, stats)
+    object_store = None
+    if args.object_store:
+        from muse_gui.backend.object_store import ObjectStore
+        object_store = ObjectStore(args.object_store)
+    with _timed(stats, 'export'):
+        settings_path, _, _ = datastore.export_to_folder(args.output, args.results, object_store)
+    stats['exported_settings'] = str(settings_path.absolute())
+    stats['output'] = _path_size(Path(args.output))
+    return stats
+
+
+def run_command(args: argparse.Namespace) -> Stats:
+    stats: Stats = {'command': 'run'}
+    datastore = _load(args, stats)
+    with _timed(stats, 'run'):
+        prices_path, capacity_path = datastore.run_muse(args.output, args.results, _executor(args, 'inprocess'))
+    stats['results'] = _results(prices_path, capacity_path)
+    return stats
+
+
+def run_batch_command(args: argparse.Namespace) -> Stats:
+    from muse_gui.backend.executors import WorkerExecutor
+    from muse_gui.backend.object_store import ObjectStore
+    from muse_gui.backend.solver import SolverError
+
+    stats: Stats = {'command': 'run-batch', 'runs': []}
+    # By default one worker imports MUSE once for every run
+    executor = _executor(args, 'worker')
+    executor.start()
+    # The models' exports share their identical files
+    objects = ObjectStore(Path(args.output) / 'objects')
+    try:
+        for i, settings in enumerate(args.settings):
+            run_stats: Stats = {}
+            datastore = _load(args, run_stats, settings)
+            try:
+                with _timed(run_stats, 'run'), objects.use():
+                    prices_path, capacity_path = datastore.run_muse(str(Path(args.output) / str(i)), executor=executor)
+            except SolverError as e:
+                run_stats['ok'] = False
+                run_stats['error'] = str(e)
+            else:
+                run_stats['results'] = _results(prices_path, capacity_path)
+            stats['runs'].append(run_stats)
+    finally:
+        executor.close()
+    if isinstance(executor, WorkerExecutor):
+        stats['worker_restarts'] = executor.worker.restarts
+    stats['ok'] = all(run.get('ok', True) for run in stats['runs'])
+    return stats
+
+
+def _executor(args: argparse.Namespace, default: str) -> "Executor":
+    from muse_gui.backend.executors import default_executor_spec, make_executor
+    return make_executor(args.executor or default_executor_spec(default))
+
+
+def _pool_config(args: argparse.Namespace) -> "PoolConfig":
+    from muse_gui.backend.run_queue import PoolConfig, parse_cpus
+
+    config = PoolConfig.from_env()
+    return PoolConfig(
+        workers=getattr(args, 'workers', None) or config.workers,
+        cpus=parse_cpus(args.cpus) if getattr(args, 'cpus', None) else config.cpus,
+        memory_limit=args.memory_limit * 2**20 if getattr(args, 'memory_limit', None) else config.memory_limit,
+        executor=args.executor or config.executor,
+    )
+
+
+def queue_command(args: argparse.Namespace) -> Stats:
+    from muse_gui.backend.run_queue import RunQueue, default_run_dir
+
+    queue = RunQueue(args.run_dir or default_run_dir(), _pool_config(args))
+    stats: Stats = {'command': f'queue {args.queue_command}', 'run_dir': str(queue.folder.absolute())}
+    if args.queue_command == 'add':
+        datastore = _load(args, stats)
+        with _timed(stats, 'queue'):
+            stats['job'] = datastore.queue_run(queue, args.label).to_dict()
+    elif args.queue_command == 'work':
+        # Solves everything queued, then exits
+        with _timed(stats, 'work'):
+            queue.start()
+            try:
+                queue.wait()
+            finally:
+                queue.stop()
+        stats['ok'] = all(job.status != 'failed' for job in queue.jobs())
+    elif args.queue_command in ('cancel', 'remove'):
+        try:
+            if args.queue_command == 'cancel':
+                stats['ok'] = queue.cancel(args.id)
+            else:
+                queue.remove(args.id)
+        except (KeyError, ValueError) as e:
+            stats['ok'] = False
+            stats['error'] = f'No run {args.id}' if isinstance(e, KeyError) else str(e)
+    stats['jobs'] = [job.to_dict() for job in queue.jobs()]
+    return stats
+
+
+def serve_command(args: argparse.Namespace) -> Stats:
+    from muse_gui.backend.job_server import JobServer
+    from muse_gui.backend.run_queue import RunQueue, default_run_dir
+
+    # Kept apart from the GUI's queue on the same machine
+    queue = RunQueue(args.run_dir or default_run_dir() / 'server', _pool_config(args))
+    server = JobServer(queue, args.host, args.port)
+    stats: Stats = {'command': 'serve', 'url': server.url, 'run_dir': str(queue.folder.absolute())}
+    print(f'Serving MUSE runs on {server.url}', file=sys.stderr, flush=True)
+    with _timed(stats, 'serve'):
+        queue.start()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            queue.stop()
+    return stats
+
+
+def _results(prices_path: Path, capacity_path: Path) -> Dict[str, Any]:
+    return {
+        'prices': str(prices_path.absolute()),
+        'capacity': str(capacity_path.absolute()),
+        'prices_bytes': prices_path.stat().st_size if prices_path.exists() else None,
+        'capacity_bytes': capacity_path.stat().st_size if capacity_path.exists() else None,
+    }
+
+
+def plot_data_command(args: argparse.Namespace) -> Stats:
+    import pandas as pd
+    from muse_gui.backend.plots import capacity_data_frame_to_plots, price_data_frame_to_plots
+
+    stats: Stats = {'command': 'plot-data'}
+    if args.run is None and (args.capacity is None or args.prices is None):
+        stats['ok'] = False
+        stats['error'] = 'Expected CAPACITY_CSV and PRICES_CSV, or --run'
+        return stats
+    with _timed(stats, 'read'):
+        if args.run is not None:
+            results = _results_db(args)
+            capacity_df = results.capacity(run=args.run)
+            prices_df = results.prices(run=args.run)
+        else:
+            capacity_df = pd.read_csv(args.capacity)
+            prices_df = pd.read_csv(args.prices)
+    with _timed(stats, 'capacity_plots'):
+        capacity_plots = capacity_data_frame_to_plots(capacity_df)
+    with _timed(stats, 'price_plots'):
+        price_plots = price_data_frame_to_plots(prices_df)
+    stats['rows'] = {'capacity': len(capacity_df), 'prices': len(prices_df)}
+    stats['plots'] = {'capacity': len(capacity_plots), 'prices': len(price_plots)}
+
+    if args.output is not None:
+        output = Path(args.output)
+        output.mkdir(parents=True, exist_ok=True)
+        with _timed(stats, 'write'):
+            for capacity_plot in capacity_plots:
+                frames = [df.assign(technology=tech) for tech, df in capacity_plot.data.items()]
+                if frames:
+                    pd.concat(frames).to_csv(output / f'capacity_{capacity_plot.name}.csv', index=False)
+            for price_plot in price_plots:
+                frames = [df.assign(commodity=commodity) for commodity, df in price_plot.data.items()]
+                if frames:
+                    pd.concat(frames).to_csv(output / f'prices_{price_plot.region}.csv', index=False)
+        stats['output'] = _path_size(output)
+    return stats
+
+
+def _results_db(args: argparse.Namespace) -> "ResultsDB":
+    from muse_gui.backend.results_db import ResultsDB
+    from muse_gui.backend.run_queue import default_run_dir
+    return ResultsDB(args.db or default_run_dir() / 'results.sqlite')
+
+
+def results_scan_command(args: argparse.Namespace) -> Stats:
+    from muse_gui.backend.results_dataset import ResultsDataset
+
+    # Reads the files of a results folder directly, without the database
+    dataset = ResultsDataset(args.folder)
+    stats: Stats = {'command': 'results scan'}
+    with _timed(stats, 'scan'):
+        partitions = dataset.select(args.quantity, args.sector, args.step)
+        frame = dataset.read(args.quantity, args.sector, args.step, args.column)
+    stats['files'] = {'selected': len(partitions), 'total': len(dataset.select(args.quantity))}
+    stats['columns'] = list(frame.columns)
+    stats['rows'] = len(frame)
+    if args.output is not None:
+        with _timed(stats, 'write'):
+            frame.to_csv(args.output, index=False)
+        stats['output'] = _path_size(Path(args.output))
+    return stats
+
+
+def results_command(args: argparse.Namespace) -> Stats:
+    results = _results_db(args)
+    stats: Stats = {'command': f'results {args.results_command}', 'db': str(results.path.absolute())}
+    if args.results_command == 'ingest':
+        folder = Path(args.folder)
+        with _timed(stats, 'ingest'):
+            stats['run'] = results.ingest(folder / 'MCAPrices.csv', folder / 'MCACapacity.csv', args.label, args.settings)
+    elif args.results_command == 'query':
+        filters = {name: getattr(args, name) for name in QUERY_FILTERS if getattr(args, name) is not None}
+        unknown = [name for name in filters if name not in QUERY_TABLE_FILTERS[args.table]]
+        if unknown:
+            stats['ok'] = False
+            stats['error'] = f'{args.table} cannot be filtered by {", ".join(unknown)}'
+            return stats
+        with _timed(stats, 'query'):
+            if args.table == 'capacity':
+                frame = results.capacity(**filters)
+            elif args.table == 'prices':
+                frame = results.prices(**filters)
+            else:
+                frame = results.sector_results(args.quantity, **filters)
+        stats['rows'] = len(frame)
+        if args.output is not None:
+            with _timed(stats, 'write'):
+                frame.to_csv(args.output, index=False)
+            stats['output'] = _path_size(Path(args.output))
+    elif args.results_command == 'remove':
+        try:
+            results.remove(args.id)
+        except KeyError:
+            stats['ok'] = False
+            stats['error'] = f'No run {args.id}'
+    if args.results_command != 'query':
+        stats['runs'] = [run.to_dict() for run in results.runs()]
+    return stats
+
+
+def generate_command(args: argparse.Namespace) -> Stats:
+    from dataclasses import asdict, replace
+    from muse_gui.backend.synthetic import SIZES, generate_model
+
+    size = SIZES[args.size]
+    overrides = {name: getattr(args, name) for name in asdict(size) if getattr(args, name, None) is not None}
+    size = replace(size, **overrides)
+    stats: Stats = {'command': 'generate', 'size': asdict(size)}
+    with _timed(stats, 'generate'):
+        settings_path = generate_model(args.output, size, seed=args.seed)
+    stats['settings'] = str(settings_path.absolute())
+    stats['output'] = _path_size(Path(args.output))
+    return stats
+
+
+def _add_pool_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--workers', type=int, default=None, help='Runs solved at once')
+    parser.add_argument('--cpus', default=None, help='CPUs the workers may use, e.g. 0-3,6')
+    parser.add_argument('--memory-limit', type=int, default=None, help='Memory limit of each worker in MB')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='muse-gui',
+        description='Load, export, run and post-process MUSE models without the GUI',
+    )
+    parser.add_argument('--indent', type=int, default=None, help='Indent the JSON output')
+    parser.add_argument('--spans', action='store_true', help='Include pipeline timing spans in the output')
+    parser.add_argument('--trace', default=None, help='Append pipeline timing spans to this JSON lines file')
+    parser.add_argument('--cache-dir', default=None, help='Keep parsed input CSVs in this folder between runs')
+    parser.add_argument(
+        '--executor', default=None,
+        help='How runs are solved: inprocess, subprocess, worker or a job server URL (default $MUSE_GUI_EXECUTOR)'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    validate = commands.add_parser('validate', help='Check a settings.toml and its CSVs without loading them')
+    validate.add_argument('settings')
+    validate.set_defaults(func=validate_command)
+
+    load = commands.add_parser('load', help='Import a settings.toml and report its size')
+    load.add_argument('settings')
+    load.set_defaults(func=load_command)
+
+    export = commands.add_parser('export', help='Import a settings.toml and export it to a folder')
+    export.add_argument('settings')
+    export.add_argument('output')
+    export.add_argument('--results', default=None, help='Folder MUSE should write results to')
+    export.add_argument('--object-store', default=None, help='Folder of files shared with other exports, which are hardlinked into the output')
+    export.set_defaults(func=export_command)
+
+    run = commands.add_parser('run', help='Import, export and run a model with MUSE')
+    run.add_argument('settings')
+    run.add_argument('--output', default=None, help='Folder to export the model to (default ./Output)')
+    run.add_argument('--results', default=None, help='Folder MUSE should write results to')
+    run.set_defaults(func=run_command)
+
+    run_batch = commands.add_parser('run-batch', help='Run several models one after another in a single MUSE worker')
+    run_batch.add_argument('settings', nargs='+')
+    run_batch.add_argument('--output', required=True, help='Folder to export the models to, one numbered subfolder each')
+    run_batch.set_defaults(func=run_batch_command)
+
+    queue = commands.add_parser('queue', help='Manage the persistent run queue shared with the GUI')
+    queue.add_argument('--run-dir', default=None, help='Folder holding the queue (default $MUSE_GUI_RUN_DIR or ~/.muse_gui/runs)')
+    queue.set_defaults(func=queue_command)
+    queue_commands = queue.add_subparsers(dest='queue_command', required=True)
+    queue_add = queue_commands.add_parser('add', help='Import and export a model and queue a run of it')
+    queue_add.add_argument('settings')
+    queue_add.add_argument('--label', default='')
+    queue_commands.add_parser('list', help='List queued and finished runs')
+    queue_work = queue_commands.add_parser('work', help='Solve every queued run, then exit')
+    _add_pool_arguments(queue_work)
+    for name in ['cancel', 'remove']:
+        queue_id = queue_commands.add_parser(name, help=f'{name.capitalize()} a run')
+        queue_id.add_argument('id', type=int)
+
+    serve = commands.add_parser('serve', help='Solve runs sent by --executor http://HOST:PORT until interrupted')
+    serve.add_argument('--host', default='127.0.0.1', help='Address to listen on (the server has no authentication)')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--run-dir', default=None, help='Folder holding the server\'s queue (default ~/.muse_gui/runs/server)')
+    _add_pool_arguments(serve)
+    serve.set_defaults(func=serve_command)
+
+    plot_data = commands.add_parser('plot-data', help='Prepare plot data from MUSE results')
+    plot_data.add_argument('capacity', nargs='?', help='MCACapacity.csv')
+    plot_data.add_argument('prices', nargs='?', help='MCAPrices.csv')
+    plot_data.add_argument('--run', type=int, default=None, help='Read the results of this run from the results database instead')
+    plot_data.add_argument('--db', default=None, help='Results database (default $MUSE_GUI_RUN_DIR/results.sqlite)')
+    plot_data.add_argument('--output', default=None, help='Folder to write per-plot CSVs to')
+    plot_data.set_defaults(func=plot_data_command)
+
+    results = commands.add_parser('results', help='Query the results database shared with the run queue')
+    results.add_argument('--db', default=None, help='Results database (default $MUSE_GUI_RUN_DIR/results.sqlite)')
+    results.set_defaults(func=results_command)
+    results_commands = results.add_subparsers(dest='results_command', required=True)
+    results_ingest = results_commands.add_parser('ingest', help='Add or refresh the results in a folder')
+    results_ingest.add_argument('folder', help='Folder holding MCACapacity.csv and MCAPrices.csv')
+    results_ingest.add_argument('--label', default=None)
+    results_ingest.add_argument('--settings', default=None, help='settings.toml the results came from')
+    results_commands.add_parser('list', help='List ingested runs')
+    results_query = results_commands.add_parser('query', help='Select results, optionally filtered')
+    results_query.add_argument('table', choices=['capacity', 'prices', 'sector'])
+    results_query.add_argument('--quantity', default='capacity', help='Quantity of the sector results, e.g. capacity or supply')
+    for name in QUERY_FILTERS:
+        results_query.add_argument(
+            f'--{name}', action='append', type=int if name in ('run', 'year', 'step') else str,
+            help=f'Only this {name} (repeatable)',
+        )
+    results_query.add_argument('--output', default=None, help='CSV file to write the rows to')
+    results_remove = results_commands.add_parser('remove', help='Forget an ingested run')
+    results_remove.add_argument('id', type=int)
+    results_scan = results_commands.add_parser('scan', help='Read per-sector result files of a folder, e.g. capacity or supply')
+    results_scan.add_argument('folder', help='Folder holding <Sector>/<Quantity>/<year>.csv')
+    results_scan.add_argument('quantity')
+    results_scan.add_argument('--sector', action='append', help='Only this sector (repeatable)')
+    results_scan.add_argument('--step', action='append', type=int, help='Only the file of this year (repeatable)')
+    results_scan.add_argument('--column', action='append', help='Only this column (repeatable)')
+    results_scan.add_argument('--output', default=None, help='CSV file to write the rows to')
+    results_scan.set_defaults(func=results_scan_command)
+
+    generate = commands.add_parser('generate', help='Write a synthetic model for benchmarking')
+    generate.add_argument('output')
+    generate.add_argument('--size', default='small', choices=['small', 'medium', 'large'])
+    generate.add_argument('--seed', type=int, default=0)
+    for name in ['regions', 'sectors', 'processes', 'agents', 'commodities', 'years', 'timeslices']:
+        generate.add_argument(f'--{name}', type=int, default=None, help=f'Override the number of {name}')
+    generate.set_defaults(func=generate_command)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    sinks = []
+    if args.spans:
+        memory_sink = add_sink(MemorySink())
+        sinks.append(memory_sink)
+    if args.trace is not None:
+        sinks.append(add_sink(JsonFileSink(args.trace)))
+    start = time.perf_counter()
+    try:
+        stats = args.func(args)
+    finally:
+        for sink in sinks:
+            remove_sink(sink)
+    stats.setdefault('timings', {})['total'] = round(time.perf_counter() - start, 6)
+    if args.spans:
+        stats['spans'] = [record.to_dict() for record in memory_sink.records]
+    json.dump(stats, sys.stdout, indent=args.indent)
+    sys.stdout.write('\n')
+    return 0 if stats.get('ok', True) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,6 +5,7 @@ import PySimpleGUI as sg
 from PySimpleGUI import Element
 
 from muse_gui.backend.resources.datastore import Datastore
+from muse_gui.backend.resources.datastore.search import AGENT_FACETS, SearchIndex
 from muse_gui.backend.resources.datastore.exceptions import KeyAlreadyExists
 from muse_gui.frontend.views.exceptions import SaveException
 from muse_gui.frontend.widgets.base import BaseWidget
@@ -280,7 +281,9 @@ class AgentView(TwoColumnMixin, BaseView):
         self._model = model.agent
         self.model = AgentModelHelper(model)
 
-        self._agent_list = ListboxWithButtons()
+        self._agent_list = ListboxWithButtons(
+            search_index=SearchIndex(model.agent, AGENT_FACETS)
+        )
         self._save_edit_btns = SaveEditButtons()
         self._agent_info = AgentInfo()
         self._agent_tables = AgentTables(
@@ -488,6 +491,8 @@ class AgentView(TwoColumnMixin, BaseView):
             if len(indices):
                 self.selected = indices[0]
                 self.update(window)
+        elif _event == 'filter':
+            self._agent_list(window, event, values)
         elif _event == 'edit':
             return self._handle_edit(window)
         elif _event == 'add':
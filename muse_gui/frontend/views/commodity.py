@@ -9,6 +9,7 @@ from muse_gui.frontend.views.exceptions import SaveException
 from muse_gui.frontend.widgets.button import SaveEditButtons
 
 from ...backend.resources.datastore import Datastore
+from ...backend.resources.datastore.search import COMMODITY_FACETS, SearchIndex
 from ...backend.data.commodity import Commodity, CommodityPrice, CommodityType
 
 from ..widgets.listbox import ListboxWithButtons
@@ -45,7 +46,8 @@ class CommodityView(TwoColumnMixin, BaseView):
         self._parent_model = model
         self.model = model.commodity
         self._commodity_list_maker = partial(
-            ListboxWithButtons
+            ListboxWithButtons,
+            search_index=SearchIndex(model.commodity, COMMODITY_FACETS)
         )
         self._commodity_info_maker = partial(
             Form,
@@ -373,6 +375,9 @@ class CommodityView(TwoColumnMixin, BaseView):
                 self.selected = indices[-1]
                 self.update(window)
 
+        elif _event == 'filter':
+            self._commodity_list(window, event, values)
+
         elif _event == 'prices':
             self._prices_table(window, event, values)
 
@@ -302,7 +302,11 @@ class RunView(BaseView):
                 sg.Text(''),
             ],
             [
-                sg.Push(), sg.Button('Run Muse', key = self._prefixf('run'), size = (20,2)), sg.Push()
+                sg.Push(),
+                sg.Button('Run Muse', key = self._prefixf('run'), size = (20,2)),
+                sg.Button('Queue Run', key = self._prefixf('queue'), size = (20,2)),
+                sg.Button('Runs', key = self._prefixf('runs'), size = (20,2)),
+                sg.Push()
             ]
         ]
 
@@ -380,8 +384,11 @@ class RunView(BaseView):
             return self._handle_edit_years(window)
         elif _event == 'edit_commodities':
             return self._handle_edit_commodities(window)
-        elif _event == 'run':
+        elif _event == 'run' or _event == 'queue':
             return self._handle_run(window, values)
+        elif _event == 'runs':
+            # Opened by the main window
+            return None
         elif _event == 'budget' or self._carbon_market._budget_table.should_handle_event(event):
             return self._carbon_market._budget_table(window, event, values)
         else:
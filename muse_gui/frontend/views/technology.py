@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from functools import partial
 from math import inf
 from typing import Any, Dict, List, Literal, Optional, Tuple
@@ -7,7 +8,7 @@ from PySimpleGUI import Element
 from pydantic import root_validator
 from muse_gui.backend.data.agent import AgentType
 from muse_gui.backend.data.sector import SectorType
-from muse_gui.backend.resources.datastore.exceptions import KeyAlreadyExists
+from muse_gui.backend.resources.datastore.exceptions import KeyAlreadyExists, KeyNotFound
 from muse_gui.frontend.views.exceptions import SaveException
 from muse_gui.frontend.widgets.base import BaseWidget
 from muse_gui.frontend.widgets.button import SaveEditButtons
@@ -16,6 +17,7 @@ from muse_gui.frontend.widgets.utils import render
 from muse_gui.frontend.popups import show_dual_listbox
 
 from ...backend.resources.datastore import Datastore
+from ...backend.resources.datastore.search import PROCESS_FACETS, SearchIndex
 from ...backend.data.process import Capacity, CapacityShare, CommodityFlow, Cost, ExistingCapacity, Process, Technodata, Utilisation
 
 from ..widgets.listbox import ListboxWithButtons
@@ -28,6 +30,8 @@ FIXED_TABLES = {
     'cost': ['cap_par', 'cap_exp', 'fix_par', 'fix_exp', 'var_par', 'var_exp', 'Interest Rate'],
     'existing_capacity': ['Qty'],
 }
+# Number of processes whose table values are kept for quick reselection
+TABLE_CACHE_SIZE = 64
 class DummyProcess(Process):
     @root_validator
     def at_least_one_in_or_out(cls, values):
@@ -518,10 +522,12 @@ class TechnologyTables(BaseWidget):
 
     def _get_table(self, headings: List[str], values=[[]]) -> FixedColumnTable:
         _headings = ['Year', 'Region'] + headings
+        # Year x region tables can be large, so only visible rows are rendered
         return FixedColumnTable(
             0,
             len(_headings),
             2,
+            virtual=True,
             pad=0,
             values=values,
             headings=_headings,
@@ -607,7 +613,9 @@ class TechnologyView(TwoColumnMixin, BaseView):
         self._tech_tables = TechnologyTables(
             tab_headings=[x for x in self.TABLE_VALUES] + ['demand']
         )
-        self._tech_list = ListboxWithButtons()
+        self._tech_list = ListboxWithButtons(
+            search_index=SearchIndex(model.process, PROCESS_FACETS)
+        )
         self._save_edit_btns = SaveEditButtons()
 
         # Internal State
@@ -624,6 +632,8 @@ class TechnologyView(TwoColumnMixin, BaseView):
 
         self._current_process = None
 
+        self._table_cache: OrderedDict = OrderedDict()
+
     def enable_editing(self, window, force=False):
         # Careful, If enabled, form should be disabled
         # and vice versa
@@ -680,7 +690,37 @@ class TechnologyView(TwoColumnMixin, BaseView):
     def _update_info(self, window, _process: Process):
         self._tech_info.update(window, _process)
 
+    def _table_cache_key(self, _process: Process):
+        # Only processes as stored are cached, not ones being edited
+        try:
+            if self._model.read(_process.name) is not _process:
+                return None
+        except KeyNotFound:
+            return None
+        return (
+            _process.name,
+            self._datastore.version,
+            tuple(self._years),
+            tuple(self._regions),
+            tuple(self._commin),
+            tuple(self._commout),
+        )
+
     def _get_table_values_for_process(self, _process: Process):
+        key = self._table_cache_key(_process)
+        if key is not None and key in self._table_cache:
+            self._table_cache.move_to_end(key)
+            _values = self._table_cache[key]
+        else:
+            _values = self._build_table_values_for_process(_process)
+            if key is not None:
+                self._table_cache[key] = _values
+                if len(self._table_cache) > TABLE_CACHE_SIZE:
+                    self._table_cache.popitem(last=False)
+        # Tables are patched in place, so callers get their own rows
+        return {k: [list(row) for row in rows] for k, rows in _values.items()}
+
+    def _build_table_values_for_process(self, _process: Process):
         _fuel = _process.fuel
         _enduse = _process.end_use
         # Year region cartesian product
@@ -823,6 +863,8 @@ class TechnologyView(TwoColumnMixin, BaseView):
             if len(indices):
                 self.selected = indices[0]
                 self.update(window)
+        elif _event == 'filter':
+            self._tech_list(window, event, values)
         elif _event == 'edit':
             return self._handle_edit(window)
         elif _event == 'add':
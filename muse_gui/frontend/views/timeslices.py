@@ -58,13 +58,15 @@ class TimesliceModelHelper:
         _current_level_names = self.levelnames
         _current_timeslices = self.timeslices
 
-        try:
-            self.levelnames = level_names
-            self.timeslices = timeslices
-        except Exception as e:
-            self.levelnames = _current_level_names
-            self.timeslices = _current_timeslices
-            raise e
+        # One undo step
+        with self._model.transaction():
+            try:
+                self.levelnames = level_names
+                self.timeslices = timeslices
+            except Exception as e:
+                self.levelnames = _current_level_names
+                self.timeslices = _current_timeslices
+                raise e
 
     def delete_all_levelnames(self):
         for x in self.levelnames_list:
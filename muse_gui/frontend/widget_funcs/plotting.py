@@ -1,7 +1,6 @@
 from dataclasses import dataclass
 from typing import List, Tuple
 import PySimpleGUI as sg
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
@@ -9,6 +8,8 @@ from PySimpleGUI.PySimpleGUI import Element
 from muse_gui.backend.plots import CapacityPlot, PricePlot
 
 def _initialise_figure(canvas, figure):
+    # The TkAgg backend is only needed once a figure is attached to a window
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
     figure_canvas_agg = FigureCanvasTkAgg(figure, canvas)
     figure_canvas_agg.get_tk_widget().pack(side='bottom', fill='both', expand=1)
     return figure_canvas_agg
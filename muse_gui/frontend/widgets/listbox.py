@@ -1,5 +1,5 @@
 from functools import partial
-from typing import Optional, List
+from typing import Dict, Optional, List
 import PySimpleGUI as sg
 from PySimpleGUI import Element
 
@@ -7,6 +7,10 @@ from muse_gui.frontend.widgets.button import AddDeleteButtons, DoneCancelButtons
 from muse_gui.frontend.widgets.utils import get_btn_maker
 from .base import BaseWidget
 
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from muse_gui.backend.resources.datastore.search import SearchIndex
+
 
 class Listbox(BaseWidget):
     def __init__(self, key: Optional[str] = None, **kwargs):
@@ -80,12 +84,24 @@ class Listbox(BaseWidget):
         return self._layout
 
 class ListboxWithButtons(Listbox):
-    def __init__(self, key: Optional[str] = None, values=[]):
+    """
+    With a search_index a filter box is shown above the list. values and
+    indices always refer to the full list, whatever the filter shows.
+    """
+    def __init__(self, key: Optional[str] = None, values=[], search_index: Optional["SearchIndex"] = None):
         super().__init__(key, values=values)
         self._btns = AddDeleteButtons()
 
         self._disabled = False
 
+        self._search_index = search_index
+        self._query = ''
+        self._all_values: List = list(values)
+        self._positions: Dict = {}
+        # Full list indices of the shown values, None if unfiltered
+        self._shown: Optional[List[int]] = None
+        self._shown_positions: Dict[int, int] = {}
+
     @property
     def disabled(self):
         return self._disabled
@@ -95,19 +111,82 @@ class ListboxWithButtons(Listbox):
         if self._disabled == val:
             return
         self._listbox.update(disabled=val)
+        if self._search_index is not None:
+            self._filter.update(disabled=val)
         self._btns.disabled = val
         self._disabled = val
 
+    @property
+    def indices(self):
+        _indices = self._listbox.get_indexes()
+        if self._shown is None:
+            return _indices
+        return [self._shown[i] for i in _indices]
+
+    @indices.setter
+    def indices(self, indices):
+        if self._shown is not None and indices is not None:
+            indices = [self._shown_positions[i] for i in indices if i in self._shown_positions]
+        self._listbox.update(set_to_index=indices)
+
+    @property
+    def values(self):
+        if self._search_index is None:
+            return self._listbox.get_list_values()
+        return list(self._all_values)
+
+    @values.setter
+    def values(self, values):
+        if self._search_index is None:
+            self._listbox.update(values=values)
+            return
+        self._all_values = list(values)
+        self._positions = {v: i for i, v in enumerate(self._all_values)}
+        self._show_filtered()
+
+    def _show_filtered(self):
+        if not self._query:
+            self._shown = None
+            self._shown_positions = {}
+            self._listbox.update(values=self._all_values)
+            return
+        matches = self._search_index.query(self._query)
+        self._shown = sorted(self._positions[k] for k in matches if k in self._positions)
+        self._shown_positions = {full: i for i, full in enumerate(self._shown)}
+        self._listbox.update(values=[self._all_values[i] for i in self._shown])
+
+    def filter(self, query: str):
+        # Keep the selection if it is still shown
+        selected = self.indices
+        self._query = query.strip()
+        self._show_filtered()
+        self.indices = selected
+
     def layout(self, prefix) -> List[List[Element]]:
         if not self._layout:
             self.prefix = prefix
+            _filter_layout = []
+            if self._search_index is not None:
+                self._filter = sg.Input(
+                    '',
+                    size=(25, 1),
+                    expand_x=True,
+                    enable_events=True,
+                    tooltip='Filter by name, or e.g. sector:power region:r1',
+                    key=self._prefixf('filter')
+                )
+                _filter_layout = [[self._filter]]
             _listbox_layout = super().layout(
                 prefix=self._prefixf()
             )
             _btn_layout = self._btns.layout(self._prefixf())
-            self._layout = _listbox_layout + _btn_layout
+            self._layout = _filter_layout + _listbox_layout + _btn_layout
         return self._layout
 
+    def __call__(self, window, event, values):
+        if event == self._prefixf('filter'):
+            self.filter(values[event])
+
 class DualListbox(BaseWidget):
     def __init__(self, key: Optional[str] = None, values1=[], values2=[]):
         super().__init__(key)
@@ -1,14 +1,29 @@
 from functools import partial
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, List, Set
 import PySimpleGUI as sg
 from PySimpleGUI import Element
 from .base import BaseWidget
 
 
 class TabGroup(BaseWidget):
-    def __init__(self,  tabs: Dict[str, BaseWidget], key: Optional[str] = None):
+    """
+    Tabs start out as empty placeholders. A tab's layout is only built, and
+    its view updated for the first time, when the tab is first selected.
+
+    If version is given, a tab is only updated again when version() has
+    changed since the tab was last shown.
+    """
+    def __init__(
+        self,
+        tabs: Dict[str, BaseWidget],
+        key: Optional[str] = None,
+        version: Optional[Callable[[], int]] = None
+    ):
         super().__init__(key)
         self._tabs = tabs
+        self._built: Set[str] = set()
+        self._version = version
+        self._shown_versions: Dict[str, int] = {}
         self._tab_group_maker = partial(
             sg.TabGroup,
             enable_events=True,
@@ -35,7 +50,7 @@ class TabGroup(BaseWidget):
         if not self._layout:
             self.prefix = prefix
             self._tab_group = self._tab_group_maker(
-                [[sg.Tab(k.title(), tab.layout(self._prefixf()))] for k, tab in self._tabs.items()],
+                [[sg.Tab(k.title(), [[self._placeholder(k)]])] for k in self._tabs],
                 key=self._prefixf()
             )
 
@@ -44,21 +59,60 @@ class TabGroup(BaseWidget):
             ]]
         return self._layout
 
+    def _placeholder_key(self, name: str):
+        return self._prefixf(f'{name}_placeholder')
+
+    def _placeholder(self, name: str) -> sg.Column:
+        return sg.Column(
+            [[]],
+            key=self._placeholder_key(name),
+            pad=(0, 0),
+            expand_x=True, expand_y=True
+        )
+
+    def _build(self, window, name: str):
+        # Imported here as views depend on widgets
+        from ..views.base import TwoColumnMixin
+
+        _tab = self._tabs[name]
+        window.extend_layout(
+            window[self._placeholder_key(name)],
+            _tab.layout(self._prefixf())
+        )
+        if isinstance(_tab, TwoColumnMixin):
+            _tab.pack()
+        _tab.bind_handlers()
+        self._built.add(name)
+
+    def show(self, window, name: str):
+        if name not in self._built:
+            self._build(window, name)
+        if self._version is None:
+            self._tabs[name].update(window)
+            return
+        version = self._version()
+        if self._shown_versions.get(name) != version:
+            self._tabs[name].update(window)
+            self._shown_versions[name] = version
+
+    def show_current(self, window):
+        current_tab_key = self._tab_group.get()
+        if not current_tab_key:
+            return
+        self.show(window, current_tab_key.lower())
+
     def bind_handlers(self):
-        for _tab in self._tabs.values():
-            _tab.bind_handlers()
+        for k in self._built:
+            self._tabs[k].bind_handlers()
 
     def __call__(self, window, event, values):
         print('Tab group received - ', event)
         if event == self._prefixf():
             # Possibly tab switch event
-            current_tab_key = self._tab_group.get()
-            if not current_tab_key:
-                return
-            current_tab = self._tabs[current_tab_key.lower()]
-            current_tab.update(window)
+            self.show_current(window)
         else:
-            for _tab in self._tabs.values():
+            # Tabs that were never shown have no elements to send events
+            for _tab in (self._tabs[k] for k in self._built):
                 if _tab.should_handle_event(event):
                     ret = _tab(window, event, values)
                     if not ret:
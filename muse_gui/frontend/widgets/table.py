@@ -1,28 +1,56 @@
 from functools import partial
-from typing import Optional
+from typing import List, Optional
 import PySimpleGUI as sg
 from .base import BaseWidget
 """
 https://github.com/jason990420/PySimpleGUI-Solution/issues/122
 """
 
+# Rows rendered by a virtual table until it knows how many fit
+DEFAULT_WINDOW_ROWS = 20
+# Rows scrolled per mouse wheel step
+WHEEL_ROWS = 3
 
 
 class EditableTable(BaseWidget):
+    """
+    With virtual=True the rows are kept in a backing list and only the rows
+    that fit in the table are rendered, starting at the row shown by the
+    scroll bar. Cell edits are written to the backing list and to the one
+    rendered row, so large tables never go through Tk as a whole.
+    """
     def __init__(
             self,
             rows,
             cols,
             key: Optional[str] = None,
+            virtual: bool = False,
             **kwargs):
         super().__init__(key)
         self.nrows = rows
         self.ncols = cols
 
+        self._virtual = virtual
+        self._data: List[List] = []
+        # First rendered row (0 based) and number of rendered rows
+        self._top = 0
+        self._window_rows = kwargs.get('num_rows') or DEFAULT_WINDOW_ROWS
+
         self._table_maker = partial(
             sg.Table,
             **kwargs
         )
+        self._scroll_maker = partial(
+            sg.Slider,
+            range=(0, 0),
+            default_value=0,
+            resolution=1,
+            orientation='v',
+            disable_number_display=True,
+            enable_events=True,
+            pad=0,
+            expand_y=True,
+        )
         self._input_maker = partial(
             sg.Input,
             '',
@@ -52,9 +80,12 @@ class EditableTable(BaseWidget):
 
     @property
     def values(self):
+        # Rows of strings, as Tk stores them, whether or not the table is virtual
         if self.nrows == 0 or self.ncols == 0:
             return [[]]
         self.commit()
+        if self._virtual:
+            return [tuple(str(v) for v in row) for row in self._data]
         return [
             self.table_widget.item(r, "values")
             for r in range(1, self.nrows + 1)
@@ -64,7 +95,12 @@ class EditableTable(BaseWidget):
     def values(self, _val):
         self.nrows = len(_val)
         self.ncols = len(_val[0])
-        self._table.update(values=_val)
+        if self._virtual:
+            self._data = [list(row) for row in _val]
+            self._top = min(self._top, self._max_top())
+            self._render()
+        else:
+            self._table.update(values=_val)
         if self.nrows == 0 or self.ncols == 0:
             return
 
@@ -72,6 +108,7 @@ class EditableTable(BaseWidget):
         if self._row == 0:
             self._row = 1
         self._col = self._col % self.ncols
+        self._scroll_to_row()
         self._update_cell_position()
 
     @property
@@ -95,6 +132,7 @@ class EditableTable(BaseWidget):
         self._row = val % (self.nrows + 1)
         if self._row == 0:
             self._row = 1
+        self._scroll_to_row()
         self._update_cell_position()
 
     @property
@@ -112,12 +150,19 @@ class EditableTable(BaseWidget):
     def cell_text(self):
         if self.nrows == 0 or self.ncols == 0:
             return ''
+        if self._virtual:
+            return str(self._data[self.row - 1][self.col])
         return self.table_widget.item(self.row, "values")[self.col]
 
     @cell_text.setter
     def cell_text(self, val):
 
         # TODO Validation
+        if self._virtual:
+            self._data[self.row - 1][self.col] = val
+            if self._is_rendered(self.row):
+                self.table_widget.item(self._view_row(), values=self._data[self.row - 1])
+            return
         values = list(self.table_widget.item(self.row, 'values'))
         values[self.col] = val
         self.table_widget.item(self.row, values=values)
@@ -163,8 +208,60 @@ class EditableTable(BaseWidget):
         self._table.unbind('<B1-Motion>')
         self._table.unbind('ButtonRelease-1')
 
+    def _max_top(self):
+        return max(0, self.nrows - self._window_rows)
+
+    def _view_row(self):
+        # Rendered rows are numbered from 1 like the rows of a full table
+        return self.row - self._top
+
+    def _is_rendered(self, row):
+        return self._top < row <= self._top + self._window_rows
+
+    def _render(self):
+        self._table.update(values=self._data[self._top:self._top + self._window_rows])
+        self._scroll.update(value=self._top, range=(0, self._max_top()))
+
+    def _scroll_to_row(self):
+        if not self._virtual:
+            return
+        top = self._top
+        if self.row <= top:
+            top = self.row - 1
+        elif self.row > top + self._window_rows:
+            top = self.row - self._window_rows
+        if top != self._top:
+            self._top = top
+            self._render()
+
+    def scroll(self, rows):
+        top = max(0, min(self._top + rows, self._max_top()))
+        if top == self._top:
+            return
+        if self.editing:
+            self.commit()
+            self.editing = False
+        self._top = top
+        self._render()
+        self._update_cell_position()
+
+    def _fit_window_rows(self):
+        # Render as many rows as the table currently has room for
+        bbox = self.table_widget.bbox(1)
+        if not bbox:
+            return
+        _, y, _, height = bbox
+        rows = max(1, (self.table_widget.winfo_height() - y) // height)
+        if rows != self._window_rows:
+            self._window_rows = rows
+            self._top = min(self._top, self._max_top())
+            self._render()
+
     def _update_cell_position(self):
-        bbox = self.table_widget.bbox(self.row, self.col)
+        if self._virtual and not self._is_rendered(self.row):
+            self.frame_widget.place_forget()
+            return
+        bbox = self.table_widget.bbox(self._view_row(), self.col)
         if bbox:
             x, y, width, height = bbox
             self.frame_widget.place(
@@ -225,9 +322,16 @@ class EditableTable(BaseWidget):
                     # Currently editing a cell, copy value
                     self.cell_text = self._input.get()
 
-                return self.edit_cell(row + 1, col)
+                return self.edit_cell(self._top + row + 1, col)
         elif e == 'configure':
+            if self._virtual:
+                self._fit_window_rows()
             return self._update_cell_position()
+        elif e == 'wheel':
+            delta = self._table.user_bind_event.delta
+            return self.scroll(-WHEEL_ROWS if delta > 0 else WHEEL_ROWS)
+        elif e == 'wheel_up' or e == 'wheel_down':
+            return self.scroll(-WHEEL_ROWS if e == 'wheel_up' else WHEEL_ROWS)
         elif e == 'configure-done':
             return self._unbind_resize_handler()
         elif e == 'escape':
@@ -260,11 +364,14 @@ class EditableTable(BaseWidget):
                 key=self._prefixf('input')
             )
             self._frame = self._frame_maker([[self._input]])
+            _row = [self._table, self._frame]
+            if self._virtual:
+                self._scroll = self._scroll_maker(
+                    key=self._prefixf('scroll')
+                )
+                _row.append(self._scroll)
             self._layout =  [[
-                sg.Col([[
-                    self._table,
-                    self._frame
-                ]],
+                sg.Col([_row],
                 expand_x=True, expand_y=True)
             ]]
         return self._layout
@@ -296,6 +403,12 @@ class EditableTable(BaseWidget):
         self._table.bind('<Tab>', 'tab')
         self._table.bind('<Shift-ISO_Left_Tab>', 'stab')
 
+        if self._virtual:
+            # Only the rendered rows are in the table, so scroll the window
+            self._table.bind('<MouseWheel>', 'wheel')
+            self._table.bind('<Button-4>', 'wheel_up')
+            self._table.bind('<Button-5>', 'wheel_down')
+
     def edit_cell(self, r, c):
         if r <= 0:
             return
@@ -304,6 +417,8 @@ class EditableTable(BaseWidget):
         self.editing = True
 
     def __call__(self, window, event, values):
+        if event == self.prefix + ('scroll',):
+            return self.scroll(int(self._scroll.Widget.get()) - self._top)
         e, *params = event
         if e == self.prefix:
             self._handle_table_events(params)
@@ -1,9 +1,13 @@
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 import PySimpleGUI as sg
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from muse_gui.backend.executors import Executor
     
 
-def boot_waiting_window(font, datastore) -> Tuple[Path,Path]:
+def boot_waiting_window(font, datastore, executor: Optional["Executor"] = None) -> Tuple[Path,Path]:
     window = sg.Window(
         'Waiting', 
         [[sg.Text('Calculating MUSE')]], 
@@ -13,6 +17,7 @@ def boot_waiting_window(font, datastore) -> Tuple[Path,Path]:
         finalize=True,
         element_justification='c'
     )
-    prices_path, capacity_path = datastore.run_muse()
-    window.close()
-    return prices_path, capacity_path
\ No newline at end of file
+    try:
+        return datastore.run_muse(executor=executor)
+    finally:
+        window.close()
\ No newline at end of file
@@ -0,0 +1,86 @@
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+import PySimpleGUI as sg
+
+from muse_gui.backend.resources.datastore import Datastore
+from muse_gui.backend.resources.datastore.exceptions import LoadCancelled
+from muse_gui.frontend.windows.utils import Font
+
+
+def boot_loading_window(font: Font, file_path: str) -> Optional[Datastore]:
+    """
+    Imports file_path in a worker thread while showing the current import
+    stage. Returns None if the user cancels or the import fails.
+    """
+    cancel = threading.Event()
+    closed = threading.Event()
+    window = sg.Window(
+        'Loading',
+        [
+            [sg.Text(f'Loading {Path(file_path).name}')],
+            [sg.Text('Starting', size=(40, 1), key='stage')],
+            [sg.ProgressBar(100, orientation='h', size=(30, 20), key='progress')],
+            [sg.Button('Cancel', key='cancel')],
+        ],
+        font=font,
+        finalize=True,
+        element_justification='c'
+    )
+    last = [None]
+
+    def progress(stage: str, fraction: float) -> None:
+        if cancel.is_set():
+            raise LoadCancelled(file_path)
+        # Processes report individually, so only post visible changes
+        state = (stage, int(fraction * 100))
+        if state != last[0]:
+            last[0] = state
+            window.write_event_value('load_progress', state)
+
+    def load() -> None:
+        try:
+            # Parsed CSVs are kept between sessions if a cache folder is configured
+            datastore = Datastore.from_settings(
+                file_path,
+                cache_dir=os.environ.get('MUSE_GUI_CACHE_DIR'),
+                progress=progress
+            )
+        except LoadCancelled:
+            event, value = 'load_cancelled', None
+        except Exception as e:
+            event, value = 'load_failed', e
+        else:
+            event, value = 'load_done', datastore
+        if not closed.is_set():
+            window.write_event_value(event, value)
+
+    threading.Thread(target=load, daemon=True).start()
+
+    datastore = None
+    while True:
+        event, values = window.read()
+        if event == sg.WIN_CLOSED:
+            cancel.set()
+            break
+        elif event == 'cancel':
+            cancel.set()
+            window['stage'].update('Cancelling')
+            window['cancel'].update(disabled=True)
+        elif event == 'load_progress':
+            stage, percent = values[event]
+            window['stage'].update(stage)
+            window['progress'].update(percent)
+        elif event == 'load_done':
+            datastore = values[event]
+            break
+        elif event == 'load_failed':
+            sg.popup_error(f'Could not load {file_path}:\n{values[event]}', font=font)
+            break
+        elif event == 'load_cancelled':
+            break
+    closed.set()
+    window.close()
+    return datastore
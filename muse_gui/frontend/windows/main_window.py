@@ -1,8 +1,8 @@
-from typing import Dict, Optional
+from pathlib import Path
+from typing import Dict, Optional, Tuple
 import PySimpleGUI as sg
 from muse_gui.backend.resources.datastore import Datastore
 from muse_gui.frontend.views.available_years import AvailableYearsView
-from muse_gui.frontend.views.base import TwoColumnMixin
 from muse_gui.frontend.views.technology import TechnologyView
 from muse_gui.frontend.views.timeslices import TimesliceView
 from muse_gui.frontend.widgets.tabgroup import TabGroup
@@ -12,13 +12,66 @@ from muse_gui.frontend.views.agent import AgentView
 from muse_gui.frontend.views.sector import SectorView
 from muse_gui.frontend.views.run_view import RunView
 from muse_gui.frontend.windows.calc_window import boot_waiting_window
-from muse_gui.frontend.windows.plot_window import boot_plot_window
-from muse_gui.frontend.windows.utils import Font
+from muse_gui.frontend.windows.loading_window import boot_loading_window
+from muse_gui.frontend.windows.utils import STATUS_EVENT, Font, status_bar_sink
+from muse_gui.backend.instrumentation import add_sink, remove_sink
+from muse_gui.backend.executors import Executor, default_executor_spec, make_executor
+from muse_gui.backend.results_db import ResultsDB
+from muse_gui.backend.run_queue import PoolConfig, RunQueue, default_run_dir
+from muse_gui.frontend.windows.runs_window import boot_runs_window
+
+
+class _Background:
+    """The MUSE worker and the run queue, each started on first use"""
+    def __init__(self, run_dir: Path) -> None:
+        self.run_dir = run_dir
+        self._executor: Optional[Executor] = None
+        self._run_queue: Optional[RunQueue] = None
+
+    def executor(self) -> Executor:
+        if self._executor is None:
+            # By default MUSE is imported in a worker process, so later runs
+            # skip its start-up
+            self._executor = make_executor(default_executor_spec('worker'))
+            self._executor.start()
+        return self._executor
+
+    def run_queue(self) -> RunQueue:
+        if self._run_queue is None:
+            # Runs queued in earlier sessions carry on from here
+            self._run_queue = RunQueue(self.run_dir, PoolConfig.from_env())
+            self._run_queue.start()
+        return self._run_queue
+
+    def results(self) -> ResultsDB:
+        # The queue's database, without starting the queue for it
+        if self._run_queue is not None:
+            return self._run_queue.results
+        return ResultsDB(self.run_dir / 'results.sqlite')
+
+    def close(self) -> None:
+        if self._run_queue is not None:
+            self._run_queue.stop()
+            self._run_queue = None
+        if self._executor is not None:
+            self._executor.close()
+            self._executor = None
+
+
+def _run_model(font: Font, datastore: Datastore, background: _Background) -> int:
+    """Solves the model and ingests its results, returning the run id"""
+    prices_path, capacity_path = boot_waiting_window(font, datastore, background.executor())
+    return background.results().ingest(prices_path, capacity_path)
+
 
 def boot_tabbed_window(import_bool: bool, font: Font, file_path: Optional[str] = None):
     if import_bool:
         assert file_path is not None
-        datastore = Datastore.from_settings(file_path)
+        # The main window is only built once the model has been imported
+        loaded = boot_loading_window(font, file_path)
+        if loaded is None:
+            return
+        datastore = loaded
     else:
         datastore = Datastore()
     timeslice_view = TimesliceView(datastore)
@@ -39,7 +92,8 @@ def boot_tabbed_window(import_bool: bool, font: Font, file_path: Optional[str] =
         'technologies': tech_view,
         'run': run_view
     }
-    tab_group = TabGroup(tabs, 'tg')
+    # Tabs are only refreshed on selection if the datastore changed since
+    tab_group = TabGroup(tabs, 'tg', version=lambda: datastore.version)
     status_bar = sg.StatusBar(
         "Ready!",
         size=(20, 1),
@@ -47,60 +101,90 @@ def boot_tabbed_window(import_bool: bool, font: Font, file_path: Optional[str] =
         justification='right',
         key=("status", ))
 
-
-
     layout = tab_group.layout(tuple()) + [[ status_bar ]]
     window = sg.Window('MUSE', layout=layout, size=(1000,800), finalize=True, font='roman 16',
                     resizable=True, auto_size_buttons=True, auto_size_text=True)
     window.set_min_size(window.size)
+    status_sink = add_sink(status_bar_sink(window))
+    window.bind('<Control-z>', 'undo')
+    window.bind('<Control-y>', 'redo')
+    background = _Background(default_run_dir())
+    # Set by a run whose results are plotted once this window is closed
+    plotted: Optional[Tuple[ResultsDB, int]] = None
+    try:
+        # Only the selected tab is built now, the rest on first selection
+        tab_group.show_current(window)
+        while True:
+            event, values = window.read()
+            if event == sg.WIN_CLOSED or event == 'Exit':
+                break
+            elif event == 'carbon_market_active':
+                if values['carbon_market_active']:
+                    window['carbon_market_frame'].update(visible=True)
+                else:
+                    window['carbon_market_frame'].update(visible=False)
 
-
-
-    for _tab in tabs.values():
-        if isinstance(_tab, TwoColumnMixin):
-            _tab.pack()
-        _tab.bind_handlers()
-        _tab.update(window)
-    while True:
-        event, values = window.read()
-        if event == sg.WIN_CLOSED or event == 'Exit':
-            window.close()
-            break
-        elif event == 'carbon_market_active':
-            if values['carbon_market_active']:
-                window['carbon_market_frame'].update(visible=True)
-            else:
-                window['carbon_market_frame'].update(visible=False)
-
-        if type(event) is str:
-            # Handle event in window level
-            pass
-        elif event and isinstance(event, tuple):
-            if tab_group.should_handle_event(event):
-                try:
-                    ret = tab_group(window, event, values)
-                    if ret:
-                        ret, status = ret
+            if type(event) is str:
+                # Handle event in window level
+                if event == STATUS_EVENT:
+                    status_bar(values[event])
+                elif event in ('undo', 'redo'):
+                    done = datastore.undo() if event == 'undo' else datastore.redo()
+                    if done:
+                        tab_group.show_current(window)
+                        status_bar(f'{event.capitalize()} done')
+                    else:
+                        status_bar(f'Nothing to {event}')
+            elif event and isinstance(event, tuple):
+                failed = False
+                if tab_group.should_handle_event(event):
+                    try:
+                        ret = tab_group(window, event, values)
                         if ret:
-                            # Log exception
-                            print(ret)
-                            sg.popup_error(str(ret), title='Error')
+                            ret, status = ret
+                            if ret:
+                                # Log exception
+                                print(ret)
+                                sg.popup_error(str(ret), title='Error')
 
-                        status_bar(status)
-                except Exception as e:
-                    print(e)
-                    if e.__cause__:
-                        sg.popup_error(str(e.__cause__), title='Error')
-                    else:
+                            status_bar(status)
+                    except Exception as e:
+                        failed = True
+                        print(e)
+                        if e.__cause__:
+                            sg.popup_error(str(e.__cause__), title='Error')
+                        else:
+                            sg.popup_error(str(e), title='Error')
+                        status_bar(str(e))
+                else:
+                    print('Unhandled - ', event)
+                    pass
+                if event == ('tg', 'run', 'queue') and not failed:
+                    label = sg.popup_get_text('Label for this run', title='Queue Run', default_text='')
+                    if label is not None:
+                        job = datastore.queue_run(background.run_queue(), label)
+                        status_bar(f'Queued run {job.id}')
+                elif event == ('tg', 'run', 'runs'):
+                    boot_runs_window(font, background.run_queue())
+                elif event == ('tg', 'run', 'run'):
+                    try:
+                        run_id = _run_model(font, datastore, background)
+                    except Exception as e:
+                        # The model stays open to be fixed and run again
+                        print(e)
                         sg.popup_error(str(e), title='Error')
-                    status_bar(str(e))
+                        status_bar(str(e))
+                        continue
+                    plotted = background.results(), run_id
+                    break
             else:
-                print('Unhandled - ', event)
-                pass
-            if event == ('tg', 'run', 'run'):
-                window.close()
-                prices_path, capacity_path = boot_waiting_window(font, datastore)
-                boot_plot_window(capacity_path, prices_path, font)
-                break
-        else:
-            print(event)
\ No newline at end of file
+                print(event)
+    finally:
+        background.close()
+        remove_sink(status_sink)
+        window.close()
+    if plotted is not None:
+        # Plotting pulls in pandas and matplotlib, so defer it until
+        # there are results to show.
+        from muse_gui.frontend.windows.plot_window import boot_plot_window
+        boot_plot_window(*plotted, font)
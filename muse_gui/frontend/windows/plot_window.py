@@ -1,7 +1,7 @@
 
 from muse_gui.backend.plots import capacity_data_frame_to_plots, price_data_frame_to_plots
 from muse_gui.frontend.widget_funcs.plotting import GuiFigureElements, attach_capacity_plot_to_figure, generate_plot,  generate_plot_layout, attach_price_plot_to_figure
-import pandas as pd
+from muse_gui.backend.results_db import ResultsDB
 
 import PySimpleGUI as sg
 
@@ -9,9 +9,9 @@ from muse_gui.frontend.windows.utils import Font
 
 
     
-def boot_plot_window(capacity_path, price_path, font: Font):
-    out_cap = pd.read_csv(capacity_path)
-    out_price = pd.read_csv(price_path)
+def boot_plot_window(results: ResultsDB, run_id: int, font: Font):
+    out_cap = results.capacity(run=run_id)
+    out_price = results.prices(run=run_id)
     fig = generate_plot()
 
     capacity_plots = capacity_data_frame_to_plots(out_cap)
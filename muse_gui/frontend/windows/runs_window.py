@@ -0,0 +1,87 @@
+import time
+from typing import List
+
+import PySimpleGUI as sg
+
+from muse_gui.backend.run_queue import DONE, RunJob, RunQueue
+from muse_gui.frontend.windows.utils import Font
+
+HEADINGS = ['Run', 'Label', 'Status', 'Queued', 'Time (s)']
+# Milliseconds between refreshes of the job list
+REFRESH_MS = 1000
+
+
+def _rows(jobs: List[RunJob]) -> List[List]:
+    return [
+        [
+            job.id,
+            job.label,
+            job.status,
+            time.strftime('%Y-%m-%d %H:%M', time.localtime(job.submitted)),
+            '' if job.duration is None else f'{job.duration:.1f}',
+        ]
+        for job in jobs
+    ]
+
+
+def boot_runs_window(font: Font, queue: RunQueue) -> None:
+    """Lists queued and finished runs; finished runs can be plotted again"""
+    jobs = queue.jobs()
+    window = sg.Window(
+        'Runs',
+        [
+            [sg.Table(
+                _rows(jobs),
+                headings=HEADINGS,
+                num_rows=15,
+                justification='left',
+                select_mode=sg.TABLE_SELECT_MODE_BROWSE,
+                expand_x=True,
+                expand_y=True,
+                key='jobs',
+            )],
+            [sg.Text('', size=(60, 2), key='error')],
+            [
+                sg.Button('Plot', key='plot'),
+                sg.Button('Cancel Run', key='cancel'),
+                sg.Button('Remove', key='remove'),
+                sg.Push(),
+                sg.Button('Close', key='close'),
+            ],
+        ],
+        font=font,
+        resizable=True,
+        finalize=True,
+    )
+
+    while True:
+        event, values = window.read(timeout=REFRESH_MS)
+        if event in (sg.WIN_CLOSED, 'close'):
+            break
+        selected = [jobs[i] for i in values['jobs'] if i < len(jobs)]
+        job = selected[0] if selected else None
+        if job is not None:
+            window['error'].update(job.error.strip().splitlines()[-1] if job.error else '')
+        try:
+            if event == 'plot' and job is not None:
+                if job.status != DONE:
+                    sg.popup_error(f'Run {job.id} has not finished', title='Error')
+                else:
+                    # Plotting pulls in pandas and matplotlib
+                    from muse_gui.frontend.windows.plot_window import boot_plot_window
+                    # Runs finished before the results database existed are ingested now
+                    run_id = queue.results.ingest(job.prices_path, job.capacity_path, job.label, job.settings_path)
+                    boot_plot_window(queue.results, run_id, font)
+            elif event == 'cancel' and job is not None:
+                if not queue.cancel(job.id):
+                    sg.popup_error(f'Run {job.id} cannot be cancelled', title='Error')
+            elif event == 'remove' and job is not None:
+                queue.remove(job.id)
+        except (KeyError, ValueError, OSError) as e:
+            sg.popup_error(str(e), title='Error')
+
+        refreshed = queue.jobs()
+        if refreshed != jobs:
+            jobs = refreshed
+            window['jobs'].update(values=_rows(jobs))
+    window.close()
@@ -1,7 +1,10 @@
 from typing import Tuple
 import PySimpleGUI as sg
+from muse_gui.backend.instrumentation import CallbackSink, SpanRecord
 
 Font = Tuple[str, int]
+# Event carrying a message for the main window's status bar
+STATUS_EVENT = 'status_message'
 def configure_theme() -> Font:
     light = '#E7F5F9'
     dark = '#D8EEF4'
@@ -21,4 +24,12 @@ def configure_theme() -> Font:
     sg.theme_add_new('CustomTheme', custom_theme)
     sg.theme('CustomTheme')
     font = ('Arial', 14)
-    return font
\ No newline at end of file
+    return font
+
+def status_bar_sink(window: sg.Window) -> CallbackSink:
+    # Only report top level stages (load, export, solve, ...). Some end on
+    # worker threads, e.g. ingesting a queued run's results, so the message
+    # goes through the window's event queue and the main loop shows it
+    def show(record: SpanRecord):
+        window.write_event_value(STATUS_EVENT, f'{record.name.replace("_", " ").title()} took {record.duration:.2f}s')
+    return CallbackSink(show, max_depth=0)
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+Benchmarks against synthetic models (see ``muse_gui.backend.synthetic``).
+
+Every benchmark is parametrized by model size and grouped by operation, so
+a saved run shows how each operation scales:
+
+    pytest tests/benchmarks --benchmark-autosave
+    pytest tests/benchmarks --benchmark-compare --model-size small --model-size large
+"""
+import importlib.util
+from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
+
+from muse_gui.backend.resources.datastore import Datastore
+from muse_gui.backend.synthetic import SIZES, generate_model
+
+if importlib.util.find_spec('pytest_benchmark') is None:
+    collect_ignore_glob = ['test_*.py']
+
+DEFAULT_SIZES = ['small', 'medium']
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--model-size',
+        action='append',
+        choices=list(SIZES),
+        help=f'Synthetic model size to benchmark (repeatable, default: {", ".join(DEFAULT_SIZES)})',
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if 'model_size' in metafunc.fixturenames:
+        sizes = metafunc.config.getoption('--model-size') or DEFAULT_SIZES
+        metafunc.parametrize('model_size', sizes, scope='session')
+
+
+_models: Dict[str, Path] = {}
+_datastores: Dict[str, Datastore] = {}
+
+
+@pytest.fixture(scope='session')
+def settings_path(model_size: str, tmp_path_factory) -> Path:
+    if model_size not in _models:
+        _models[model_size] = generate_model(tmp_path_factory.mktemp(model_size), model_size)
+    return _models[model_size]
+
+
+@pytest.fixture(scope='session')
+def datastore(model_size: str, settings_path: Path) -> Datastore:
+    """Shared datastore, benchmarks must not modify it"""
+    if model_size not in _datastores:
+        _datastores[model_size] = Datastore.from_settings(str(settings_path))
+    return _datastores[model_size]
+
+
+@pytest.fixture
+def fresh_datastore(datastore: Datastore) -> Callable[[], Datastore]:
+    """Builds an independent copy of ``datastore`` for benchmarks that modify it"""
+    def build() -> Datastore:
+        return Datastore(
+            regions=[datastore.region.read(k) for k in datastore.region.list()],
+            sectors=[datastore.sector.read(k) for k in datastore.sector.list()],
+            level_names=[datastore.level_name.read(k) for k in datastore.level_name.list()],
+            available_years=[datastore.available_year.read(k) for k in datastore.available_year.list()],
+            timeslices=[datastore.timeslice.read(k) for k in datastore.timeslice.list()],
+            commodities=[datastore.commodity.read(k) for k in datastore.commodity.list()],
+            processes=[datastore.process.read(k) for k in datastore.process.list()],
+            agents=[datastore.agent.read(k) for k in datastore.agent.list()],
+            run_model=datastore.run_settings,
+        )
+    return build
+
+
+@pytest.fixture
+def size_info(model_size: str, benchmark) -> None:
+    benchmark.extra_info['model_size'] = model_size
+    benchmark.extra_info.update(SIZES[model_size].__dict__)
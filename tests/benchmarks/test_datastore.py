@@ -0,0 +1,74 @@
+import pytest
+
+pytestmark = pytest.mark.usefixtures('size_info')
+
+STORES = ['region', 'sector', 'level_name', 'available_year', 'timeslice', 'commodity', 'process', 'agent']
+ROUNDS = 10
+
+
+def first(datastore, store):
+    key = getattr(datastore, store).list()[0]
+    return key, getattr(datastore, store).read(key)
+
+
+@pytest.mark.benchmark(group='read')
+@pytest.mark.parametrize('store', STORES)
+def test_read(benchmark, datastore, store):
+    key, model = first(datastore, store)
+    assert benchmark(getattr(datastore, store).read, key) is model
+
+
+@pytest.mark.benchmark(group='create')
+@pytest.mark.parametrize('store', STORES)
+def test_create(benchmark, fresh_datastore, store):
+    def setup():
+        datastore = fresh_datastore()
+        key, model = first(datastore, store)
+        # Remove without cascading so the model's dependencies are still present
+        getattr(datastore, store)._data.pop(key)
+        return (getattr(datastore, store), model), {}
+
+    benchmark.pedantic(lambda s, model: s.create(model), setup=setup, rounds=ROUNDS)
+
+
+@pytest.mark.benchmark(group='update')
+@pytest.mark.parametrize('store', STORES)
+def test_update(benchmark, fresh_datastore, store):
+    def setup():
+        datastore = fresh_datastore()
+        key, model = first(datastore, store)
+        return (getattr(datastore, store), key, model), {}
+
+    benchmark.pedantic(lambda s, key, model: s.update(key, model), setup=setup, rounds=ROUNDS)
+
+
+@pytest.mark.benchmark(group='delete')
+@pytest.mark.parametrize('store', STORES)
+def test_delete(benchmark, fresh_datastore, store):
+    def setup():
+        datastore = fresh_datastore()
+        key, _ = first(datastore, store)
+        return (getattr(datastore, store), key), {}
+
+    benchmark.pedantic(lambda s, key: s.delete(key), setup=setup, rounds=ROUNDS)
+
+
+@pytest.mark.benchmark(group='back_dependents_recursive')
+def test_back_dependents_recursive(benchmark, datastore):
+    _, process = first(datastore, 'process')
+    dependents = benchmark(datastore.process.back_dependents_recursive, process)
+    assert 'region' in dependents
+
+
+@pytest.mark.benchmark(group='forward_dependents_recursive')
+def test_forward_dependents_recursive(benchmark, datastore):
+    _, region = first(datastore, 'region')
+    dependents = benchmark(datastore.region.forward_dependents_recursive, region)
+    assert len(dependents['process']) > 0
+
+
+@pytest.mark.benchmark(group='snapshot')
+def test_snapshot(benchmark, fresh_datastore):
+    datastore = fresh_datastore()
+    snapshot = benchmark(datastore.snapshot)
+    assert snapshot.process.list() == datastore.process.list()
@@ -0,0 +1,30 @@
+import base64
+
+import pytest
+
+from muse_gui.backend.executors import RemoteExecutor
+from muse_gui.backend.job_server import JobServer
+from muse_gui.backend.run_queue import RunQueue
+
+pytestmark = pytest.mark.usefixtures('size_info')
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = JobServer(RunQueue(tmp_path / 'server'))
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.mark.benchmark(group='executors')
+def test_remote_upload(benchmark, datastore, server, tmp_path):
+    server.queue.stop()
+    settings_path, _, _ = datastore.export_to_folder(str(tmp_path / 'export'))
+    files = {
+        path.relative_to(settings_path.parent).as_posix(): base64.b64encode(path.read_bytes()).decode('ascii')
+        for path in settings_path.parent.rglob('*') if path.is_file()
+    }
+    executor = RemoteExecutor(server.url)
+    benchmark.pedantic(executor._request, args=('POST', '/jobs', {'settings': 'settings.toml', 'files': files}), rounds=3)
+    assert server.queue.jobs()
@@ -0,0 +1,15 @@
+import pytest
+
+from muse_gui.backend.object_store import ObjectStore
+
+pytestmark = pytest.mark.usefixtures('size_info')
+
+
+@pytest.mark.benchmark(group='export')
+def test_export_to_object_store(benchmark, datastore, tmp_path):
+    store = ObjectStore(tmp_path / 'objects')
+    datastore.export_to_folder(str(tmp_path / 'a'), object_store=store)
+    written = store.written
+    benchmark.pedantic(datastore.export_to_folder, args=(str(tmp_path / 'b'),), kwargs={'object_store': store}, rounds=3)
+    # Only settings.toml, which names the export folder, is written again
+    assert store.written - written <= 1
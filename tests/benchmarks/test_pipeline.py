@@ -0,0 +1,23 @@
+import pytest
+
+from muse_gui.backend.resources.datastore import Datastore
+
+pytestmark = pytest.mark.usefixtures('size_info')
+
+
+@pytest.mark.benchmark(group='from_settings')
+def test_from_settings(benchmark, settings_path):
+    datastore = benchmark.pedantic(Datastore.from_settings, args=(str(settings_path),), rounds=3, iterations=1)
+    assert len(datastore.process.list()) > 0
+
+
+@pytest.mark.benchmark(group='validate_settings')
+def test_validate_settings(benchmark, settings_path):
+    problems = benchmark(Datastore.validate_settings, str(settings_path))
+    assert problems == []
+
+
+@pytest.mark.benchmark(group='export_to_folder')
+def test_export_to_folder(benchmark, datastore, tmp_path):
+    settings, _, _ = benchmark.pedantic(datastore.export_to_folder, args=(str(tmp_path),), rounds=3, iterations=1)
+    assert settings.exists()
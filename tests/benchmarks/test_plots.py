@@ -0,0 +1,20 @@
+import pandas as pd
+import pytest
+
+from muse_gui.backend.plots import capacity_data_frame_to_plots, price_data_frame_to_plots
+
+pytestmark = pytest.mark.usefixtures('size_info')
+
+
+@pytest.mark.benchmark(group='capacity_plots')
+def test_capacity_plots(benchmark, settings_path):
+    dataframe = pd.read_csv(settings_path.parent / 'Results' / 'MCACapacity.csv')
+    plots = benchmark(capacity_data_frame_to_plots, dataframe)
+    assert len(plots) > 0
+
+
+@pytest.mark.benchmark(group='price_plots')
+def test_price_plots(benchmark, settings_path):
+    dataframe = pd.read_csv(settings_path.parent / 'Results' / 'MCAPrices.csv')
+    plots = benchmark(price_data_frame_to_plots, dataframe)
+    assert len(plots) > 0
@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+from muse_gui.backend.results_dataset import ResultsDataset
+
+pytestmark = pytest.mark.usefixtures('size_info')
+
+
+@pytest.mark.benchmark(group='results_dataset')
+def test_read_slice(benchmark, settings_path):
+    dataset = ResultsDataset(settings_path.parent / 'Results')
+    sector, step = dataset.sectors()[0], dataset.steps('capacity')[0]
+    frame = benchmark(dataset.read, 'capacity', sector=sector, step=step, columns=['technology', 'capacity'])
+
+    # Only the selected file is read, and only the selected columns
+    assert len(dataset.select('capacity', sector, step)) == 1
+    expected = pd.read_csv(dataset.select('capacity', sector, step)[0].path)
+    assert list(frame.columns) == ['technology', 'capacity']
+    pd.testing.assert_frame_equal(frame, expected[['technology', 'capacity']])
+
+
+@pytest.mark.benchmark(group='results_dataset')
+def test_read_all(benchmark, settings_path):
+    dataset = ResultsDataset(settings_path.parent / 'Results')
+    frame = benchmark(dataset.read, 'Capacity')
+    partitions = dataset.select('capacity')
+    assert len(partitions) == len(dataset.sectors()) * len(dataset.steps())
+    assert len(frame) == sum(len(pd.read_csv(partition.path)) for partition in partitions)
+    assert list(frame.columns[:2]) == ['sector', 'step']
+    assert set(frame['sector']) == set(dataset.sectors())
+    # Missing quantities and columns are empty rather than errors
+    assert dataset.read('supply', columns=['supply']).empty
+    assert dataset.read('capacity', step=dataset.steps()[0], columns=['commodity'])['commodity'].isna().all()
@@ -0,0 +1,38 @@
+import os
+import shutil
+
+import pytest
+
+from muse_gui.backend.results_db import ResultsDB
+
+pytestmark = pytest.mark.usefixtures('size_info')
+
+RUNS = 20
+
+
+def _ingest(results, folder, label=None):
+    return results.ingest(folder / 'MCAPrices.csv', folder / 'MCACapacity.csv', label)
+
+
+@pytest.mark.benchmark(group='results_db')
+def test_ingest(benchmark, settings_path, tmp_path):
+    folder = settings_path.parent / 'Results'
+    databases = iter(range(1000))
+
+    def setup():
+        return (ResultsDB(tmp_path / f'{next(databases)}.sqlite'), folder), {}
+
+    benchmark.pedantic(_ingest, setup=setup, rounds=3)
+    assert not ResultsDB(tmp_path / '0.sqlite').capacity().empty
+
+
+@pytest.mark.benchmark(group='results_db')
+def test_query_across_runs(benchmark, settings_path, tmp_path):
+    results = ResultsDB(tmp_path / 'results.sqlite')
+    for i in range(RUNS):
+        folder = tmp_path / str(i)
+        shutil.copytree(settings_path.parent / 'Results', folder, copy_function=os.link)
+        _ingest(results, folder, str(i))
+
+    frame = benchmark(results.capacity, region='R1', year=[2020, 2025])
+    assert sorted(frame['run'].unique()) == [run.id for run in results.runs()]
@@ -0,0 +1,12 @@
+import pytest
+
+from muse_gui.backend.run_queue import QUEUED, RunQueue
+
+pytestmark = pytest.mark.usefixtures('size_info')
+
+
+@pytest.mark.benchmark(group='run_queue')
+def test_queue_run(benchmark, datastore, tmp_path):
+    queue = RunQueue(tmp_path)
+    job = benchmark.pedantic(datastore.queue_run, args=(queue,), kwargs={'label': 'test'}, rounds=3)
+    assert job.status == QUEUED
@@ -0,0 +1,41 @@
+import pytest
+
+from muse_gui.backend.resources.datastore.search import AGENT_FACETS, PROCESS_FACETS, SearchIndex
+
+pytestmark = pytest.mark.usefixtures('size_info')
+
+
+@pytest.mark.benchmark(group='search_index')
+def test_build_index(benchmark, datastore):
+    index = benchmark(SearchIndex, datastore.process, PROCESS_FACETS)
+    assert len(index) == len(datastore.process.list())
+    index.close()
+
+
+@pytest.mark.benchmark(group='search')
+def test_typing(benchmark, datastore):
+    index = SearchIndex(datastore.process, PROCESS_FACETS)
+    name = datastore.process.list()[-1]
+
+    def typing():
+        return [index.search(name[:i]) for i in range(1, len(name) + 1)]
+
+    results = benchmark(typing)
+    for i, result in enumerate(results, start=1):
+        assert result == [k for k in datastore.process.list() if name[:i].lower() in k.lower()]
+    index.close()
+
+
+@pytest.mark.benchmark(group='search')
+def test_facets(benchmark, datastore):
+    index = SearchIndex(datastore.agent, AGENT_FACETS)
+    sector = datastore.sector.list()[0]
+    region = datastore.region.list()[0]
+    result = benchmark(index.query, f'sector:{sector} region:{region}')
+    expected = [
+        k for k in datastore.agent.list()
+        if sector in datastore.agent.read(k).sectors and region in datastore.agent.read(k).new
+    ]
+    assert result == expected
+    index.close()
+
@@ -0,0 +1,27 @@
+import pytest
+
+from muse_gui.backend.solver import SolverWorker
+
+
+@pytest.fixture
+def worker():
+    worker = SolverWorker()
+    worker.start()
+    yield worker
+    worker.stop()
+
+
+@pytest.mark.benchmark(group='solver')
+def test_ping(benchmark, worker):
+    assert benchmark(worker.ping)
+
+
+@pytest.mark.benchmark(group='solver')
+def test_restart_after_crash(benchmark, worker):
+    def crash():
+        worker._process.kill()
+        worker._process.join()
+        worker.start()
+        return worker.ping()
+
+    assert benchmark.pedantic(crash, rounds=3)
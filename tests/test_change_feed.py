@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import pytest
+
+from muse_gui.backend.resources.datastore import Datastore
+
+SETTINGS = str(Path(__file__).parents[1] / 'examples' / 'example_data' / 'settings.toml')
+
+
+@pytest.fixture
+def datastore():
+    return Datastore.from_settings(SETTINGS)
+
+
+@pytest.fixture
+def events(datastore):
+    events = []
+    datastore.subscribe(events.append)
+    return events
+
+
+def renamed(datastore, name, new_name):
+    process = datastore.process.read(name).copy(deep=True)
+    process.name = new_name
+    datastore.process.update(name, process)
+
+
+def test_versions_count_changes(datastore):
+    process = datastore.process.read('gasboiler').copy(deep=True)
+    store_version, version = datastore.process.version, datastore.version
+
+    datastore.process.delete('gasboiler')
+    assert datastore.process.version == store_version + 1
+    assert datastore.version == version + 1
+
+    datastore.process.create(process)
+    assert datastore.process.version == store_version + 2
+
+    process = process.copy(deep=True)
+    process.sector = 'power'
+    datastore.process.update('gasboiler', process)
+    assert datastore.process.version == store_version + 3
+    assert datastore.version == version + 3
+
+    # Reads leave versions alone
+    datastore.process.read('gasboiler')
+    datastore.process.list()
+    assert datastore.version == version + 3
+
+
+def test_events_carry_store_versions(datastore, events):
+    process = datastore.process.read('gasboiler').copy(deep=True)
+    datastore.process.delete('gasboiler')
+    datastore.process.create(process)
+    assert [(e.store, e.action, e.key) for e in events] == [
+        (datastore.process, 'delete', 'gasboiler'),
+        (datastore.process, 'create', 'gasboiler'),
+    ]
+    assert [e.version for e in events] == [datastore.process.version - 1, datastore.process.version]
+
+
+def test_rename_is_one_update(datastore, events):
+    store_events = []
+    datastore.process.subscribe(store_events.append)
+    version = datastore.process.version
+    renamed(datastore, 'gasboiler', 'gasboiler2')
+
+    [event] = store_events
+    assert events == store_events
+    assert (event.action, event.key, event.previous_key) == ('update', 'gasboiler2', 'gasboiler')
+    assert event.version == datastore.process.version == version + 1
+    assert 'gasboiler' not in datastore.process.list()
+
+
+def test_subscribe_sees_every_store(datastore, events):
+    for store in datastore.stores:
+        key = store.list()[-1]
+        store.update(key, store.read(key).copy(deep=True))
+    assert [event.store for event in events] == datastore.stores
+    assert all(event.action == 'update' and event.previous_key is None for event in events)
+
+
+def test_unsubscribe(datastore, events):
+    callback = datastore.process.subscribe(lambda event: events.append(('store', event)))
+    datastore.unsubscribe(events.append)
+    datastore.process.unsubscribe(callback)
+    renamed(datastore, 'gasboiler', 'gasboiler2')
+    assert events == []
@@ -0,0 +1,129 @@
+import inspect
+import json
+from pathlib import Path
+
+import pytest
+
+from muse_gui import cli
+
+EXAMPLE = Path(__file__).parents[1] / 'examples' / 'example_data'
+SETTINGS = str(EXAMPLE / 'settings.toml')
+
+
+def run(capsys, *argv):
+    code = cli.main(list(argv))
+    return code, json.loads(capsys.readouterr().out)
+
+
+def test_validate(capsys):
+    code, stats = run(capsys, 'validate', SETTINGS)
+    assert code == 0
+    assert stats['ok'] is True and stats['problems'] == []
+
+
+def test_validate_missing_settings(capsys, tmp_path):
+    code, stats = run(capsys, 'validate', str(tmp_path / 'settings.toml'))
+    assert code == 1
+    assert stats['ok'] is False
+    assert stats['problems'] == [{'path': str(tmp_path / 'settings.toml'), 'message': 'file not found'}]
+
+
+def test_load(capsys):
+    code, stats = run(capsys, 'load', SETTINGS)
+    assert code == 0
+    assert stats['datastore']['regions'] == 1
+    assert stats['datastore']['sectors'] == 4
+    assert stats['datastore']['agents'] == 1
+    assert stats['timings']['load'] > 0
+
+
+def test_export(capsys, tmp_path):
+    code, stats = run(capsys, '--spans', 'export', SETTINGS, str(tmp_path))
+    assert code == 0
+    assert Path(stats['exported_settings']) == (tmp_path / 'settings.toml').absolute()
+    assert stats['output']['files'] == len([p for p in tmp_path.rglob('*') if p.is_file()])
+    assert any(span['name'] == 'export_to_folder' for span in stats['spans'])
+
+
+def test_export_to_object_store(capsys, tmp_path):
+    code, _ = run(capsys, 'export', SETTINGS, str(tmp_path / 'a'), '--object-store', str(tmp_path / 'objects'))
+    assert code == 0
+    code, _ = run(capsys, 'export', SETTINGS, str(tmp_path / 'b'))
+    assert code == 0
+    for path in (tmp_path / 'b').rglob('*.csv'):
+        assert path.read_bytes() == (tmp_path / 'a' / path.relative_to(tmp_path / 'b')).read_bytes()
+
+
+def test_plot_data_without_input(capsys):
+    code, stats = run(capsys, 'plot-data')
+    assert code == 1
+    assert 'error' in stats
+
+
+def test_plot_data(capsys, tmp_path):
+    results = EXAMPLE / 'Results'
+    code, stats = run(
+        capsys, 'plot-data', str(results / 'MCACapacity.csv'), str(results / 'MCAPrices.csv'), '--output', str(tmp_path)
+    )
+    assert code == 0
+    assert stats['plots']['capacity'] > 0
+    assert stats['output']['files'] > 0
+
+
+def test_results(capsys, tmp_path):
+    db = str(tmp_path / 'results.sqlite')
+    code, stats = run(capsys, 'results', '--db', db, 'ingest', str(EXAMPLE / 'Results'), '--label', 'example')
+    assert code == 0
+    assert [run['label'] for run in stats['runs']] == ['example']
+
+    code, stats = run(capsys, 'results', '--db', db, 'query', 'capacity', '--sector', 'power', '--output', str(tmp_path / 'q.csv'))
+    assert code == 0
+    assert stats['rows'] > 0 and (tmp_path / 'q.csv').is_file()
+
+    code, stats = run(capsys, 'results', '--db', db, 'query', 'prices', '--agent', 'A1')
+    assert code == 1
+    assert stats['error'] == 'prices cannot be filtered by agent'
+
+    code, stats = run(capsys, 'results', '--db', db, 'query', 'sector', '--region', 'R1', '--agent', 'A1', '--step', '2020')
+    assert code == 1
+    assert stats['error'] == 'sector cannot be filtered by agent'
+
+    code, stats = run(capsys, 'results', '--db', db, 'remove', '7')
+    assert code == 1
+    assert stats['error'] == 'No run 7'
+
+
+def test_results_query_filters_match_db():
+    from muse_gui.backend.results_db import ResultsDB
+
+    methods = {'capacity': ResultsDB.capacity, 'prices': ResultsDB.prices, 'sector': ResultsDB.sector_results}
+    for table, method in methods.items():
+        parameters = set(inspect.signature(method).parameters) - {'self', 'quantity'}
+        assert set(cli.QUERY_TABLE_FILTERS[table]) == parameters
+        assert parameters <= set(cli.QUERY_FILTERS)
+
+
+def test_results_query_errors_propagate(capsys, tmp_path, monkeypatch):
+    from muse_gui.backend.results_db import ResultsDB
+
+    def broken(self, **filters):
+        raise TypeError('broken query')
+
+    monkeypatch.setattr(ResultsDB, 'prices', broken)
+    with pytest.raises(TypeError, match='broken query'):
+        cli.main(['results', '--db', str(tmp_path / 'results.sqlite'), 'query', 'prices', '--region', 'R1'])
+
+
+def test_results_scan(capsys):
+    code, stats = run(
+        capsys, 'results', 'scan', str(EXAMPLE / 'Results'), 'supply', '--step', '2020', '--column', 'supply'
+    )
+    assert code == 0
+    assert stats['files'] == {'selected': 1, 'total': 7}
+    assert stats['columns'] == ['supply']
+
+
+def test_unknown_command():
+    with pytest.raises(SystemExit) as excinfo:
+        cli.main(['unknown'])
+    assert excinfo.value.code == 2
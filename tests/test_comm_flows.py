@@ -0,0 +1,80 @@
+import csv
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from muse_gui.backend.resources.datastore import Datastore
+from muse_gui.backend.synthetic import ModelSize, generate_model
+
+EXAMPLE = Path(__file__).parents[1] / 'examples' / 'example_data'
+KEY = ['ProcessName', 'RegionName', 'Time', 'Level']
+
+
+def read_flows(path):
+    """Frame of a CommIn/CommOut file without its unit row, indexed by process, region, time and level"""
+    frame = pd.read_csv(path, dtype={'Time': str})
+    frame = frame[frame['ProcessName'] != 'Unit'].set_index(KEY)
+    return frame.astype(float).sort_index(axis=0).sort_index(axis=1)
+
+
+def nonzero(frame):
+    values = frame.stack()
+    return values[values != 0].to_dict()
+
+
+def process_flows(datastore):
+    return {
+        name: (
+            sorted(tuple(flow.dict().values()) for flow in datastore.process.read(name).comm_in),
+            sorted(tuple(flow.dict().values()) for flow in datastore.process.read(name).comm_out),
+        )
+        for name in datastore.process.list()
+    }
+
+
+@pytest.mark.parametrize('sector', ['gas', 'power', 'residential'])
+@pytest.mark.parametrize('file_name', ['CommIn.csv', 'CommOut.csv'])
+def test_example_round_trip(tmp_path, sector, file_name):
+    Datastore.from_settings(str(EXAMPLE / 'settings.toml')).export_to_folder(str(tmp_path))
+    exported = read_flows(tmp_path / 'technodata' / sector / file_name)
+    pd.testing.assert_frame_equal(exported, read_flows(EXAMPLE / 'technodata' / sector / file_name))
+
+
+@pytest.fixture
+def multi_year_model(tmp_path):
+    """Synthetic model whose first sector has flows in two regions and two years"""
+    settings_path = generate_model(tmp_path / 'model', ModelSize(regions=2, sectors=2, processes=2, years=3))
+    for file_name in ['CommIn.csv', 'CommOut.csv']:
+        path = settings_path.parent / 'technodata' / 'sector1' / file_name
+        with open(path, newline='') as f:
+            header, units, *rows = list(csv.reader(f))
+        new_rows = []
+        for row in rows:
+            for i, (region, year) in enumerate([('R1', '2020'), ('R1', '2025'), ('R2', '2020'), ('R2', '2030')]):
+                values = [str(float(value) * (i + 1)) for value in row[4:]]
+                new_rows.append([row[0], region, year, row[3]] + values)
+        with open(path, 'w', newline='') as f:
+            csv.writer(f).writerows([header, units] + new_rows)
+    return settings_path
+
+
+@pytest.mark.parametrize('file_name', ['CommIn.csv', 'CommOut.csv'])
+def test_multi_year_round_trip(tmp_path, multi_year_model, file_name):
+    original = read_flows(multi_year_model.parent / 'technodata' / 'sector1' / file_name)
+    datastore = Datastore.from_settings(str(multi_year_model))
+    settings_path, _, _ = datastore.export_to_folder(str(tmp_path / 'export'))
+    exported = read_flows(settings_path.parent / 'technodata' / 'sector1' / file_name)
+
+    # The same flows, plus empty rows for the technodata's other years
+    assert nonzero(exported) == pytest.approx(nonzero(original))
+    technodata = pd.read_csv(multi_year_model.parent / 'technodata' / 'sector1' / 'Technodata.csv', dtype={'Time': str})
+    rows = set(technodata[technodata['ProcessName'] != 'Unit'].set_index(KEY).index)
+    assert set(exported.index) == rows | set(original.index)
+
+    reimported = Datastore.from_settings(str(settings_path))
+    assert process_flows(reimported) == process_flows(datastore)
+    # Exporting the re-imported model changes nothing
+    again, _, _ = reimported.export_to_folder(str(tmp_path / 'again'))
+    pd.testing.assert_frame_equal(read_flows(again.parent / 'technodata' / 'sector1' / file_name), exported)
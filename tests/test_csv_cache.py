@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from muse_gui.backend.resources.datastore.csv_cache import csv_cache, read_csv
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({'a': [1, 2]}).to_csv(path, index=False)
+    return path
+
+
+def test_nested_cache_is_shared(path, tmp_path):
+    with csv_cache(tmp_path / 'cache') as outer:
+        first = read_csv(path)
+        with csv_cache() as inner, csv_cache(tmp_path / 'cache') as same:
+            assert inner is outer and same is outer
+            assert read_csv(path) is first
+    assert outer.misses == 1 and outer.hits == 1
+    assert len(list((tmp_path / 'cache').glob('*.pkl'))) == 1
+
+
+def test_nested_cache_with_another_folder_raises(path, tmp_path):
+    with csv_cache(tmp_path / 'a'):
+        with pytest.raises(ValueError, match='nested'):
+            with csv_cache(tmp_path / 'b'):
+                pass
+    with csv_cache():
+        with pytest.raises(ValueError, match='nested'):
+            with csv_cache(tmp_path / 'b'):
+                pass
+
+
+def test_persisted_frames_are_reused(path, tmp_path):
+    with csv_cache(tmp_path / 'cache'):
+        read_csv(path)
+    with csv_cache(tmp_path / 'cache') as cache:
+        pd.testing.assert_frame_equal(read_csv(path), pd.read_csv(path))
+    assert cache.hits == 1 and cache.misses == 0
@@ -0,0 +1,9 @@
+import pytest
+
+from muse_gui.backend.resources.datastore import Datastore  # noqa: F401, imported first to avoid a cycle
+from muse_gui.backend.data.agent import AgentObjective
+
+
+@pytest.mark.parametrize('value, expected', [(float('nan'), None), (None, None), (True, True), (False, False)])
+def test_objective_sort_nan_is_none(value, expected):
+    assert AgentObjective(objective_data=1.0, objective_sort=value).objective_sort is expected
@@ -0,0 +1,112 @@
+import base64
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from muse_gui.backend.executors import RemoteExecutor, SubprocessExecutor, output_paths
+from muse_gui.backend.job_server import JobServer
+from muse_gui.backend.resources.datastore import Datastore
+from muse_gui.backend.run_queue import RunQueue
+from muse_gui.backend.solver import SolverError
+
+SETTINGS = str(Path(__file__).parents[1] / 'examples' / 'example_data' / 'settings.toml')
+
+needs_no_muse = pytest.mark.skipif(importlib.util.find_spec('muse') is not None, reason='MUSE is installed')
+needs_limits = pytest.mark.skipif(not hasattr(os, 'sched_setaffinity'), reason='CPU affinity is not supported')
+
+
+@pytest.fixture(scope='module')
+def datastore():
+    return Datastore.from_settings(SETTINGS)
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = JobServer(RunQueue(tmp_path / 'server'))
+    server.start()
+    yield server
+    server.stop()
+
+
+@needs_limits
+def test_subprocess_command():
+    executor = SubprocessExecutor(cpus=[3, 1], memory_limit=2**30)
+    assert executor._command(Path('settings.toml'))[-5:] == [
+        'settings.toml', '--cpus', '1,3', '--memory-limit', str(2**30)
+    ]
+    assert SubprocessExecutor()._command(Path('settings.toml'))[-1] == 'settings.toml'
+
+
+@needs_limits
+def test_child_limits_itself():
+    cpu = min(os.sched_getaffinity(0))
+    code = (
+        'import os, resource\n'
+        'from muse_gui.backend.executors import _limit\n'
+        f'_limit([{cpu}], 2**32)\n'
+        'print(sorted(os.sched_getaffinity(0)), resource.getrlimit(resource.RLIMIT_AS)[0])'
+    )
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert output.split() == [f'[{cpu}]', str(2**32)]
+
+
+@needs_no_muse
+@needs_limits
+def test_subprocess_runs_from_threads():
+    # As from the slots of a run queue; the limits are applied by the child
+    cpu = min(os.sched_getaffinity(0))
+    errors = []
+
+    def run():
+        try:
+            SubprocessExecutor(cpus=[cpu], memory_limit=2**32).run(Path(SETTINGS))
+        except SolverError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(120)
+    # The child got past its limits and the arguments to the import of MUSE
+    assert len(errors) == 4 and all("No module named 'muse'" in error for error in errors)
+
+
+@needs_no_muse
+def test_remote_round_trip(datastore, server, tmp_path):
+    # The server reports MUSE's import error back to the client
+    executor = RemoteExecutor(server.url, poll_interval=0.05)
+    with pytest.raises(SolverError, match='muse'):
+        datastore.run_muse(str(tmp_path / 'export'), executor=executor)
+    # Finished jobs are cleaned up on the server
+    assert server.queue.jobs() == []
+    assert list((server.queue.folder / 'exports').iterdir()) == []
+
+
+def test_remote_upload(datastore, server, tmp_path):
+    server.queue.stop()
+    settings_path, _, _ = datastore.export_to_folder(str(tmp_path / 'export'))
+    files = {
+        path.relative_to(settings_path.parent).as_posix(): base64.b64encode(path.read_bytes()).decode('ascii')
+        for path in settings_path.parent.rglob('*') if path.is_file()
+    }
+    executor = RemoteExecutor(server.url)
+    job = executor._request('POST', '/jobs', {'settings': 'settings.toml', 'files': files})
+    uploaded = Path(server.queue.get(job['id']).settings_path)
+    assert len(list(uploaded.parent.rglob('*.csv'))) == sum(name.endswith('.csv') for name in files)
+    # Outputs are redirected into the job's folder on the server
+    for path in output_paths(uploaded).values():
+        assert uploaded.parent in path.parents
+
+
+def test_upload_outside_job_folder(server):
+    server.queue.stop()
+    executor = RemoteExecutor(server.url)
+    with pytest.raises(SolverError, match='outside the job folder'):
+        executor._request('POST', '/jobs', {'settings': '../x', 'files': {'../x': ''}})
+    assert server.queue.jobs() == []
@@ -0,0 +1,128 @@
+from pathlib import Path
+
+import pytest
+
+from muse_gui.backend.resources.datastore import Datastore
+from muse_gui.backend.resources.datastore.journal import UNDO_HISTORY, Journal, JournalEntry
+
+SETTINGS = str(Path(__file__).parents[1] / 'examples' / 'example_data' / 'settings.toml')
+
+
+@pytest.fixture
+def datastore():
+    return Datastore.from_settings(SETTINGS)
+
+
+def contents(datastore):
+    return {store: dict(store._data) for store in datastore.stores}
+
+
+def set_sector(datastore, name, sector):
+    process = datastore.process.read(name).copy(deep=True)
+    process.sector = sector
+    datastore.process.update(name, process)
+
+
+def test_loaded_model_has_no_history(datastore):
+    assert not datastore.can_undo and not datastore.can_redo
+    assert not datastore.undo() and not datastore.redo()
+
+
+def test_undo_delete(datastore):
+    # Deleting a region cascades to its processes, agents and commodities
+    before = contents(datastore)
+    datastore.region.delete('R1')
+    after = contents(datastore)
+    assert datastore.process.list() == []
+    assert datastore.undo()
+    assert contents(datastore) == before
+    assert datastore.can_redo
+    assert datastore.redo()
+    assert contents(datastore) == after
+    assert not datastore.can_redo
+
+
+def test_undo_transaction(datastore):
+    # A rename and the deletes in a transaction are undone one step at a time
+    before = contents(datastore)
+    sector = datastore.sector.read('gas')
+    datastore.sector.update('gas', sector.copy(update={'name': 'gas_renamed'}))
+    renamed = contents(datastore)
+    with datastore.transaction():
+        for level in datastore.level_name.list():
+            datastore.level_name.delete(level)
+    assert datastore.level_name.list() == []
+    assert datastore.undo()
+    assert contents(datastore) == renamed
+    assert datastore.undo()
+    assert contents(datastore) == before
+    assert not datastore.can_undo
+
+
+def test_redo_steps(datastore):
+    set_sector(datastore, 'gasboiler', 'power')
+    set_sector(datastore, 'gasboiler', 'gas')
+    assert datastore.undo() and datastore.undo()
+    assert datastore.process.read('gasboiler').sector == 'residential'
+    assert datastore.redo()
+    assert datastore.process.read('gasboiler').sector == 'power'
+    assert datastore.redo()
+    assert datastore.process.read('gasboiler').sector == 'gas'
+    assert not datastore.redo()
+
+
+def test_edit_clears_redo(datastore):
+    set_sector(datastore, 'gasboiler', 'power')
+    assert datastore.undo()
+    set_sector(datastore, 'heatpump', 'power')
+    assert not datastore.can_redo
+    assert datastore.undo()
+    assert datastore.process.read('heatpump').sector == 'residential'
+    assert datastore.process.read('gasboiler').sector == 'residential'
+    assert not datastore.can_undo
+
+
+def test_history_is_capped(datastore):
+    for i in range(UNDO_HISTORY + 5):
+        set_sector(datastore, 'gasboiler', 'power' if i % 2 == 0 else 'gas')
+    undone = 0
+    while datastore.undo():
+        undone += 1
+    assert undone == UNDO_HISTORY
+    # The oldest edits are forgotten: this is the model after the first five
+    assert datastore.process.read('gasboiler').sector == 'power'
+
+
+def test_nested_transactions_are_one_step(datastore):
+    before = contents(datastore)
+    with datastore.transaction():
+        set_sector(datastore, 'gasboiler', 'power')
+        with datastore.transaction():
+            datastore.process.delete('heatpump')
+        # The inner transaction is not a step of its own
+        assert not datastore.can_undo
+    assert datastore.undo()
+    assert contents(datastore) == before
+    assert not datastore.can_undo
+
+
+def test_journal_steps():
+    journal = Journal(max_size=2)
+    entries = [JournalEntry(None, 'create', str(i), None, None) for i in range(3)]
+    journal.begin()
+    journal.record(entries[0])
+    journal.begin()
+    journal.record(entries[1])
+    journal.end()
+    assert not journal.can_undo
+    journal.end()
+    assert list(journal._undo) == [entries[:2]]
+    # A step without changes is not recorded
+    journal.begin()
+    journal.end()
+    assert len(journal._undo) == 1
+    for entry in entries:
+        journal.begin()
+        journal.record(entry)
+        journal.end()
+    assert list(journal._undo) == [[entries[1]], [entries[2]]]
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+
+from muse_gui.backend.resources.datastore import Datastore
+from muse_gui.backend.resources.datastore.exceptions import LoadCancelled
+
+SETTINGS = str(Path(__file__).parents[1] / 'examples' / 'example_data' / 'settings.toml')
+
+STAGES = [
+    'Reading settings',
+    'Reading commodities',
+    'Reading sectors',
+    'Reading agents',
+    'Reading preset demands',
+    'Importing residential processes',
+    'Importing power processes',
+    'Importing gas processes',
+    'Importing residential_presets processes',
+    'Building datastore',
+]
+
+
+def load(progress):
+    return Datastore.from_settings(SETTINGS, progress=progress)
+
+
+def test_every_stage_is_reported():
+    calls = []
+    datastore = load(lambda stage, fraction: calls.append((stage, fraction)))
+    assert list(dict.fromkeys(stage for stage, _ in calls)) == STAGES
+    fractions = [fraction for _, fraction in calls]
+    assert fractions == sorted(fractions)
+    assert 0 <= fractions[0] and fractions[-1] < 1
+    assert datastore.process.list() == Datastore.from_settings(SETTINGS).process.list()
+
+
+@pytest.mark.parametrize('stop_at', ['Reading settings', 'Reading agents', 'Importing power processes', 'Building datastore'])
+def test_cancel_stops_loading(stop_at):
+    calls = []
+
+    def progress(stage, fraction):
+        calls.append(stage)
+        if stage == stop_at:
+            raise LoadCancelled(SETTINGS)
+
+    with pytest.raises(LoadCancelled):
+        load(progress)
+    # Nothing is reported after the callback cancels
+    assert calls[-1] == stop_at and calls.count(stop_at) == 1
+    assert list(dict.fromkeys(calls)) == STAGES[:STAGES.index(stop_at) + 1]
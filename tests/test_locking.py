@@ -0,0 +1,114 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from muse_gui.backend.resources.datastore import Datastore
+from muse_gui.backend.resources.datastore.locking import ReadWriteLock
+
+SETTINGS = str(Path(__file__).parents[1] / 'examples' / 'example_data' / 'settings.toml')
+
+
+def run(target):
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_readers_share():
+    lock = ReadWriteLock()
+    both = threading.Barrier(2, timeout=5)
+
+    def read():
+        with lock.read():
+            both.wait()
+
+    # Would time out if the second reader waited for the first
+    thread = run(read)
+    read()
+    thread.join()
+
+
+def test_writer_excludes_readers():
+    lock = ReadWriteLock()
+    read = threading.Event()
+
+    def reader():
+        with lock.read():
+            read.set()
+
+    with lock.write():
+        thread = run(reader)
+        assert not read.wait(0.2)
+    assert read.wait(5)
+    thread.join()
+
+
+def test_waiting_writer_blocks_new_readers():
+    lock = ReadWriteLock()
+    order = []
+    lock.acquire_read()
+    writer = run(lambda: (lock.acquire_write(), order.append('write'), lock.release_write()))
+    while not lock._writers_waiting:
+        time.sleep(0.01)
+    reader = run(lambda: (lock.acquire_read(), order.append('read'), lock.release_read()))
+    reader.join(0.2)
+    assert reader.is_alive() and order == []
+    lock.release_read()
+    writer.join(5)
+    reader.join(5)
+    assert order == ['write', 'read']
+
+
+def test_reentrant():
+    lock = ReadWriteLock()
+    with lock.write():
+        with lock.write():
+            # The writer may read too
+            with lock.read():
+                pass
+        assert lock._writer == threading.get_ident()
+    assert lock._writer is None
+    with lock.read():
+        with lock.read():
+            pass
+    assert lock._readers == {}
+
+
+def test_read_lock_cannot_upgrade():
+    lock = ReadWriteLock()
+    with lock.read():
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
+    # The failed upgrade left nothing behind
+    with lock.write():
+        pass
+
+
+def test_reads_during_delete():
+    # Readers holding the lock never see half of a delete cascade
+    datastore = Datastore.from_settings(SETTINGS)
+    stop = threading.Event()
+    errors = []
+    checks = []
+
+    def check():
+        while not stop.is_set():
+            with datastore.lock.read():
+                regions = set(datastore.region.list())
+                for key in datastore.process.list():
+                    process = datastore.process.read(key)
+                    if not {t.region for t in process.technodatas} <= regions:
+                        errors.append(key)
+            checks.append(1)
+
+    readers = [run(check) for _ in range(2)]
+    while not checks:
+        time.sleep(0.01)
+    datastore.region.delete('R1')
+    stop.set()
+    for reader in readers:
+        reader.join()
+    assert errors == []
+    assert datastore.process.list() == []
@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('PySimpleGUI')
+
+from muse_gui.backend.executors import Executor  # noqa: E402
+from muse_gui.backend.resources.datastore import Datastore  # noqa: E402
+from muse_gui.backend.solver import SolverError  # noqa: E402
+from muse_gui.frontend.windows import main_window  # noqa: E402
+from muse_gui.frontend.windows.main_window import _Background, _run_model  # noqa: E402
+
+EXAMPLE = Path(__file__).parents[1] / 'examples' / 'example_data'
+
+
+class FakeExecutor(Executor):
+    def __init__(self):
+        self.started = self.closed = False
+
+    def start(self):
+        self.started = True
+
+    def run(self, settings_path):
+        raise SolverError('MUSE exited with code 1')
+
+    def close(self):
+        self.closed = True
+
+
+class FakeQueue:
+    def __init__(self, folder, config):
+        self.started = self.stopped = False
+
+    def start(self):
+        self.started = True
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def background(tmp_path, monkeypatch):
+    executors = []
+    queues = []
+
+    def make_executor(spec):
+        executors.append(FakeExecutor())
+        return executors[-1]
+
+    def run_queue(folder, config):
+        queues.append(FakeQueue(folder, config))
+        return queues[-1]
+
+    monkeypatch.setattr(main_window, 'make_executor', make_executor)
+    monkeypatch.setattr(main_window, 'RunQueue', run_queue)
+    background = _Background(tmp_path / 'runs')
+    background.executors, background.queues = executors, queues
+    return background
+
+
+def test_nothing_starts_until_used(background):
+    background.close()
+    assert background.executors == [] and background.queues == []
+    # The results database is there to plot runs without starting the queue
+    assert background.results().path == background.run_dir / 'results.sqlite'
+    assert background.queues == []
+
+
+def test_started_once_and_closed(background):
+    assert background.executor() is background.executor()
+    assert background.run_queue() is background.run_queue()
+    [executor], [queue] = background.executors, background.queues
+    assert executor.started and queue.started
+    background.close()
+    assert executor.closed and queue.stopped
+    # Used again after closing, they start afresh
+    assert background.executor() is not executor
+
+
+def test_failed_run(background, monkeypatch, tmp_path):
+    datastore = Datastore.from_settings(str(EXAMPLE / 'settings.toml'))
+
+    def boot_waiting_window(font, datastore, executor):
+        return datastore.run_muse(export_path=str(tmp_path / 'export'), executor=executor)
+
+    monkeypatch.setattr(main_window, 'boot_waiting_window', boot_waiting_window)
+    with pytest.raises(SolverError):
+        _run_model(None, datastore, background)
+    # Nothing was ingested, and the worker is left for the next run
+    assert background.results().runs() == []
+    [executor] = background.executors
+    assert not executor.closed and background.queues == []
+
+
+def test_run_is_ingested(background, monkeypatch):
+    results = EXAMPLE / 'Results'
+
+    def boot_waiting_window(font, datastore, executor):
+        return results / 'MCAPrices.csv', results / 'MCACapacity.csv'
+
+    monkeypatch.setattr(main_window, 'boot_waiting_window', boot_waiting_window)
+    run_id = _run_model(None, Datastore(), background)
+    assert [run.id for run in background.results().runs()] == [run_id]
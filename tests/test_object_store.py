@@ -0,0 +1,124 @@
+import filecmp
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from muse_gui.backend.object_store import ObjectStore
+from muse_gui.backend.resources.datastore import Datastore
+
+SETTINGS = str(Path(__file__).parents[1] / 'examples' / 'example_data' / 'settings.toml')
+
+
+@pytest.fixture(scope='module')
+def datastore():
+    return Datastore.from_settings(SETTINGS)
+
+
+def _files(folder):
+    return sorted(path.relative_to(folder) for path in folder.rglob('*') if path.is_file())
+
+
+def test_export_to_object_store(datastore, tmp_path):
+    datastore.export_to_folder(str(tmp_path / 'plain'))
+    store = ObjectStore(tmp_path / 'objects')
+    datastore.export_to_folder(str(tmp_path / 'a'), object_store=store)
+    written = store.written
+    datastore.export_to_folder(str(tmp_path / 'b'), object_store=store)
+
+    # Only settings.toml, which names the export folder, differs
+    assert store.written - written <= 1
+    files = _files(tmp_path / 'plain')
+    assert files == _files(tmp_path / 'a') == _files(tmp_path / 'b')
+    for name in files:
+        if name.name != 'settings.toml':
+            assert filecmp.cmp(tmp_path / 'plain' / name, tmp_path / 'b' / name, shallow=False)
+            assert os.path.samefile(tmp_path / 'a' / name, tmp_path / 'b' / name)
+
+
+def test_stored_files_are_read_only(tmp_path):
+    store = ObjectStore(tmp_path / 'objects')
+    path = store.put(b'data')
+    assert store.put(b'data') == path
+    assert store.written == 1
+    assert path.stat().st_mode & 0o222 == 0
+
+
+def test_concurrent_puts(tmp_path, monkeypatch):
+    # As when slots of a run queue export models sharing a file
+    store = ObjectStore(tmp_path / 'objects')
+    data = b'shared' * 100000
+    paths = []
+    errors = []
+    # Every writer has written its temporary file before any renames it
+    barrier = threading.Barrier(8, timeout=10)
+    replace = os.replace
+
+    def replace_together(source, destination):
+        barrier.wait()
+        replace(source, destination)
+
+    monkeypatch.setattr(os, 'replace', replace_together)
+
+    def put():
+        try:
+            paths.append(store.put(data))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=put) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(set(paths)) == 1 and paths[0].read_bytes() == data
+    assert list(store.folder.glob('??/*')) == paths[:1]
+
+
+def test_export_replaces_links(datastore, tmp_path):
+    store = ObjectStore(tmp_path / 'objects')
+    datastore.export_to_folder(str(tmp_path / 'a'), object_store=store)
+    datastore.export_to_folder(str(tmp_path / 'b'), object_store=store)
+    objects = list(store.folder.glob('??/*'))
+    contents = {path: path.read_bytes() for path in objects}
+
+    # Exporting over b without the store must not change a through the links
+    datastore.export_to_folder(str(tmp_path / 'b'))
+    assert all(path.read_bytes() == content for path, content in contents.items())
+    assert all((tmp_path / 'b' / name).stat().st_nlink == 1 for name in _files(tmp_path / 'b'))
+
+    for path in (tmp_path / 'a').rglob('*'):
+        if path.is_file():
+            path.unlink()
+    assert store.prune() == len(objects)
+    assert list(store.folder.glob('??/*')) == []
+
+
+def test_prune_waits_for_links(tmp_path):
+    pytest.importorskip('fcntl')
+    store = ObjectStore(tmp_path / 'objects')
+    store.put(b'unlinked')
+    deleted = []
+    # As while another process links to an object it found in the store
+    with store._locked(exclusive=False):
+        pruning = threading.Thread(target=lambda: deleted.append(store.prune()))
+        pruning.start()
+        pruning.join(0.2)
+        assert pruning.is_alive()
+    pruning.join(10)
+    assert deleted == [1]
+
+
+def test_prune_tolerates_deleted_objects(tmp_path, monkeypatch):
+    store = ObjectStore(tmp_path / 'objects')
+    kept = store.put(b'kept')
+    store.link(b'kept', tmp_path / 'kept.csv')
+    unlinked = store.put(b'unlinked')
+    missing = unlinked.with_name('0' * len(unlinked.name))
+    # As if an object was deleted between listing the store and checking it
+    glob = Path.glob
+    monkeypatch.setattr(Path, 'glob', lambda self, pattern: iter([missing] + list(glob(self, pattern))))
+    assert store.prune() == 1
+    assert kept.exists() and not unlinked.exists()
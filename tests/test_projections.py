@@ -0,0 +1,105 @@
+import random
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from muse_gui.backend.data.commodity import CommodityPrice
+from muse_gui.backend.data.region import Region
+from muse_gui.backend.resources.datastore import Datastore
+
+SETTINGS = str(Path(__file__).parents[1] / 'examples' / 'example_data' / 'settings.toml')
+
+
+@pytest.fixture
+def datastore():
+    # Prices in two regions, listed region by region
+    datastore = Datastore.from_settings(SETTINGS)
+    datastore.region.create(Region(name='R2'))
+    for key in datastore.commodity.list():
+        commodity = datastore.commodity.read(key)
+        prices = commodity.commodity_prices + [
+            CommodityPrice(region_name='R2', time=price.time, value=price.value * 2 + 1)
+            for price in commodity.commodity_prices
+        ]
+        datastore.commodity.update(key, commodity.copy(update={'commodity_prices': prices}))
+    return datastore
+
+
+def set_prices(datastore, key, prices):
+    commodity = datastore.commodity.read(key)
+    datastore.commodity.update(key, commodity.copy(update={'commodity_prices': prices}))
+
+
+def projections(datastore, folder):
+    datastore.export_to_folder(str(folder))
+    return pd.read_csv(folder / 'input' / 'Projections.csv')
+
+
+def expected_prices(datastore):
+    return {
+        (price.region_name, price.time, datastore.commodity.read(key).commodity_name): price.value
+        for key in datastore.commodity.list()
+        for price in datastore.commodity.read(key).commodity_prices
+    }
+
+
+def prices(frame):
+    frame = frame.iloc[1:].set_index(['RegionName', 'Time']).drop(columns='Attribute').astype(float)
+    return {(region, int(time), name): value for (region, time), row in frame.iterrows() for name, value in row.items()}
+
+
+def test_prices_follow_keys(datastore, tmp_path):
+    frame = projections(datastore, tmp_path)
+    assert list(frame.columns[:3]) == ['RegionName', 'Attribute', 'Time']
+    assert frame.iloc[0, :3].tolist() == ['Unit', '-', ' Year']
+    assert len(frame) == 1 + 2 * 19
+    assert prices(frame) == pytest.approx(expected_prices(datastore))
+
+
+def test_price_lists_in_different_orders(datastore, tmp_path):
+    before = projections(datastore, tmp_path / 'before')
+    # Every commodity but the first, whose prices give the row order, is shuffled
+    shuffle = random.Random(0).shuffle
+    for key in datastore.commodity.list()[1:]:
+        shuffled = list(datastore.commodity.read(key).commodity_prices)
+        shuffle(shuffled)
+        set_prices(datastore, key, shuffled)
+    pd.testing.assert_frame_equal(projections(datastore, tmp_path / 'after'), before)
+
+
+def test_first_price_list_gives_row_order(datastore, tmp_path):
+    first = datastore.commodity.list()[0]
+    reordered = sorted(datastore.commodity.read(first).commodity_prices, key=lambda price: (-price.time, price.region_name))
+    set_prices(datastore, first, reordered)
+    frame = projections(datastore, tmp_path)
+    assert list(zip(frame['RegionName'][1:], frame['Time'][1:].astype(int))) == [
+        (price.region_name, price.time) for price in reordered
+    ]
+    assert prices(frame) == pytest.approx(expected_prices(datastore))
+
+
+def test_missing_price_is_empty(datastore, tmp_path):
+    key = datastore.commodity.list()[-1]
+    name = datastore.commodity.read(key).commodity_name
+    set_prices(datastore, key, [p for p in datastore.commodity.read(key).commodity_prices if p.region_name == 'R1'])
+    frame = projections(datastore, tmp_path).iloc[1:]
+    assert frame[frame['RegionName'] == 'R2'][name].isna().all()
+    assert frame[frame['RegionName'] == 'R1'][name].notna().all()
+
+
+def test_repeated_price(datastore, tmp_path):
+    before = projections(datastore, tmp_path / 'before')
+    key = datastore.commodity.list()[1]
+    commodity_prices = datastore.commodity.read(key).commodity_prices
+    set_prices(datastore, key, commodity_prices + commodity_prices[:1])
+    pd.testing.assert_frame_equal(projections(datastore, tmp_path / 'after'), before)
+
+
+def test_conflicting_prices(datastore, tmp_path):
+    key = datastore.commodity.list()[1]
+    commodity = datastore.commodity.read(key)
+    price = commodity.commodity_prices[0]
+    set_prices(datastore, key, commodity.commodity_prices + [price.copy(update={'value': price.value + 1})])
+    with pytest.raises(ValueError, match=f'{commodity.commodity_name} has more than one price for R1 in {price.time}'):
+        projections(datastore, tmp_path)
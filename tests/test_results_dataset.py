@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from muse_gui.backend.results_dataset import ResultsDataset
+
+RESULTS = Path(__file__).parents[1] / 'examples' / 'example_data' / 'Results'
+STEPS = [2020, 2025, 2030, 2035, 2040, 2045, 2050]
+
+
+@pytest.fixture
+def dataset():
+    return ResultsDataset(RESULTS)
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Paths of the CSVs parsed, and the columns parsed from each"""
+    opened = []
+    read_csv = pd.read_csv
+
+    def recording(path, **kwargs):
+        frame = read_csv(path, **kwargs)
+        opened.append((Path(path).relative_to(RESULTS).as_posix(), list(frame.columns)))
+        return frame
+
+    monkeypatch.setattr(pd, 'read_csv', recording)
+    return opened
+
+
+def test_layout(dataset):
+    assert dataset.sectors() == ['gas', 'power', 'residential']
+    assert dataset.quantities() == ['capacity', 'supply']
+    assert dataset.steps() == dataset.steps('Supply') == STEPS
+    assert [(p.sector, p.step) for p in dataset.select('supply')] == [('residential', step) for step in STEPS]
+
+
+def test_listing_parses_nothing(dataset, opened):
+    dataset.select('capacity', sector='power')
+    assert opened == []
+
+
+def test_pruned_by_sector_and_step(dataset, opened):
+    frame = dataset.read('capacity', sector=['Power', 'gas'], step=[2025, 2040])
+    assert [path for path, _ in opened] == [
+        'Gas/Capacity/2025.csv', 'Gas/Capacity/2040.csv', 'Power/Capacity/2025.csv', 'Power/Capacity/2040.csv',
+    ]
+    assert set(zip(frame['sector'], frame['step'])) == {
+        ('gas', 2025), ('gas', 2040), ('power', 2025), ('power', 2040),
+    }
+    expected = pd.read_csv(RESULTS / 'Power' / 'Capacity' / '2040.csv')
+    pd.testing.assert_frame_equal(
+        frame[(frame['sector'] == 'power') & (frame['step'] == 2040)].drop(columns=['sector', 'step']).reset_index(drop=True),
+        expected,
+        # Columns follow the first file read, and gas files order them differently
+        check_like=True,
+    )
+
+
+def test_only_selected_columns_are_parsed(dataset, opened):
+    frame = dataset.read('supply', step=2030, columns=['supply', 'technology', 'step'])
+    assert opened == [('Residential/Supply/2030.csv', ['technology', 'supply'])]
+    # In the order asked for, with the step from the file name
+    assert list(frame.columns) == ['supply', 'technology', 'step']
+    expected = pd.read_csv(RESULTS / 'Residential' / 'Supply' / '2030.csv')
+    pd.testing.assert_series_equal(frame['supply'], expected['supply'])
+    assert (frame['step'] == 2030).all()
+
+
+def test_nothing_selected(dataset, opened):
+    assert dataset.read('supply', sector='power').columns.tolist() == ['sector', 'step'] + list(
+        pd.read_csv(RESULTS / 'Residential' / 'Supply' / '2020.csv', nrows=0).columns
+    )
+    assert dataset.read('capacity', step=1999, columns=['capacity']).columns.tolist() == ['capacity']
+    assert dataset.read('prices').empty
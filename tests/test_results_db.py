@@ -0,0 +1,98 @@
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from muse_gui.backend.plots import capacity_data_frame_to_plots
+from muse_gui.backend.results_db import ResultsDB
+from muse_gui.backend.run_queue import DONE, RunQueue
+
+RESULTS = Path(__file__).parents[1] / 'examples' / 'example_data' / 'Results'
+
+
+def _ingest(results, folder, label=None):
+    return results.ingest(folder / 'MCAPrices.csv', folder / 'MCACapacity.csv', label)
+
+
+def test_ingest(tmp_path):
+    results = ResultsDB(tmp_path / 'results.sqlite')
+    run_id = _ingest(results, RESULTS, 'baseline')
+    assert [run.label for run in results.runs()] == ['baseline']
+    assert len(results.capacity()) == len(pd.read_csv(RESULTS / 'MCACapacity.csv'))
+    assert len(results.prices()) == len(pd.read_csv(RESULTS / 'MCAPrices.csv'))
+    sector_rows = sum(len(pd.read_csv(path)) for path in RESULTS.glob('*/Capacity/*.csv'))
+    assert len(results.sector_results('Capacity')) == sector_rows
+    # Unchanged results are not read again
+    assert _ingest(results, RESULTS, 'renamed') == run_id
+    assert results.get(run_id).label == 'renamed'
+    assert _ingest(results, RESULTS) == run_id
+    assert results.get(run_id).label == 'renamed'
+
+
+def test_changed_results_replace_rows(tmp_path):
+    folder = tmp_path / 'Results'
+    shutil.copytree(RESULTS, folder)
+    results = ResultsDB(tmp_path / 'results.sqlite')
+    run_id = _ingest(results, folder, 'baseline')
+    capacity = pd.read_csv(folder / 'MCACapacity.csv')
+    capacity.iloc[:1].to_csv(folder / 'MCACapacity.csv', index=False)
+    assert _ingest(results, folder) == run_id
+    assert len(results.capacity()) == 1
+    assert results.get(run_id).label == 'baseline'
+
+
+def test_concurrent_ingests(tmp_path):
+    # As when a queue slot and the GUI ingest the same run
+    results = ResultsDB(tmp_path / 'results.sqlite')
+    barrier = threading.Barrier(4, timeout=10)
+    run_ids = []
+    errors = []
+
+    def ingest(label):
+        barrier.wait()
+        try:
+            run_ids.append(_ingest(results, RESULTS, label))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=ingest, args=(str(i),)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(set(run_ids)) == 1 and len(results.runs()) == 1
+    assert len(results.capacity()) == len(pd.read_csv(RESULTS / 'MCACapacity.csv'))
+
+
+def test_query_across_runs(tmp_path):
+    results = ResultsDB(tmp_path / 'results.sqlite')
+    for i in range(3):
+        folder = tmp_path / str(i)
+        shutil.copytree(RESULTS, folder, copy_function=os.link)
+        _ingest(results, folder, str(i))
+
+    frame = results.capacity(region='R1', year=[2020, 2025])
+    csv = pd.read_csv(RESULTS / 'MCACapacity.csv')
+    expected = csv[(csv['region'] == 'R1') & csv['year'].isin([2020, 2025])]
+    assert len(frame) == 3 * len(expected)
+    assert sorted(frame['run'].unique()) == [run.id for run in results.runs()]
+    # The plots of a run are the same as from its CSV
+    run_plots = {plot.name: plot for plot in capacity_data_frame_to_plots(results.capacity(run=1))}
+    csv_plots = {plot.name: plot for plot in capacity_data_frame_to_plots(csv)}
+    assert sorted(run_plots) == sorted(csv_plots)
+    for name, csv_plot in csv_plots.items():
+        for technology, data in csv_plot.data.items():
+            pd.testing.assert_frame_equal(run_plots[name].data[technology], data, check_exact=False)
+
+
+def test_removed_job_forgets_results(tmp_path):
+    queue = RunQueue(tmp_path)
+    job = queue.add(RESULTS.parent / 'settings.toml', RESULTS / 'MCAPrices.csv', RESULTS / 'MCACapacity.csv')
+    queue._update(job.id, status=DONE)
+    _ingest(queue.results, RESULTS)
+    queue.remove(job.id)
+    assert queue.results.runs() == []
+    assert queue.results.capacity().empty
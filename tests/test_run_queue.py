@@ -0,0 +1,123 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from muse_gui.backend.resources.datastore import Datastore
+from muse_gui.backend.executors import Executor
+from muse_gui.backend.run_queue import CANCELLED, FINISHED, QUEUED, RUNNING, STALE_AFTER, PoolConfig, RunQueue, parse_cpus
+from muse_gui.backend.solver import SolverError
+
+SETTINGS = str(Path(__file__).parents[1] / 'examples' / 'example_data' / 'settings.toml')
+
+
+@pytest.fixture(scope='module')
+def datastore():
+    return Datastore.from_settings(SETTINGS)
+
+
+def test_queue_run(datastore, tmp_path):
+    queue = RunQueue(tmp_path)
+    jobs = [datastore.queue_run(queue, label=str(i)) for i in range(3)]
+    assert all(job.status == QUEUED for job in jobs)
+    assert [job.label for job in jobs] == ['0', '1', '2']
+    # A queue opened later, e.g. after a restart, sees the same jobs
+    assert RunQueue(tmp_path).jobs() == jobs
+    assert [job.id for job in queue.jobs()] == [1, 2, 3]
+
+
+def test_stale_job_is_requeued(datastore, tmp_path):
+    queue = RunQueue(tmp_path)
+    job = datastore.queue_run(queue)
+    # As left behind by an app that was closed mid-run
+    queue._update(job.id, status=RUNNING, heartbeat=time.time() - 2 * STALE_AFTER)
+    claimed = queue._claim()
+    assert claimed.id == job.id and claimed.status == RUNNING
+    assert queue._claim() is None
+
+
+def test_running_job_is_not_requeued(datastore, tmp_path):
+    queue = RunQueue(tmp_path)
+    job = datastore.queue_run(queue)
+    queue._update(job.id, status=RUNNING, heartbeat=time.time())
+    assert queue._claim() is None
+
+
+class CancelExecutor(Executor):
+    def __init__(self, queue, error=None):
+        self.queue = queue
+        self.error = error
+        self.locked = []
+
+    def run(self, settings_path):
+        pass
+
+    def cancel(self):
+        self.locked.append(self.queue._thread_lock.locked())
+        if self.error is not None:
+            raise self.error
+
+
+def running(queue, datastore, executor):
+    # As while a slot of the pool solves the job
+    job = datastore.queue_run(queue)
+    assert queue._claim().id == job.id
+    queue._running[job.id] = executor
+    return job
+
+
+def test_cancel_running_job(datastore, tmp_path):
+    queue = RunQueue(tmp_path)
+    executor = CancelExecutor(queue)
+    job = running(queue, datastore, executor)
+    assert queue.cancel(job.id)
+    # The executor is cancelled outside the queue's lock
+    assert executor.locked == [False]
+    assert queue._cancelling == {job.id}
+
+
+def test_cancel_fails_in_executor(datastore, tmp_path):
+    queue = RunQueue(tmp_path)
+    executor = CancelExecutor(queue, SolverError('server unreachable'))
+    job = running(queue, datastore, executor)
+    assert not queue.cancel(job.id)
+    assert executor.locked == [False]
+    assert queue._cancelling == set()
+    assert queue.get(job.id).status == RUNNING
+
+
+def test_cancel_finished_job(datastore, tmp_path):
+    queue = RunQueue(tmp_path)
+    job = running(queue, datastore, CancelExecutor(queue))
+    del queue._running[job.id]
+    assert not queue.cancel(job.id)
+    assert queue._cancelling == set()
+    with pytest.raises(KeyError):
+        queue.cancel(job.id + 1)
+
+
+def test_pool_runs_jobs(datastore, tmp_path):
+    queue = RunQueue(tmp_path, PoolConfig(workers=2))
+    jobs = [datastore.queue_run(queue, label=str(i)) for i in range(3)]
+    queue.cancel(jobs[-1].id)
+    queue.start()
+    try:
+        assert queue.wait(60)
+    finally:
+        queue.stop()
+    statuses = [queue.get(job.id).status for job in jobs]
+    assert all(status in FINISHED for status in statuses)
+    assert statuses[-1] == CANCELLED
+    for job in jobs:
+        queue.remove(job.id)
+    assert queue.jobs() == []
+    assert list((tmp_path / 'exports').iterdir()) == []
+    assert list(queue.objects.folder.glob('??/*')) == []
+
+
+def test_cpus():
+    assert parse_cpus('0-3,6') == (0, 1, 2, 3, 6)
+    config = PoolConfig(workers=2, cpus=(0, 1, 2, 3))
+    assert config.cpus_for(0) == (0, 2)
+    assert config.cpus_for(1) == (1, 3)
+    assert PoolConfig(workers=4, cpus=(0, 1)).cpus_for(3) == (0, 1)
@@ -0,0 +1,81 @@
+import csv
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from muse_gui.backend.resources.datastore.schemas import (
+    AGENTS, COMM_FLOW, CONSUMPTION, EXISTING_CAPACITY, GLOBAL_COMMODITIES, INDEX_COLUMN, PROJECTIONS, STRING, TECHNODATA,
+    read_table,
+)
+
+EXAMPLE = Path(__file__).parents[1] / 'examples' / 'example_data'
+
+FILES = [
+    ('input/GlobalCommodities.csv', GLOBAL_COMMODITIES),
+    ('input/Projections.csv', PROJECTIONS),
+    ('technodata/Agents.csv', AGENTS),
+    ('technodata/preset/Residential2020Consumption.csv', CONSUMPTION),
+    ('technodata/preset/Residential2050Consumption.csv', CONSUMPTION),
+] + [
+    (f'technodata/{sector}/{name}.csv', schema)
+    for sector in ['gas', 'power', 'residential']
+    for name, schema in [
+        ('Technodata', TECHNODATA), ('CommIn', COMM_FLOW), ('CommOut', COMM_FLOW), ('ExistingCapacity', EXISTING_CAPACITY),
+    ]
+]
+
+
+def read_rows(path: Path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+@pytest.mark.parametrize('name, schema', FILES, ids=[name for name, _ in FILES])
+def test_example_files_follow_schema(name, schema):
+    path = EXAMPLE / name
+    rows = read_rows(path)
+    table = read_table(path, schema)
+    header = [column for column in rows[0] if column != INDEX_COLUMN]
+    assert list(table.data.columns) == header
+    assert len(table.data) == len(rows) - (2 if schema.unit_row else 1)
+    assert table.units == (dict(zip(rows[0], rows[1])) if schema.unit_row else {})
+
+    for column in header:
+        dtype = schema.columns.get(column, schema.extra_dtype)
+        if dtype is None:
+            continue
+        expected = 'object' if dtype == STRING else dtype
+        assert str(table.data[column].dtype) == expected, column
+
+    # The same values pandas finds without the schema
+    skiprows = [1] if schema.unit_row else None
+    plain, strings = pd.read_csv(path, skiprows=skiprows), pd.read_csv(path, skiprows=skiprows, dtype=str)
+    for column in header:
+        expected = strings if schema.columns.get(column, schema.extra_dtype) == STRING else plain
+        pd.testing.assert_series_equal(table.data[column], expected[column], check_dtype=False)
+
+
+def test_unit_row_is_not_data():
+    table = read_table(EXAMPLE / 'input' / 'Projections.csv', PROJECTIONS)
+    assert table.units['RegionName'] == 'Unit' and table.units['Time'] == 'Year'
+    assert 'Unit' not in set(table.data['RegionName'])
+    assert str(table.data['Time'].dtype) == 'int64'
+
+
+def test_index_column_is_dropped(tmp_path):
+    frame = pd.DataFrame({'RegionName': ['R1', 'R2'], 'ProcessName': ['a', 'b'], 'Timeslice': [1, 2], 'heat': [1, 2.5]})
+    frame.to_csv(tmp_path / 'Consumption.csv')
+    assert read_rows(tmp_path / 'Consumption.csv')[0][0] == INDEX_COLUMN
+    table = read_table(tmp_path / 'Consumption.csv', CONSUMPTION)
+    expected = frame.astype({'Timeslice': str})
+    pd.testing.assert_frame_equal(table.data, expected)
+
+
+def test_schema_types_win_over_values(tmp_path):
+    # Numeric-looking names stay strings and integer shares become floats
+    path = tmp_path / 'CommIn.csv'
+    path.write_text('ProcessName,RegionName,Time,Level,gas\nUnit,-,Year,-,PJ/PJ\n1,R1,2020,fixed,1\n')
+    table = read_table(path, COMM_FLOW)
+    assert table.data.loc[0, 'ProcessName'] == '1' and table.data.loc[0, 'Time'] == '2020'
+    assert str(table.data['gas'].dtype) == 'float64'
@@ -0,0 +1,104 @@
+from pathlib import Path
+
+import pytest
+
+from muse_gui.backend.resources.datastore import Datastore
+from muse_gui.backend.resources.datastore.search import AGENT_FACETS, PROCESS_FACETS, SearchIndex
+
+SETTINGS = str(Path(__file__).parents[1] / 'examples' / 'example_data' / 'settings.toml')
+
+
+@pytest.fixture
+def datastore():
+    return Datastore.from_settings(SETTINGS)
+
+
+@pytest.fixture
+def index(datastore):
+    index = SearchIndex(datastore.process, PROCESS_FACETS)
+    yield index
+    index.close()
+
+
+def set_sector(datastore, name, sector):
+    process = datastore.process.read(name).copy(deep=True)
+    process.sector = sector
+    datastore.process.update(name, process)
+
+
+def in_sector(datastore, sector):
+    return [k for k in datastore.process.list() if datastore.process.read(k).sector == sector]
+
+
+def test_index_covers_store(index, datastore):
+    assert len(index) == len(datastore.process.list())
+    assert index.search() == datastore.process.list()
+
+
+def test_typing(index, datastore):
+    # Each search refines the last one
+    name = datastore.process.list()[-1]
+    for i in range(1, len(name) + 1):
+        assert index.search(name[:i]) == [k for k in datastore.process.list() if name[:i].lower() in k.lower()]
+    assert index.search(name.upper()) == [name]
+    assert index.search(name + 'x') == []
+
+
+def test_facets(datastore):
+    index = SearchIndex(datastore.agent, AGENT_FACETS)
+    sector = datastore.sector.list()[0]
+    region = datastore.region.list()[0]
+    expected = [
+        k for k in datastore.agent.list()
+        if sector in datastore.agent.read(k).sectors and region in datastore.agent.read(k).new
+    ]
+    assert expected
+    assert index.query(f'sector:{sector} region:{region}') == expected
+    assert index.search(sector=sector, region=region) == expected
+    with pytest.raises(KeyError):
+        index.search(colour='red')
+    index.close()
+
+
+def test_index_follows_creates_and_deletes(index, datastore):
+    name = datastore.process.list()[0]
+    process = datastore.process.read(name).copy(deep=True)
+    datastore.process.delete(name)
+    assert name not in index.search(name)
+    assert index.search() == datastore.process.list()
+    datastore.process.create(process)
+    assert index.search(name) == [name]
+    assert index.search() == datastore.process.list()
+
+
+def test_edit_keeps_store_order(index, datastore):
+    order = datastore.process.list()
+    set_sector(datastore, 'gasboiler', 'power')
+    assert datastore.process.list() == order
+    assert index.search() == order
+    assert index.search('gas') == [k for k in order if 'gas' in k.lower()]
+    assert index.search(sector='power') == in_sector(datastore, 'power') == ['gasboiler', 'gasCCGT', 'windturbine']
+    assert index.search(sector='residential') == ['heatpump']
+
+
+def test_undo_keeps_store_order(index, datastore):
+    order = datastore.process.list()
+    set_sector(datastore, 'gasboiler', 'power')
+    assert datastore.undo()
+    assert datastore.process.list() == order
+    assert index.search() == order
+    assert index.search(sector='residential') == ['gasboiler', 'heatpump']
+    assert datastore.redo()
+    assert datastore.process.list() == order
+    assert index.search(sector='power') == ['gasboiler', 'gasCCGT', 'windturbine']
+
+
+def test_rename_follows_store_order(index, datastore):
+    process = datastore.process.read('gasboiler').copy(deep=True)
+    process.name = 'gasboiler2'
+    datastore.process.update('gasboiler', process)
+    assert index.search() == datastore.process.list()
+    assert index.search('boiler') == ['gasboiler2']
+    assert datastore.undo()
+    assert index.search() == datastore.process.list()
+    assert index.search('boiler') == ['gasboiler']
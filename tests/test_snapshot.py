@@ -0,0 +1,67 @@
+import filecmp
+from pathlib import Path
+
+import pytest
+
+from muse_gui.backend.resources.datastore import Datastore
+from muse_gui.backend.resources.datastore.exceptions import ReadOnlyDatastore
+
+SETTINGS = str(Path(__file__).parents[1] / 'examples' / 'example_data' / 'settings.toml')
+
+
+@pytest.fixture
+def datastore():
+    return Datastore.from_settings(SETTINGS)
+
+
+def test_snapshot_shares_models(datastore):
+    snapshot = datastore.snapshot()
+    for live, copy in zip(datastore.stores, snapshot.stores):
+        assert copy.list() == live.list()
+        # Taking a snapshot copies nothing
+        assert copy._data is live._data
+    assert snapshot.process.read('gasboiler') is datastore.process.read('gasboiler')
+
+
+def test_first_write_copies(datastore):
+    snapshot = datastore.snapshot()
+    datastore.process.delete('gasboiler')
+    assert 'gasboiler' not in datastore.process.list()
+    assert 'gasboiler' in snapshot.process.list()
+    assert datastore.process._data is not snapshot.process._data
+    # Stores that were not written to still share their data
+    assert datastore.sector._data is snapshot.sector._data
+
+
+def test_update_after_snapshot(datastore):
+    snapshot = datastore.snapshot()
+    process = datastore.process.read('gasboiler').copy(deep=True)
+    process.sector = 'power'
+    datastore.process.update('gasboiler', process)
+    assert datastore.process.read('gasboiler').sector == 'power'
+    assert snapshot.process.read('gasboiler').sector == 'residential'
+    assert datastore.process.version == snapshot.process.version + 1
+
+
+def test_snapshot_is_read_only(datastore):
+    snapshot = datastore.snapshot()
+    process = snapshot.process.read('gasboiler')
+    with pytest.raises(ReadOnlyDatastore):
+        snapshot.process.delete('gasboiler')
+    with pytest.raises(ReadOnlyDatastore):
+        snapshot.process.update('gasboiler', process.copy(update={'sector': 'power'}))
+    with pytest.raises(ReadOnlyDatastore):
+        snapshot.process.create(process.copy(update={'name': 'gasboiler2'}))
+    assert snapshot.process.list() == datastore.process.list()
+    assert not snapshot.can_undo and not snapshot.undo()
+
+
+def test_snapshot_ignores_later_edits(datastore, tmp_path):
+    snapshot = datastore.snapshot()
+    datastore.export_to_folder(str(tmp_path / 'before'))
+    datastore.process.delete('gasboiler')
+    snapshot.export_to_folder(str(tmp_path / 'snapshot'))
+    before = sorted(p.relative_to(tmp_path / 'before') for p in (tmp_path / 'before').rglob('*.csv'))
+    assert before == sorted(p.relative_to(tmp_path / 'snapshot') for p in (tmp_path / 'snapshot').rglob('*.csv'))
+    for name in before:
+        assert filecmp.cmp(tmp_path / 'before' / name, tmp_path / 'snapshot' / name, shallow=False)
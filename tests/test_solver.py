@@ -0,0 +1,33 @@
+import importlib.util
+
+import pytest
+
+from muse_gui.backend.solver import SolverError, SolverWorker
+
+
+@pytest.fixture
+def worker():
+    worker = SolverWorker()
+    worker.start()
+    yield worker
+    worker.stop()
+
+
+def test_restart_after_crash(worker):
+    pid = worker.pid
+    worker._process.kill()
+    worker._process.join()
+    assert not worker.ping()
+    worker.start()
+    assert worker.ping()
+    assert worker.pid != pid
+    assert worker.restarts == 1
+
+
+@pytest.mark.skipif(importlib.util.find_spec('muse') is not None, reason='MUSE is installed')
+def test_run_without_muse(worker):
+    with pytest.raises(SolverError, match='muse'):
+        worker.run('settings.toml')
+    # The worker survives a failed run
+    assert worker.ping()
+    assert worker.restarts == 0
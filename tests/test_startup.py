@@ -0,0 +1,66 @@
+"""
+Start-up time budget.
+
+The modules below are imported before the startup window can appear, so
+they are measured with ``python -X importtime`` in a fresh interpreter.
+Heavy dependencies (MUSE, pandas, matplotlib) must stay out of this path and
+are only imported on first load, run or plot.
+"""
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+ROOT = Path(__file__).parents[1]
+
+# Cumulative import budgets in microseconds
+BACKEND_BUDGET_US = 500_000
+FRONTEND_BUDGET_US = 900_000
+
+LAZY_MODULES = ['muse', 'pandas', 'matplotlib']
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def import_profile(module: str) -> Dict[str, int]:
+    """Cumulative import time (us) of every top-level import of ``module``"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match is None:
+            continue
+        _, cumulative, _, name = match.groups()
+        profile[name] = max(profile.get(name, 0), int(cumulative))
+    return profile
+
+
+def total_import_time(profile: Dict[str, int], module: str) -> int:
+    root = module.split('.')[0]
+    return max(v for k, v in profile.items() if k == root or k == module)
+
+
+def test_datastore_import_is_light():
+    module = 'muse_gui.backend.resources.datastore'
+    profile = import_profile(module)
+    heavy = [m for m in LAZY_MODULES if m in profile]
+    assert heavy == [], f'{module} eagerly imports {heavy}'
+    assert total_import_time(profile, module) < BACKEND_BUDGET_US
+
+
+def test_windows_import_is_light():
+    pytest.importorskip('PySimpleGUI')
+    module = 'muse_gui.frontend.windows'
+    profile = import_profile(module)
+    heavy = [m for m in LAZY_MODULES if m in profile]
+    assert heavy == [], f'{module} eagerly imports {heavy}'
+    assert total_import_time(profile, module) < FRONTEND_BUDGET_US
@@ -0,0 +1,48 @@
+import re
+import threading
+
+import pytest
+
+pytest.importorskip('PySimpleGUI')
+
+from muse_gui.backend.instrumentation import add_sink, remove_sink, span  # noqa: E402
+from muse_gui.frontend.windows.utils import STATUS_EVENT, status_bar_sink  # noqa: E402
+
+
+class Window:
+    """Records the events posted to it, and the threads they came from"""
+    def __init__(self):
+        self.events = []
+
+    def write_event_value(self, key, value):
+        self.events.append((key, value, threading.current_thread()))
+
+
+@pytest.fixture
+def window():
+    window = Window()
+    sink = add_sink(status_bar_sink(window))
+    yield window
+    remove_sink(sink)
+
+
+def test_span_on_worker_thread(window):
+    # As when a run queue slot ingests a finished run's results
+    def ingest():
+        with span('results_ingest'):
+            pass
+
+    worker = threading.Thread(target=ingest)
+    worker.start()
+    worker.join()
+    [(key, message, thread)] = window.events
+    # Posted to the main loop rather than shown from the worker
+    assert key == STATUS_EVENT and thread is worker
+    assert re.fullmatch(r'Results Ingest took \d+\.\d\ds', message)
+
+
+def test_only_top_level_spans(window):
+    with span('export_to_folder'):
+        with span('write_csv'):
+            pass
+    assert [message.split(' took ')[0] for _, message, _ in window.events] == ['Export To Folder']
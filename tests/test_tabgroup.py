@@ -0,0 +1,97 @@
+import pytest
+
+pytest.importorskip('PySimpleGUI')
+
+from muse_gui.frontend.widgets.base import BaseWidget  # noqa: E402
+from muse_gui.frontend.widgets.tabgroup import TabGroup  # noqa: E402
+
+
+class Tab(BaseWidget):
+    """Counts how often its layout is built and it is updated"""
+    def __init__(self):
+        super().__init__()
+        self.layouts = self.handlers = self.updates = 0
+
+    def layout(self, prefix):
+        self.prefix = prefix
+        self.layouts += 1
+        return [[]]
+
+    def bind_handlers(self):
+        self.handlers += 1
+
+    def update(self, window):
+        self.updates += 1
+
+
+class Window:
+    """Records the layouts added to placeholders"""
+    def __init__(self):
+        self.extended = []
+
+    def __getitem__(self, key):
+        return key
+
+    def extend_layout(self, container, rows):
+        self.extended.append(container)
+
+
+@pytest.fixture
+def tabs():
+    return {'regions': Tab(), 'sectors': Tab()}
+
+
+def make_group(tabs, version=None):
+    group = TabGroup(tabs, 'tg', version=version)
+    group.layout(tuple())
+    return group
+
+
+def test_tabs_are_built_on_first_show(tabs):
+    window = Window()
+    group = make_group(tabs)
+    assert window.extended == []
+
+    group.show(window, 'sectors')
+    group.show(window, 'sectors')
+    assert window.extended == [('tg', 'sectors_placeholder')]
+    assert (tabs['sectors'].layouts, tabs['sectors'].handlers) == (1, 1)
+    assert tabs['regions'].layouts == 0
+    # The tab's elements are prefixed like those of tabs built up front
+    assert tabs['sectors'].prefix == ('tg',)
+
+
+def test_without_version_every_show_updates(tabs):
+    window = Window()
+    group = make_group(tabs)
+    for _ in range(3):
+        group.show(window, 'regions')
+    assert tabs['regions'].updates == 3
+
+
+def test_show_updates_when_version_changes(tabs):
+    window = Window()
+    version = [0]
+    group = make_group(tabs, version=lambda: version[0])
+
+    group.show(window, 'regions')
+    group.show(window, 'regions')
+    assert tabs['regions'].updates == 1
+
+    version[0] += 1
+    group.show(window, 'regions')
+    group.show(window, 'sectors')
+    assert (tabs['regions'].updates, tabs['sectors'].updates) == (2, 1)
+
+    # Each tab remembers the version it last showed
+    group.show(window, 'sectors')
+    group.show(window, 'regions')
+    assert (tabs['regions'].updates, tabs['sectors'].updates) == (2, 1)
+
+
+def test_handlers_are_bound_for_built_tabs(tabs):
+    window = Window()
+    group = make_group(tabs)
+    group.show(window, 'regions')
+    group.bind_handlers()
+    assert (tabs['regions'].handlers, tabs['sectors'].handlers) == (2, 0)
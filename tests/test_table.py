@@ -0,0 +1,83 @@
+import pytest
+
+pytest.importorskip('PySimpleGUI')
+
+from muse_gui.frontend.widgets.table import DEFAULT_WINDOW_ROWS, EditableTable  # noqa: E402
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+
+
+@pytest.fixture
+def table():
+    # Nothing is rendered without a window, so only count the renders
+    table = EditableTable(0, 0, virtual=True, num_rows=10)
+    table._render = Recorder()
+    table._update_cell_position = Recorder()
+    table.values = [[i, i * 0.5, f'r{i}'] for i in range(100)]
+    return table
+
+
+def test_virtual_values_are_strings(table):
+    assert table.values[3] == ('3', '1.5', 'r3')
+    assert table.cell_text == '0'
+    # Row 1 is scrolled out of view, so only the backing list is written
+    table.scroll(50)
+    table.cell_text = 2.25
+    assert table.values[0] == ('2.25', '0.0', 'r0')
+
+
+def test_window(table):
+    assert table._window_rows == 10
+    assert table._max_top() == 90
+    assert table._is_rendered(1) and table._is_rendered(10)
+    assert not table._is_rendered(11)
+
+
+def test_scroll_is_clamped(table):
+    table.scroll(25)
+    assert table._top == 25
+    table.scroll(1000)
+    assert table._top == 90
+    table.scroll(-1000)
+    assert table._top == 0
+    renders = table._render.calls
+    table.scroll(-3)
+    assert table._render.calls == renders
+
+
+def test_moving_past_the_window_scrolls_to_the_row(table):
+    table.row = 10
+    assert table._top == 0 and table._view_row() == 10
+    table.row = 11
+    assert table._top == 1 and table._view_row() == 10
+    table.row = 40
+    assert table._top == 30
+    table.row = 5
+    assert table._top == 4 and table._view_row() == 1
+
+
+def test_clicks_are_offset_by_the_top_row(table):
+    table.scroll(20)
+    table._disabled = False
+    # Stands in for the cell editor, which only exists in a window
+    table._input = type('Input', (), {'set_focus': lambda self: None, 'update': lambda self, **kwargs: None})()
+    table._handle_table_events(['+CLICKED+', (2, 1)])
+    assert (table.row, table.col) == (23, 1)
+    assert table.cell_text == '11.0'
+
+
+def test_fewer_rows_than_the_window(table):
+    table.values = [[1, 2]] * 3
+    assert table._max_top() == 0 and table._top == 0
+    table.scroll(5)
+    assert table._top == 0
+
+
+def test_default_window_rows():
+    assert EditableTable(0, 0, virtual=True)._window_rows == DEFAULT_WINDOW_ROWS
@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('PySimpleGUI')
+
+from muse_gui.backend.resources.datastore import Datastore  # noqa: E402
+from muse_gui.frontend.views import technology  # noqa: E402
+from muse_gui.frontend.views.technology import TechnologyView  # noqa: E402
+
+SETTINGS = str(Path(__file__).parents[1] / 'examples' / 'example_data' / 'settings.toml')
+
+
+@pytest.fixture
+def datastore():
+    return Datastore.from_settings(SETTINGS)
+
+
+@pytest.fixture
+def view(datastore, monkeypatch):
+    view = TechnologyView(datastore)
+    view.builds = []
+    build = view._build_table_values_for_process
+
+    def counted(process):
+        view.builds.append(process.name)
+        return build(process)
+
+    monkeypatch.setattr(view, '_build_table_values_for_process', counted)
+    return view
+
+
+def table_values(view, name):
+    # As when the process is selected in the list
+    process = view._model.read(name)
+    view._years = view.model.get_technodata_years_for_process(process)
+    view._regions = view.model.get_technodata_regions_for_process(process)
+    view._commin = view.model.get_additional_inputs_for_process(process)
+    view._commout = view.model.get_additional_outputs_for_process(process)
+    return view._get_table_values_for_process(process)
+
+
+def test_values_are_cached(view, datastore):
+    name = datastore.process.list()[0]
+    first = table_values(view, name)
+    assert table_values(view, name) == first
+    assert view.builds == [name]
+
+
+def test_cached_values_are_copies(view, datastore):
+    name = datastore.process.list()[0]
+    first = table_values(view, name)
+    first['cost'][0][2] = 'patched'
+    first['cost'].append(['extra'])
+    again = table_values(view, name)
+    assert again['cost'][0][2] == 3.8 and len(again['cost']) == 1
+    assert view.builds == [name]
+
+
+def test_edit_invalidates(view, datastore):
+    name = datastore.process.list()[0]
+    assert table_values(view, name)['cost'][0][2] == 3.8
+
+    process = datastore.process.read(name).copy(deep=True)
+    process.technodatas[0].cost.cap_par = 7.5
+    datastore.process.update(name, process)
+    assert table_values(view, name)['cost'][0][2] == 7.5
+    assert view.builds == [name, name]
+
+
+def test_edited_copies_are_not_cached(view, datastore):
+    name = datastore.process.list()[0]
+    editing = datastore.process.read(name).copy(deep=True)
+    view._get_table_values_for_process(editing)
+    view._get_table_values_for_process(editing)
+    assert view.builds == [name, name]
+    assert len(view._table_cache) == 0
+
+
+def test_least_recently_used_is_evicted(view, datastore, monkeypatch):
+    monkeypatch.setattr(technology, 'TABLE_CACHE_SIZE', 2)
+    first, second, third = datastore.process.list()[:3]
+    table_values(view, first)
+    table_values(view, second)
+    table_values(view, first)
+    table_values(view, third)
+    assert len(view._table_cache) == 2
+    # second was used least recently, so it is built again
+    table_values(view, first)
+    table_values(view, second)
+    assert view.builds == [first, second, third, second]
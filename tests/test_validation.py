@@ -0,0 +1,142 @@
+import csv
+import shutil
+from pathlib import Path
+
+import pytest
+
+from muse_gui.backend.resources.datastore import Datastore
+
+EXAMPLE = Path(__file__).parents[1] / 'examples' / 'example_data'
+
+
+@pytest.fixture
+def model(tmp_path) -> Path:
+    shutil.copytree(EXAMPLE, tmp_path / 'model', ignore=shutil.ignore_patterns('Results'))
+    return tmp_path / 'model'
+
+
+def read_rows(path: Path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+def edit_csv(path: Path, edit) -> None:
+    rows = read_rows(path)
+    with open(path, 'w', newline='') as f:
+        csv.writer(f).writerows(edit(rows))
+
+
+def drop_columns(*names):
+    def edit(rows):
+        keep = [i for i, name in enumerate(rows[0]) if name not in names]
+        return [[row[i] for i in keep] for row in rows]
+    return edit
+
+
+def problems(model: Path):
+    return {(Path(p.path).relative_to(model).as_posix(), p.message) for p in Datastore.validate_settings(str(model / 'settings.toml'))}
+
+
+def test_example_is_valid(model):
+    assert problems(model) == set()
+
+
+def test_every_problem_is_reported_at_once(model):
+    technodata = model / 'technodata'
+    edit_csv(technodata / 'power' / 'Technodata.csv', drop_columns('cap_par', 'Agent2'))
+    edit_csv(technodata / 'power' / 'CommIn.csv', drop_columns('wind'))
+    edit_csv(technodata / 'Agents.csv', lambda rows: [[('Retro' if v == 'Retrofit' else v) for v in row] for row in rows])
+    edit_csv(technodata / 'gas' / 'ExistingCapacity.csv', lambda rows: [[('R9' if v == 'R1' else v) for v in row] for row in rows])
+    edit_csv(technodata / 'residential' / 'CommOut.csv', lambda rows: rows + [rows[2]])
+    (technodata / 'residential' / 'CommIn.csv').unlink()
+    process = read_rows(technodata / 'residential' / 'CommOut.csv')[2][0]
+
+    assert problems(model) == {
+        ('technodata/power/Technodata.csv', 'missing column(s): cap_par'),
+        ('technodata/power/Technodata.csv', 'missing agent share column(s): Agent2'),
+        ('technodata/power/CommIn.csv', 'missing commodity column(s): wind'),
+        ('technodata/Agents.csv', 'unknown agent types: Retro'),
+        ('technodata/gas/ExistingCapacity.csv', 'regions not in projections: R9'),
+        ('technodata/residential/CommOut.csv', f'more than one row for processes: {process}'),
+        ('technodata/residential/CommIn.csv', 'file not found'),
+    }
+
+
+def test_missing_processes(model):
+    technodata = model / 'technodata' / 'power'
+    processes = [row[0] for row in read_rows(technodata / 'Technodata.csv')[2:]]
+    edit_csv(technodata / 'ExistingCapacity.csv', lambda rows: [row for row in rows if row[0] != processes[-1]])
+    edit_csv(technodata / 'CommOut.csv', lambda rows: [row for row in rows if row[0] != processes[0]])
+    assert problems(model) == {
+        ('technodata/power/ExistingCapacity.csv', f'no rows for processes: {processes[-1]}'),
+        ('technodata/power/CommOut.csv', f'no rows for processes: {processes[0]}'),
+    }
+
+
+def test_unreadable_csvs_are_reported(model):
+    technodata = model / 'technodata'
+    agents = technodata / 'Agents.csv'
+    agents.write_bytes(agents.read_bytes() + b'\xff\xfe\n')
+    comm_in = technodata / 'power' / 'CommIn.csv'
+    comm_in.write_text(comm_in.read_text() + '"unclosed,quote\n')
+    (technodata / 'gas' / 'ExistingCapacity.csv').write_text('')
+    edit_csv(technodata / 'power' / 'Technodata.csv', drop_columns('cap_par'))
+
+    found = problems(model)
+    unreadable = {path for path, message in found if message.startswith('could not be read as CSV')}
+    assert unreadable == {'technodata/Agents.csv', 'technodata/power/CommIn.csv', 'technodata/gas/ExistingCapacity.csv'}
+    assert ('technodata/power/Technodata.csv', 'missing column(s): cap_par') in found
+    assert len(found) == 4
+
+
+def test_bad_settings_values(model):
+    settings = model / 'settings.toml'
+    text = settings.read_text()
+    text = text.replace('interest_rate = 0.1', 'interest_rate = "high"').replace('maximum_iterations = 100', 'maximum_iterations = "many"')
+    settings.write_text(text)
+    assert problems(model) == {
+        ('settings.toml', 'interest_rate: value is not a valid float'),
+        ('settings.toml', 'maximum_iterations: value is not a valid integer'),
+    }
+
+
+def test_unknown_settings_region(model):
+    settings = model / 'settings.toml'
+    settings.write_text(settings.read_text().replace('regions = ["R1"]', 'regions = ["R1", "R7"]'))
+    assert problems(model) == {('settings.toml', 'regions not in projections: R7')}
+
+
+def test_invalid_toml(model):
+    (model / 'settings.toml').write_text('regions = "R1\n')
+    [(path, message)] = problems(model)
+    assert path == 'settings.toml' and message.startswith('invalid TOML')
+
+
+def test_missing_settings_sections(model):
+    (model / 'settings.toml').write_text('regions = ["R1"]\n')
+    assert problems(model) == {
+        ('settings.toml', f'{section}: field required')
+        for section in ['time_framework', 'global_input_files', 'sectors', 'timeslices']
+    }
+
+
+def test_unsupported_sectors_match_import_errors(model):
+    settings = model / 'settings.toml'
+    text = settings.read_text()
+    gas_index = text.index('[sectors.gas]')
+    gas = text[gas_index:]
+    text = text[:gas_index] + gas.replace("type = 'default'", "type = 'legacy'", 1)
+    text = text.replace(
+        '[sectors.residential.subsectors.retro_and_new]',
+        '[sectors.residential.subsectors.other]\nagents = "{path}/technodata/Agents.csv"\n'
+        'existing_capacity = "{path}/technodata/residential/ExistingCapacity.csv"\n\n'
+        '[sectors.residential.subsectors.retro_and_new]',
+    )
+    settings.write_text(text)
+    assert problems(model) == {
+        ('settings.toml', 'sectors.residential: only single subsector case supported'),
+        ('settings.toml', 'sectors.gas: sector type legacy not supported'),
+    }
+    # The import stops at the first of them, with the same message
+    with pytest.raises(ValueError, match='Only single subsector case supported'):
+        Datastore.from_settings(str(settings))